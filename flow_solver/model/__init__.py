@@ -3,10 +3,17 @@ Model layer: puzzle representation and loading.
 
 Modules:
 - board: Board class that stores the grid and terminal positions.
-- puzzle_loader: functions to load puzzles from text files.
-- node: Node class for search states.
+- puzzle_loader: functions to load and save puzzles as text files.
+- node: Node and DeltaNode classes for search states.
+- geometry: cached cell numbering and adjacency tables per board size.
+- puzzle_instance: compiled puzzle shared by the solvers.
+- features: cheap numeric description of a puzzle for difficulty prediction.
+- batched_env: NumPy environment stepping many GameBoards at once (needs NumPy).
 """
 
 from .board import Board, Coord
-from .puzzle_loader import load_puzzle_from_file, parse_raw_puzzle
-from .node import Node
+from .puzzle_loader import format_puzzle, load_puzzle_from_file, parse_raw_puzzle, save_puzzle_to_file
+from .node import DeltaNode, Node
+from .geometry import GridGeometry, grid_geometry
+from .puzzle_instance import PuzzleInstance, build_puzzle_instance
+from .features import FEATURE_NAMES, BoardFeatures, extract_features
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple
+
+from flow_solver.model.game_board_generator import GameBoard
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only this environment needs it.
+    np = None
+
+"""
+Batched NumPy version of the GameBoard environment:
+- B boards of the same size and wire count are stepped together. Each row
+  follows GameBoard's rules: a wire grows from its head into a neighboring
+  empty cell or its own end terminal, and a wire that reached its end
+  terminal takes no more actions.
+- Cells are numbered x * dim + y, matching GameBoard's board[x][y]. Action
+  wire * 4 + d moves the head of `wire` in direction d, in getActions order:
+  (x+1, y), (x, y+1), (x-1, y), (x, y-1).
+- step() applies one action per board (or -1 to leave a board as it is)
+  and returns the new action mask with the complete and terminal flags,
+  all computed for the whole batch at once. A board is complete when every
+  wire is connected and no cell is empty (GameBoard.isComplete), and
+  terminal when it is complete or has no legal action left.
+- reset() puts selected boards back to their starting state, so rollouts
+  can restart finished boards in place.
+"""
+
+HAVE_NUMPY = np is not None
+
+# (dx, dy) of the four actions of a wire, in GameBoard.getActions order
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+@lru_cache(maxsize=None)
+def _neighbor_table(dim: int):
+    """(cells, 4) neighbor per direction; off-board neighbors point at the sentinel cell dim*dim."""
+    table = np.full((dim * dim, 4), dim * dim, dtype=np.intp)
+    for x in range(dim):
+        for y in range(dim):
+            for d, (dx, dy) in enumerate(DIRECTIONS):
+                if 0 <= x + dx < dim and 0 <= y + dy < dim:
+                    table[x * dim + y, d] = (x + dx) * dim + y + dy
+    table.setflags(write=False)
+    return table
+
+
+class BatchedGameEnv:
+    """
+    B GameBoards stepped together with NumPy.
+
+    State arrays (row b is board b):
+    - owner: (B, cells + 1) wire number (1-based) owning each cell, 0 if
+      empty; the last column is an off-board sentinel that is never free
+    - heads / ends: (B, wires) cell of each wire's head / end terminal
+    - prev: (B, cells) cell the wire came from (-1 for start terminals and
+      empty cells), so the wires can be read back
+    - empty: (B,) number of empty cells
+    """
+
+    def __init__(self, boards: Sequence[GameBoard]):
+        if not HAVE_NUMPY:
+            raise ImportError("BatchedGameEnv requires NumPy")
+        if not boards:
+            raise ValueError("boards is empty")
+        dim, wires = boards[0].getDim(), boards[0].getNumWires()
+        for board in boards:
+            if board.getDim() != dim or board.getNumWires() != wires:
+                raise ValueError("every board needs the same dimension and number of wires")
+
+        self.dim = dim
+        self.num_wires = wires
+        self.num_cells = dim * dim
+        self.batch = len(boards)
+        self.num_actions = 4 * wires
+        self._neighbors = _neighbor_table(dim)
+        self._rows = np.arange(self.batch)
+
+        owner = np.zeros((self.batch, self.num_cells + 1), dtype=np.int32)
+        owner[:, -1] = -1
+        prev = np.full((self.batch, self.num_cells), -1, dtype=np.intp)
+        heads = np.zeros((self.batch, wires), dtype=np.intp)
+        ends = np.zeros((self.batch, wires), dtype=np.intp)
+        for b, board in enumerate(boards):
+            for x, column in enumerate(board.getBoard()):
+                for y, value in enumerate(column):
+                    owner[b, x * dim + y] = value >> 16 if value > 65535 else value >> 8 if value > 255 else value
+            for w, wire in enumerate(board.getWires()):
+                cells = [x * dim + y for x, y in wire]
+                prev[b, cells[1:]] = cells[:-1]
+                heads[b, w] = cells[-1]
+            for w, (x, y) in enumerate(board.getEndTerminals()):
+                ends[b, w] = x * dim + y
+
+        self._initial = (owner, prev, heads)
+        self.ends = ends
+        self.owner = owner.copy()
+        self.prev = prev.copy()
+        self.heads = heads.copy()
+        self.empty = (self.owner[:, :-1] == 0).sum(axis=1)
+        self._mask, self._complete, self._terminal = self._flags()
+
+    @classmethod
+    def repeat(cls, board: GameBoard, batch: int) -> BatchedGameEnv:
+        """`batch` copies of one board, e.g. for many rollouts of the same puzzle."""
+        if batch < 1:
+            raise ValueError("batch must be >= 1")
+        return cls([board] * batch)
+
+    @property
+    def grid(self):
+        """(B, dim, dim) wire numbers indexed [b, x, y] like GameBoard.getBoard (0 = empty)."""
+        return self.owner[:, :-1].reshape(self.batch, self.dim, self.dim)
+
+    def action_mask(self):
+        """(B, 4 * wires) bool: True where action wire * 4 + d is legal."""
+        return self._mask
+
+    def complete(self):
+        """(B,) bool: every wire connected and no empty cell."""
+        return self._complete
+
+    def terminal(self):
+        """(B,) bool: complete, or no legal action left."""
+        return self._terminal
+
+    def wire_complete(self):
+        """(B, wires) bool: the wire's head is on its end terminal."""
+        return self.heads == self.ends
+
+    def step(self, actions) -> Tuple:
+        """
+        Apply one action per board; -1 leaves that board unchanged.
+
+        Returns (action_mask, complete, terminal) after the step.
+        Raises ValueError if a board is given an illegal action.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        if actions.shape != (self.batch,):
+            raise ValueError(f"expected {self.batch} actions, got shape {actions.shape}")
+        live = actions >= 0
+        rows = self._rows[live]
+        chosen = actions[live]
+        if chosen.size:
+            if chosen.max() >= self.num_actions or not self._mask[rows, chosen].all():
+                raise ValueError("illegal action for at least one board")
+            wires = chosen >> 2
+            src = self.heads[rows, wires]
+            dst = self._neighbors[src, chosen & 3]
+            self.owner[rows, dst] = wires + 1
+            self.prev[rows, dst] = src
+            self.heads[rows, wires] = dst
+            self.empty[rows] -= dst != self.ends[rows, wires]
+            self._mask, self._complete, self._terminal = self._flags()
+        return self._mask, self._complete, self._terminal
+
+    def reset(self, where=None) -> Tuple:
+        """
+        Put boards back to their starting state: all of them, or those
+        selected by `where` (a (B,) bool array or row indices).
+
+        Returns (action_mask, complete, terminal).
+        """
+        rows = self._rows if where is None else self._rows[where]
+        owner, prev, heads = self._initial
+        self.owner[rows] = owner[rows]
+        self.prev[rows] = prev[rows]
+        self.heads[rows] = heads[rows]
+        self.empty[rows] = (owner[rows, :-1] == 0).sum(axis=1)
+        self._mask, self._complete, self._terminal = self._flags()
+        return self._mask, self._complete, self._terminal
+
+    def random_actions(self, rng: Optional["np.random.Generator"] = None):
+        """One uniformly random legal action per board; -1 where there is none."""
+        if rng is None:
+            rng = np.random.default_rng()
+        scores = rng.random(self._mask.shape)
+        scores[~self._mask] = -1.0
+        actions = scores.argmax(axis=1)
+        actions[~self._mask.any(axis=1)] = -1
+        return actions
+
+    def game_board(self, b: int) -> GameBoard:
+        """
+        Board b as a GameBoard (board codes, wires, terminals). Unlike
+        GameBoard.takeAction, a connected end terminal keeps its end code.
+        """
+        dim = self.dim
+        board = GameBoard(dim)
+        board._numWires = self.num_wires
+        owner = self.owner[b]
+        for w in range(self.num_wires):
+            cells = [int(self.heads[b, w])]
+            while self.prev[b, cells[-1]] >= 0:
+                cells.append(int(self.prev[b, cells[-1]]))
+            cells.reverse()
+            board._wires.append([divmod(cell, dim) for cell in cells])
+            board._starts.append(divmod(cells[0], dim))
+            board._ends.append(divmod(int(self.ends[b, w]), dim))
+        for cell in range(self.num_cells):
+            board._board[cell // dim][cell % dim] = int(owner[cell])
+        for w in range(self.num_wires):
+            sx, sy = board._starts[w]
+            ex, ey = board._ends[w]
+            board._board[sx][sy] = (w + 1) << 8
+            board._board[ex][ey] = (w + 1) << 16
+        return board
+
+    def _flags(self) -> Tuple:
+        targets = self._neighbors[self.heads]  # (B, wires, 4)
+        free = self.owner[self._rows[:, None, None], targets] == 0
+        free |= targets == self.ends[:, :, None]
+        done = self.heads == self.ends
+        free &= ~done[:, :, None]
+        mask = free.reshape(self.batch, self.num_actions)
+        complete = done.all(axis=1) & (self.empty == 0)
+        terminal = complete | ~mask.any(axis=1)
+        return mask, complete, terminal
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-Coord = Tuple[int, int]  # (row, col)
+from .geometry import Coord, grid_geometry
 
 
 @dataclass
@@ -10,17 +10,29 @@ class Board:
     """
     Simple Flow Free board representation.
 
-    - size: board dimension N
-    - grid: N x N list of characters: '.', 'A', 'B', ..., 'W' etc.
-    - terminals: mapping from color_char -> list of terminal coordinates
+    - size: number of rows (the board dimension N for square boards)
+    - grid: size x width list of cells: '.' or a color label ('A', 'B', ...
+      or, in the extended format, any token such as '12')
+    - terminals: mapping from color label -> list of terminal coordinates
+    - width: number of columns; defaults to size
     """
     size: int
     grid: List[List[str]]
     terminals: Dict[str, List[Coord]]
+    width: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.width is None:
+            self.width = self.size
+
+    @property
+    def dimension(self) -> str:
+        """Shape label such as '7x7' or '5x8' (rows x cols)."""
+        return f"{self.size}x{self.width}"
 
     def in_bounds(self, coord: Coord) -> bool:
         r, c = coord
-        return 0 <= r < self.size and 0 <= c < self.size
+        return 0 <= r < self.size and 0 <= c < self.width
 
     def get(self, coord: Coord) -> str:
         r, c = coord
@@ -30,24 +42,19 @@ class Board:
         r, c = coord
         self.grid[r][c] = value
 
-    def neighbors4(self, coord: Coord) -> List[Coord]:
-        """Return the 4-connected neighbors that are in bounds."""
-        r, c = coord
-        candidates = [
-            (r - 1, c),
-            (r, c + 1),
-            (r + 1, c),
-            (r, c - 1),
-        ]
-        return [p for p in candidates if self.in_bounds(p)]
+    def neighbors4(self, coord: Coord) -> Tuple[Coord, ...]:
+        """Return the 4-connected neighbors that are in bounds (cached per size)."""
+        return grid_geometry(self.size, self.width).coord_adjacency[coord]
 
     def pretty_print(self) -> None:
         """Print the board to the console."""
+        cell_width = max((len(color) for color in self.terminals), default=1)
+        sep = "" if cell_width == 1 else " "
         for row in self.grid:
-            print("".join(row))
+            print(sep.join(cell.rjust(cell_width) for cell in row))
         print()
 
     @property
     def colors(self) -> List[str]:
-        """Return a sorted list of color characters present on the board"""
-        return sorted(self.terminals.keys())
+        """Return a sorted list of color labels present on the board ('2' before '10')."""
+        return sorted(self.terminals.keys(), key=lambda color: (len(color), color))
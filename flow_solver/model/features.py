@@ -0,0 +1,102 @@
+from __future__ import annotations
+from dataclasses import astuple, dataclass, fields
+from typing import List
+
+from .board import Board
+from .geometry import grid_geometry
+
+
+@dataclass
+class BoardFeatures:
+    """
+    Cheap, solver-independent description of a puzzle (one pass over the grid).
+
+    - rows / cols / cells / colors: shape and number of colors
+    - empty_fraction: share of cells that start empty
+    - cells_per_color: cells / colors
+    - mean_distance / max_distance: Manhattan distance between the two
+      terminals of a color, averaged / maximum over colors
+    - detour_fraction: share of empty cells not covered by the colors'
+      shortest paths (sum of distances); high means long, winding paths
+    - border_terminals: share of terminals on the board's edge
+    - regions: number of 4-connected empty regions
+    - largest_region: share of empty cells in the largest region
+    - narrow_cells: share of empty cells with at most two empty neighbors
+      (corners, corridors and cells hemmed in by terminals)
+    """
+    rows: int
+    cols: int
+    cells: int
+    colors: int
+    empty_fraction: float
+    cells_per_color: float
+    mean_distance: float
+    max_distance: int
+    detour_fraction: float
+    border_terminals: float
+    regions: int
+    largest_region: float
+    narrow_cells: float
+
+    def as_vector(self) -> List[float]:
+        """Values in FEATURE_NAMES order."""
+        return [float(value) for value in astuple(self)]
+
+
+FEATURE_NAMES = tuple(f.name for f in fields(BoardFeatures))
+
+
+def extract_features(board: Board) -> BoardFeatures:
+    geometry = grid_geometry(board.size, board.width)
+    cells = geometry.num_cells
+    empty = [board.grid[r][c] == '.' for r, c in geometry.coords]
+    num_empty = sum(empty)
+
+    distances = [
+        abs(terminals[0][0] - terminals[1][0]) + abs(terminals[0][1] - terminals[1][1])
+        for terminals in board.terminals.values()
+        if len(terminals) == 2
+    ]
+    terminals = [coord for coords in board.terminals.values() for coord in coords]
+    on_border = sum(geometry.border[geometry.index(coord)] for coord in terminals)
+
+    # Empty regions by flood fill over the flat adjacency table
+    region_sizes: List[int] = []
+    seen = [False] * cells
+    for start in range(cells):
+        if not empty[start] or seen[start]:
+            continue
+        seen[start] = True
+        stack = [start]
+        size = 0
+        while stack:
+            idx = stack.pop()
+            size += 1
+            for nb in geometry.adjacency[idx]:
+                if empty[nb] and not seen[nb]:
+                    seen[nb] = True
+                    stack.append(nb)
+        region_sizes.append(size)
+
+    narrow = sum(
+        1
+        for idx in range(cells)
+        if empty[idx] and sum(empty[nb] for nb in geometry.adjacency[idx]) <= 2
+    )
+
+    num_colors = len(board.terminals)
+    return BoardFeatures(
+        rows=board.size,
+        cols=board.width,
+        cells=cells,
+        colors=num_colors,
+        empty_fraction=num_empty / cells,
+        cells_per_color=cells / num_colors if num_colors else float(cells),
+        mean_distance=sum(distances) / len(distances) if distances else 0.0,
+        max_distance=max(distances, default=0),
+        detour_fraction=max(0.0, 1 - sum(distances) / num_empty) if num_empty else 0.0,
+        border_terminals=on_border / len(terminals) if terminals else 0.0,
+        regions=len(region_sizes),
+        largest_region=max(region_sizes, default=0) / num_empty if num_empty else 0.0,
+        narrow_cells=narrow / num_empty if num_empty else 0.0,
+    )
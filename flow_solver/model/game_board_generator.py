@@ -1,6 +1,13 @@
 import random
 from flow_solver.model.board import Board
 
+GEN_ITERATIONS = 300 # Fewest wire-growing iterations for any board
+GEN_ITERATIONS_PER_CELL = 6 # Larger boards get more, so their wires do not stay long straight snakes
+
+
+def defaultIterations(dim):
+    return max(GEN_ITERATIONS, GEN_ITERATIONS_PER_CELL * dim * dim)
+
 
 # Warning: I use "Node" and "Terminal" kinda interchangably in the code here, because I can't keep a consistent vocabulary to save my life
 # All function names and arguments will use "Terminal" though, to be consistent with our lab-writeup
@@ -35,6 +42,8 @@ class GameBoard:
         numWires: the number of wires to populate the board
             NOTE: Due to limitations on the algorithm I'm porting over here,
             this won't work where numWires > dim. I'm working on a solution
+        iterations: how many times to randomly grow the wires (see
+            shuffleWires); defaults to defaultIterations(dim)
 
 
     Returns a tuple:
@@ -49,7 +58,7 @@ class GameBoard:
     Oops.
     """
     
-    def newGameBoard(dim, numWires):
+    def newGameBoard(dim, numWires, iterations=None):
         assert(dim > 3 and dim < 254 and numWires > 1 and numWires < 254)
         # Making these lambdas to save time, prevent clutter, and reduce chances of accidental function overload
         _toSBI = lambda x: x >> 16 if x > 65535 else x >> 8 # "To Single-Bit-Identifier"
@@ -99,7 +108,28 @@ class GameBoard:
             solvedBoard._board[dim - 1][dim - 1] = _toEI(numWires)
    
         
-        GEN_ITERATIONS = 300 # Total number of iterations to be run during this phase
+        solvedBoard._wires = wires
+        solvedBoard.shuffleWires(iterations if iterations is not None else defaultIterations(dim))
+        return (solvedBoard, solvedBoard.cleanCopy())
+
+    """
+    Randomly grows and shrinks the wires of a solved board, keeping it
+    solved (full, every wire connected). newGameBoard runs this on its
+    initial straight wires; running it again on a solved board mutates
+    the puzzle.
+
+    Arguments:
+        iterations: the number of grow attempts
+    """
+    def shuffleWires(self, iterations):
+        solvedBoard = self
+        dim = self._dim
+        numWires = self._numWires
+        wires = self._wires
+        _toSBI = lambda x: x >> 16 if x > 65535 else x >> 8 # "To Single-Bit-Identifier"
+        _toSI = lambda x : x << 8 # "To Start-Identifier"
+        _toEI = lambda x : x << 16 # "To End-Identifier"
+
         SHRINK_THRESHOLD = 4
 
         # Some more lambdas
@@ -111,7 +141,7 @@ class GameBoard:
         _isFree = lambda c: c[0] >= 0 and c[0] < dim and c[1] >= 0 and c[1] < dim and _isMovable(c)
         
        
-        for iteration in range(GEN_ITERATIONS):
+        for iteration in range(iterations):
             chosenWire = random.randint(0, numWires - 1) # The wire we are altering this run
             wireCode = chosenWire + 1 # Account for our 1-indexed encoding scheme
             # Grow our selected wire
@@ -176,12 +206,10 @@ class GameBoard:
                 wires[chosenWire].append(frontier)
                 solvedBoard._board[nodeX][nodeY] = wireCode
                 solvedBoard._board[frontier[0]][frontier[1]] = _toEI(wireCode)
-  
-        
-        solvedBoard._wires = [w[::] for w in wires]
-        solvedBoard._starts = [w[0] for w in wires]
-        solvedBoard._ends = [w[-1] for w in wires]
-        return (solvedBoard, solvedBoard.cleanCopy())
+
+        self._wires = [w[::] for w in wires]
+        self._starts = [w[0] for w in wires]
+        self._ends = [w[-1] for w in wires]
 
     """
     Creates a "clean" copy, one with no wires; only start/endpoints
@@ -212,7 +240,7 @@ class GameBoard:
     """
     def copy(self):
         newBoard = GameBoard(self._dim)
-        cleanBoard._board = [b[::] for b in self._board[::]]
+        newBoard._board = [b[::] for b in self._board[::]]
         newBoard._starts = self._starts[::]
         newBoard._ends = self._ends[::]
         newBoard._numWires = self._numWires
@@ -487,9 +515,11 @@ class GameBoard:
         grid = [["." for _ in range(self._dim)] for _ in range(self._dim)]
         terminals = {}
         
-        # Mark terminals with their corresponding letters
+        # Mark terminals with their corresponding labels: letters while they
+        # last (A for wire 0, B for wire 1, etc.), numbers 1..N beyond 26 wires
+        # (saved in the extended puzzle format)
         for wireIndex in range(self._numWires):
-            letter = chr(ord('A') + wireIndex)  # A for wire 0, B for wire 1, etc.
+            letter = chr(ord('A') + wireIndex) if self._numWires <= 26 else str(wireIndex + 1)
             terminals[letter] = []
             
             # Mark start terminal
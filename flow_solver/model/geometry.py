@@ -0,0 +1,70 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+Coord = Tuple[int, int]  # (row, col)
+
+
+@dataclass(frozen=True)
+class GridGeometry:
+    """
+    Precomputed layout of a rows x cols grid, shared by every board of that
+    shape.
+
+    - size: number of rows
+    - width: number of columns (equal to size for square boards)
+
+    Cells are numbered 0..size*width-1 in row-major order (index = r * width + c).
+
+    - coords: index -> (row, col)
+    - adjacency: index -> indices of the 4-connected neighbors
+    - coord_adjacency: (row, col) -> coordinates of the 4-connected neighbors
+    - border: index -> True if the cell lies on the outer edge
+
+    Neighbors are always listed up, right, down, left.
+    """
+    size: int
+    width: int
+    coords: Tuple[Coord, ...]
+    adjacency: Tuple[Tuple[int, ...], ...]
+    coord_adjacency: Dict[Coord, Tuple[Coord, ...]]
+    border: Tuple[bool, ...]
+
+    @property
+    def num_cells(self) -> int:
+        return self.size * self.width
+
+    def index(self, coord: Coord) -> int:
+        return coord[0] * self.width + coord[1]
+
+
+def grid_geometry(size: int, width: Optional[int] = None) -> GridGeometry:
+    """Geometry tables for a size x width grid (width defaults to size), built once per shape."""
+    return _grid_geometry(size, size if width is None else width)
+
+
+@lru_cache(maxsize=None)
+def _grid_geometry(size: int, width: int) -> GridGeometry:
+    coords = tuple((r, c) for r in range(size) for c in range(width))
+
+    coord_adjacency: Dict[Coord, Tuple[Coord, ...]] = {}
+    for r, c in coords:
+        candidates = ((r - 1, c), (r, c + 1), (r + 1, c), (r, c - 1))
+        coord_adjacency[(r, c)] = tuple(
+            (nr, nc) for nr, nc in candidates if 0 <= nr < size and 0 <= nc < width
+        )
+
+    adjacency = tuple(
+        tuple(nr * width + nc for nr, nc in coord_adjacency[coord]) for coord in coords
+    )
+    border = tuple(r in (0, size - 1) or c in (0, width - 1) for r, c in coords)
+
+    return GridGeometry(
+        size=size,
+        width=width,
+        coords=coords,
+        adjacency=adjacency,
+        coord_adjacency=coord_adjacency,
+        border=border,
+    )
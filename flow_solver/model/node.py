@@ -1,6 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from .board import Board
 
@@ -13,11 +13,19 @@ class Node:
     board: Board = field(compare=False)
     positions: Dict[str, Coord] = field(compare=False)  # color -> current head position
     dirs: List[List[int]] = field(compare=False)
+    # color -> BFS distance field from that color's goal (see distance_fields)
+    dist_fields: Optional[Dict[str, List[List[int]]]] = field(default=None, compare=False)
+    last_move: Optional[Coord] = field(default=None, compare=False)  # cell filled to reach this node
+    bits: Optional[Any] = field(default=None, compare=False)  # BitboardState with the bitboard engine
+    zobrist: int = field(default=0, compare=False)  # state hash, only kept by traced searches
 
     def pretty_print(self) -> None:
         grid = self.board.grid
         size = self.board.size
+        width = self.board.width
         dirs = self.dirs
+        # Multi-character labels (extended format) get equally wide cells.
+        cell_width = max((len(color) for color in self.board.terminals), default=1)
 
         terminal_sets: Dict[str, set[Coord]] = {
             color: set(coords) for color, coords in self.board.terminals.items()
@@ -42,7 +50,7 @@ class Node:
         reset = "\033[0m"
 
         def is_connected(r: int, c: int, nr: int, nc: int, color: str, idx: int) -> bool:
-            if nr < 0 or nr >= size or nc < 0 or nc >= size: #check bounds
+            if nr < 0 or nr >= size or nc < 0 or nc >= width: #check bounds
                 return False
             if grid[nr][nc] != color:
                 return False
@@ -74,12 +82,12 @@ class Node:
 
         for r in range(size):
             parts: List[str] = []
-            for c in range(size):
+            for c in range(width):
                 ch = grid[r][c]
                 idx = dirs[r][c]
 
                 if ch == ".":
-                    parts.append(".")
+                    parts.append(".".rjust(cell_width))
                     continue
 
                 color = ch
@@ -88,7 +96,7 @@ class Node:
                 # Check if this is a terminal (start or end) - show letter character
                 is_terminal = (r, c) in terminal_sets.get(color, set())
                 if is_terminal:
-                    parts.append(f"{color_code}{ch}{reset}")
+                    parts.append(f"{color_code}{ch.rjust(cell_width)}{reset}")
                     continue
 
                 # Interior pipe segment
@@ -98,14 +106,17 @@ class Node:
                 right = is_connected(r, c, r, c + 1, color, idx)
 
                 ch_pipe = pipe_char(up, down, left, right, color)
+                if cell_width > 1:
+                    pad = "─" if left else " "
+                    ch_pipe = pad * (cell_width - 1) + ch_pipe
                 parts.append(f"{color_code}{ch_pipe}{reset}")
 
             # Fill gaps between horizontally connected cells
             line_segments: List[str] = []
-            for c in range(size):
+            for c in range(width):
                 line_segments.append(parts[c])
 
-                if c < size - 1:
+                if c < width - 1:
                     gap = " "
 
                     # Check if cells (r, c) and (r, c+1) are part of the same horizontal pipe
@@ -130,3 +141,22 @@ class Node:
                     line_segments.append(gap)
 
             print("".join(line_segments))
+
+
+@dataclass(order=True, slots=True)
+class DeltaNode:
+    """
+    Search state stored as a single move on top of its parent.
+
+    Only the move (color, cell, previous head) and the Zobrist hash of the
+    resulting state are kept, so each node costs O(1) memory. The board is
+    rebuilt by replaying moves through a BoardCursor.
+    """
+    f: int
+    g: int = field(compare=False)
+    parent: Optional[DeltaNode] = field(compare=False)
+    color: Optional[str] = field(compare=False)      # None for the root
+    cell: Optional[Coord] = field(compare=False)      # cell the head moved into
+    prev_head: Optional[Coord] = field(compare=False)  # head position before the move
+    zobrist: int = field(compare=False)
+    depth: int = field(compare=False)
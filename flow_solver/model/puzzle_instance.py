@@ -0,0 +1,66 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List
+
+from .board import Board, Coord
+from .geometry import GridGeometry, grid_geometry
+
+
+@dataclass
+class PuzzleInstance:
+    """
+    Compiled form of a puzzle, shared by the solvers.
+
+    - board: the working board (solvers may fill it in)
+    - colors: sorted color characters
+    - starts / goals: color -> terminal coordinate (first / second terminal)
+    - geometry: cached cell numbering and adjacency for this board size
+    - start_index / goal_index: color -> flat cell index of the terminal
+    - goal_cells / terminal_cells: flat indices of all goals / all terminals
+    """
+    board: Board
+    colors: List[str]
+    starts: Dict[str, Coord]
+    goals: Dict[str, Coord]
+    geometry: GridGeometry
+    start_index: Dict[str, int]
+    goal_index: Dict[str, int]
+    goal_cells: FrozenSet[int]
+    terminal_cells: FrozenSet[int]
+
+
+def build_puzzle_instance(board: Board) -> PuzzleInstance:
+    """
+    Prepare a puzzle for search:
+    - For each color, pick one terminal as start, the other as goal.
+    - Attach the geometry tables for the board shape (built once per shape).
+    """
+    colors = board.colors[:]
+    starts: Dict[str, Coord] = {}
+    goals: Dict[str, Coord] = {}
+
+    for color in colors:
+        terminals = board.terminals[color]
+        if len(terminals) != 2:
+            raise ValueError(
+                f"Color {color} has {len(terminals)} terminals, expected exactly 2"
+            )
+        # Simple choice: first is start, second is goal
+        starts[color] = terminals[0]
+        goals[color] = terminals[1]
+
+    geometry = grid_geometry(board.size, board.width)
+    start_index = {color: geometry.index(coord) for color, coord in starts.items()}
+    goal_index = {color: geometry.index(coord) for color, coord in goals.items()}
+
+    return PuzzleInstance(
+        board=board,
+        colors=colors,
+        starts=starts,
+        goals=goals,
+        geometry=geometry,
+        start_index=start_index,
+        goal_index=goal_index,
+        goal_cells=frozenset(goal_index.values()),
+        terminal_cells=frozenset(start_index.values()) | frozenset(goal_index.values()),
+    )
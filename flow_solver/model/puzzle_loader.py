@@ -14,15 +14,11 @@ class RawPuzzle:
 
 def load_puzzle_from_file(path: str) -> RawPuzzle:
     with open(path, "r", encoding="utf-8") as f:
-        lines = [line.rstrip("\n") for line in f if line.strip()]
+        lines = [line.rstrip() for line in f if line.strip()]
 
     if not lines:
         raise ValueError(f"Puzzle file {path} is empty")
 
-    row_len = len(lines[0])
-    if any(len(row) != row_len for row in lines):
-        raise ValueError(f"Puzzle file {path} has non-rectangular grid")
-
     name = path.split("/")[-1]
     return RawPuzzle(name=name, grid_lines=lines)
 
@@ -31,34 +27,60 @@ def parse_raw_puzzle(raw: RawPuzzle) -> Board:
     """
     Convert a RawPuzzle into a Board.
 
-    Conventions:
+    Two formats are accepted; every row must have the same number of cells,
+    but the grid need not be square.
+
+    Classic (one character per cell, e.g. "A..B"):
     - '.' means empty.
-    - Any uppercase letter [A-Z] is treated as a color terminal.
-      Pairs of the same letter are the two endpoints of that color.
-    - Later we can reserve a special character (e.g., 'W') for wildcard nodes.
+    - Any letter or digit is a color terminal; letters are case-insensitive.
+      Pairs of the same character are the two endpoints of that color.
+
+    Extended (cells separated by whitespace, e.g. "1 . . 27"):
+    - '.' means empty.
+    - Any other alphanumeric token is a color label, so boards can have more
+      than 26 colors (e.g. numbered 1..N).
     """
-    grid_lines = raw.grid_lines
-    size = len(grid_lines)
+    grid_lines = [line.strip() for line in raw.grid_lines]
+    extended = any(len(line.split()) > 1 for line in grid_lines)
 
     grid: List[List[str]] = []
     terminals: dict[str, List[Coord]] = {}
 
     for r, line in enumerate(grid_lines):
-        row_chars = list(line)
-        if len(row_chars) != size:
+        cells = line.split() if extended else list(line)
+        if grid and len(cells) != len(grid[0]):
             raise ValueError(
-                f"row {r} has length {len(row_chars)} != {size}"
+                f"{raw.name}: row {r} has {len(cells)} cells, expected {len(grid[0])}"
             )
-        grid.append(row_chars)
 
-        for c, ch in enumerate(row_chars):
-            if ch == '.':
+        row: List[str] = []
+        for c, cell in enumerate(cells):
+            if cell == '.':
+                row.append(cell)
                 continue
-            if ch.isalpha():
-                color = ch.upper()
-                if color not in terminals:
-                    terminals[color] = []
-                terminals[color].append((r, c))
+            if not cell.isalnum():
+                raise ValueError(f"{raw.name}: invalid cell {cell!r} at row {r}, column {c}")
+            color = cell if extended else cell.upper()
+            terminals.setdefault(color, []).append((r, c))
+            row.append(color)
+        grid.append(row)
 
-    board = Board(size=size, grid=grid, terminals=terminals)
+    board = Board(size=len(grid), grid=grid, terminals=terminals, width=len(grid[0]))
     return board
+
+
+def format_puzzle(board: Board) -> List[str]:
+    """
+    Puzzle rows in the classic format when every color is a single
+    character, otherwise in the extended whitespace-separated format.
+    """
+    cell_width = max((len(color) for color in board.terminals), default=1)
+    if cell_width == 1:
+        return ["".join(row) for row in board.grid]
+    return [" ".join(cell.rjust(cell_width) for cell in row) for row in board.grid]
+
+
+def save_puzzle_to_file(board: Board, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for line in format_puzzle(board):
+            f.write(line + "\n")
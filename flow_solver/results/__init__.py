@@ -0,0 +1,13 @@
+"""
+Results layer: persisted solver runs.
+
+Modules:
+- store: SQLite store of per-puzzle results keyed by puzzle, solver and config.
+- report: percentile/histogram summaries and JSON/CSV export.
+- difficulty: per-run cost models trained on stored results.
+"""
+
+from .store import ResultStore, StoredResult, config_hash, puzzle_hash
+from .difficulty import DifficultyModel
+
+__all__ = ["DifficultyModel", "ResultStore", "StoredResult", "config_hash", "puzzle_hash"]
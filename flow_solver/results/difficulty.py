@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from flow_solver.model import FEATURE_NAMES, Board, BoardFeatures, extract_features
+
+from .store import ResultStore, StoredResult, puzzle_hash
+
+"""
+Difficulty prediction from stored results:
+- Each stored run (solver + config) gets two ridge regressions over the
+  standardized board features: log10 states expanded and log10 seconds.
+  Search cost grows roughly exponentially with the board, so a linear
+  model in log space is a reasonable fit and cheap to evaluate.
+- Results cut short by a budget are kept with their partial cost, so a
+  run's predictions for puzzles like those are lower bounds.
+- Models are saved as JSON next to the result store they came from.
+"""
+
+MIN_SAMPLES = 8
+RIDGE = 1.0
+
+
+@dataclass
+class RunModel:
+    """
+    Cost model of one run.
+
+    - states_coef / time_coef: intercept, then one weight per feature
+      (FEATURE_NAMES order, standardized), predicting log10 values
+    - time_error: RMS residual of log10 seconds on the training set
+    - solved_rate: share of training puzzles the run solved
+    """
+    solver: str
+    config_json: str
+    samples: int
+    solved_rate: float
+    states_coef: List[float]
+    time_coef: List[float]
+    time_error: float
+
+
+@dataclass
+class Prediction:
+    run: str
+    solver: str
+    config_json: str
+    states: float
+    seconds: float
+    solved_rate: float
+
+
+class DifficultyModel:
+    """
+    Per-run cost predictions for a board.
+
+    `runs` is keyed like query_results: 'solver:config_hash'.
+    """
+
+    def __init__(self, means: List[float], scales: List[float], runs: Dict[str, RunModel]):
+        self.means = means
+        self.scales = scales
+        self.runs = runs
+
+    @classmethod
+    def train(
+        cls,
+        samples: Sequence[Tuple[BoardFeatures, StoredResult]],
+        min_samples: int = MIN_SAMPLES,
+    ) -> DifficultyModel:
+        """Fit every run with at least `min_samples` results."""
+        if not samples:
+            raise ValueError("no training samples")
+        vectors = [features.as_vector() for features, _ in samples]
+        means = [sum(column) / len(column) for column in zip(*vectors)]
+        scales = [
+            math.sqrt(sum((v - m) ** 2 for v in column) / len(column)) or 1.0
+            for column, m in zip(zip(*vectors), means)
+        ]
+        model = cls(means, scales, {})
+
+        by_run: Dict[str, List[Tuple[List[float], StoredResult]]] = {}
+        for vector, (_, result) in zip(vectors, samples):
+            by_run.setdefault(f"{result.solver}:{result.config_hash}", []).append((vector, result))
+
+        for run, rows in by_run.items():
+            if len(rows) < min_samples:
+                continue
+            x = [model._standardize(vector) for vector, _ in rows]
+            states = [math.log10(r.states_expanded + 1) for _, r in rows]
+            seconds = [math.log10(max(r.time_seconds, 1e-6)) for _, r in rows]
+            time_coef = _ridge_fit(x, seconds)
+            residuals = [_dot(time_coef, xi) - yi for xi, yi in zip(x, seconds)]
+            first = rows[0][1]
+            model.runs[run] = RunModel(
+                solver=first.solver,
+                config_json=first.config_json,
+                samples=len(rows),
+                solved_rate=sum(r.solved for _, r in rows) / len(rows),
+                states_coef=_ridge_fit(x, states),
+                time_coef=time_coef,
+                time_error=math.sqrt(sum(e * e for e in residuals) / len(residuals)),
+            )
+        if not model.runs:
+            raise ValueError(f"no run has {min_samples} or more results")
+        return model
+
+    @classmethod
+    def train_from_store(
+        cls,
+        store: ResultStore,
+        boards: Iterable[Board],
+        min_samples: int = MIN_SAMPLES,
+    ) -> DifficultyModel:
+        """Fit on every stored result whose puzzle is among `boards`."""
+        features = {puzzle_hash(board): extract_features(board) for board in boards}
+        samples = [(features[r.puzzle_hash], r) for r in store.query() if r.puzzle_hash in features]
+        return cls.train(samples, min_samples)
+
+    def predict(self, board: Union[Board, BoardFeatures]) -> List[Prediction]:
+        """One prediction per run, fastest first."""
+        features = board if isinstance(board, BoardFeatures) else extract_features(board)
+        x = self._standardize(features.as_vector())
+        predictions = [
+            Prediction(
+                run=run,
+                solver=m.solver,
+                config_json=m.config_json,
+                states=10 ** _dot(m.states_coef, x),
+                seconds=10 ** _dot(m.time_coef, x),
+                solved_rate=m.solved_rate,
+            )
+            for run, m in self.runs.items()
+        ]
+        return sorted(predictions, key=lambda p: p.seconds)
+
+    def save(self, path: str) -> None:
+        payload = {
+            "features": list(FEATURE_NAMES),
+            "means": self.means,
+            "scales": self.scales,
+            "runs": {run: asdict(m) for run, m in self.runs.items()},
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> DifficultyModel:
+        with open(path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload["features"] != list(FEATURE_NAMES):
+            raise ValueError(f"{path} was trained on different features; retrain it")
+        runs = {run: RunModel(**m) for run, m in payload["runs"].items()}
+        return cls(payload["means"], payload["scales"], runs)
+
+    def _standardize(self, vector: List[float]) -> List[float]:
+        return [1.0] + [(v - m) / s for v, m, s in zip(vector, self.means, self.scales)]
+
+
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _ridge_fit(x: List[List[float]], y: List[float], ridge: float = RIDGE) -> List[float]:
+    """
+    Least squares with an L2 penalty on every weight but the intercept:
+    solves (X^T X + ridge * I) w = X^T y by Gaussian elimination.
+    """
+    n = len(x[0])
+    a = [[_dot([row[i] for row in x], [row[j] for row in x]) for j in range(n)] for i in range(n)]
+    for i in range(1, n):
+        a[i][i] += ridge
+    b = [_dot([row[i] for row in x], y) for i in range(n)]
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        a[col], a[pivot] = a[pivot], a[col]
+        b[col], b[pivot] = b[pivot], b[col]
+        for r in range(col + 1, n):
+            factor = a[r][col] / a[col][col]
+            for c in range(col, n):
+                a[r][c] -= factor * a[col][c]
+            b[r] -= factor * b[col]
+
+    w = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        w[r] = (b[r] - _dot(a[r][r + 1:], w[r + 1:])) / a[r][r]
+    return w
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import csv
+import dataclasses
+import json
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from .store import StoredResult
+
+"""
+Distribution reports over per-puzzle results:
+- Percentiles (p50/p90/p99/max) of time, states and open-list memory per
+  dimension, because corpus timings are heavy-tailed and the mean hides
+  the puzzles that matter.
+- Log-spaced histograms and the slowest puzzles of each dimension.
+- Export as JSON (summaries + histograms + per-puzzle rows) or CSV
+  (per-puzzle rows only).
+"""
+
+PERCENTILES = (50, 90, 99)
+HISTOGRAM_BINS = 12
+
+# Metrics reported per dimension: name -> how to read it from a result
+METRICS = {
+    "time_seconds": lambda r: r.time_seconds,
+    "states_expanded": lambda r: r.states_expanded,
+    "open_list_bytes": lambda r: r.peak_open_nodes * r.open_entry_bytes,
+}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """q-th percentile (0..100) with linear interpolation between ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lo = math.floor(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
+
+
+@dataclass
+class Distribution:
+    count: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+    # (low edge, high edge, count) per bin
+    histogram: List[Tuple[float, float, int]] = field(default_factory=list)
+
+
+def distribution(values: Sequence[float], bins: int = HISTOGRAM_BINS) -> Distribution:
+    if not values:
+        return Distribution(count=0, mean=0.0, p50=0.0, p90=0.0, p99=0.0, max=0.0)
+    p50, p90, p99 = (percentile(values, q) for q in PERCENTILES)
+    return Distribution(
+        count=len(values),
+        mean=sum(values) / len(values),
+        p50=p50,
+        p90=p90,
+        p99=p99,
+        max=max(values),
+        histogram=log_histogram(values, bins),
+    )
+
+
+def log_histogram(values: Sequence[float], bins: int = HISTOGRAM_BINS) -> List[Tuple[float, float, int]]:
+    """
+    Histogram with logarithmically spaced edges from the smallest positive
+    value to the largest; zeros fall into the first bin.
+    """
+    positive = [v for v in values if v > 0]
+    if not positive:
+        return [(0.0, 0.0, len(values))]
+    lo, hi = math.log10(min(positive)), math.log10(max(positive))
+    if hi == lo:
+        return [(10 ** lo, 10 ** hi, len(values))]
+    width = (hi - lo) / bins
+    edges = [10 ** (lo + i * width) for i in range(bins + 1)]
+    counts = [0] * bins
+    for v in values:
+        i = 0 if v <= 0 else min(int((math.log10(v) - lo) / width), bins - 1)
+        counts[i] += 1
+    return [(edges[i], edges[i + 1], counts[i]) for i in range(bins)]
+
+
+@dataclass
+class DimensionReport:
+    """
+    Distributions for one dimension.
+
+    - metrics: metric name -> Distribution over every attempted puzzle
+    - slowest: (puzzle name, seconds, states, solved) for the slowest puzzles
+    """
+    dimension: str
+    puzzles: int
+    solved: int
+    metrics: Dict[str, Distribution]
+    slowest: List[Tuple[str, float, int, bool]]
+
+
+def build_reports(results: Sequence[StoredResult], slowest: int = 5) -> List[DimensionReport]:
+    """One DimensionReport per dimension, smallest boards first."""
+    groups: Dict[str, List[StoredResult]] = defaultdict(list)
+    for result in results:
+        groups[result.dimension].append(result)
+
+    reports = []
+    for dim in sorted(groups, key=lambda d: (len(d), d)):
+        group = groups[dim]
+        by_time = sorted(group, key=lambda r: r.time_seconds, reverse=True)[:slowest]
+        reports.append(DimensionReport(
+            dimension=dim,
+            puzzles=len(group),
+            solved=sum(r.solved for r in group),
+            metrics={name: distribution([read(r) for r in group]) for name, read in METRICS.items()},
+            slowest=[(r.puzzle_name, r.time_seconds, r.states_expanded, r.solved) for r in by_time],
+        ))
+    return reports
+
+
+def format_report(report: DimensionReport) -> List[str]:
+    """Text lines for a console summary of one dimension."""
+    lines = [f"{'metric':>16}{'p50':>12}{'p90':>12}{'p99':>12}{'max':>12}"]
+    for name, dist in report.metrics.items():
+        lines.append(
+            f"{name:>16}" + "".join(f"{v:>12.4g}" for v in (dist.p50, dist.p90, dist.p99, dist.max))
+        )
+    if report.slowest:
+        lines.append("slowest: " + ", ".join(f"{name} {secs:.3f}s" for name, secs, _, _ in report.slowest))
+    return lines
+
+
+def export_json(path: str, results: Sequence[StoredResult], slowest: int = 5) -> None:
+    payload = {
+        "dimensions": [dataclasses.asdict(r) for r in build_reports(results, slowest)],
+        "results": [dataclasses.asdict(r) for r in results],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def export_csv(path: str, results: Sequence[StoredResult]) -> None:
+    columns = [f.name for f in dataclasses.fields(StoredResult)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for result in results:
+            writer.writerow([getattr(result, name) for name in columns])
+
+
+def export(path: str, results: Sequence[StoredResult], slowest: int = 5) -> None:
+    """Write `results` as CSV if `path` ends in .csv, otherwise as JSON."""
+    if path.lower().endswith(".csv"):
+        export_csv(path, results)
+    else:
+        export_json(path, results, slowest)
+
+
+def load_export(path: str) -> List[StoredResult]:
+    """Read the per-puzzle rows back from a JSON or CSV export."""
+    if path.lower().endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        types = {f.name: f.type for f in dataclasses.fields(StoredResult)}
+        return [StoredResult(**{k: _parse_csv(v, types[k]) for k, v in row.items()}) for row in rows]
+    with open(path, encoding="utf-8") as f:
+        return [StoredResult(**row) for row in json.load(f)["results"]]
+
+
+def _parse_csv(text: str, type_name: str):
+    # Field types are strings here because of `from __future__ import annotations`.
+    if type_name == "bool":
+        return text == "True"
+    if type_name == "int":
+        return int(text)
+    if type_name == "float":
+        return float(text)
+    if type_name == "Optional[str]":
+        return text or None
+    return text
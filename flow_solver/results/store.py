@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from flow_solver.model import Board, format_puzzle
+
+"""
+Persistent result store:
+- One SQLite row per (puzzle content hash, solver name, config hash).
+- Each result is committed as soon as it is written, so an interrupted
+  corpus run loses at most the puzzle it was solving and resumes by
+  skipping everything already stored.
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    puzzle_hash TEXT NOT NULL,
+    solver TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    puzzle_name TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    config_json TEXT NOT NULL,
+    solved INTEGER NOT NULL,
+    stop_reason TEXT,
+    states_expanded INTEGER NOT NULL,
+    time_seconds REAL NOT NULL,
+    peak_memory_bytes INTEGER NOT NULL,
+    peak_open_nodes INTEGER NOT NULL,
+    open_entry_bytes INTEGER NOT NULL,
+    peak_rss_bytes INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (puzzle_hash, solver, config_hash)
+)
+"""
+
+ResultKey = Tuple[str, str, str]
+
+
+def puzzle_hash(puzzle: Union[Board, Sequence[str]]) -> str:
+    """Content hash of a puzzle's grid (independent of its file name)."""
+    rows = format_puzzle(puzzle) if isinstance(puzzle, Board) else list(puzzle)
+    return hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest()[:16]
+
+
+def config_json(config: Any) -> str:
+    """
+    Canonical JSON of a solver config (a dataclass such as SearchConfig, a
+    dict, or None). Dataclass fields left at their defaults are omitted, so
+    adding a new option does not change the hash of existing configs.
+    """
+    if config is None:
+        data: Dict[str, Any] = {}
+    elif dataclasses.is_dataclass(config):
+        data = {
+            f.name: getattr(config, f.name)
+            for f in dataclasses.fields(config)
+            if f.default is dataclasses.MISSING or getattr(config, f.name) != f.default
+        }
+    else:
+        data = dict(config)
+    return json.dumps(data, sort_keys=True, separators=(",", ":"))
+
+
+def config_hash(config: Any) -> str:
+    return hashlib.sha256(config_json(config).encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class StoredResult:
+    """One stored solve; the stats fields mirror heuristic_solver.SearchStats."""
+    puzzle_hash: str
+    solver: str
+    config_hash: str
+    puzzle_name: str
+    dimension: str
+    config_json: str
+    solved: bool
+    stop_reason: Optional[str]
+    states_expanded: int
+    time_seconds: float
+    peak_memory_bytes: int = 0
+    peak_open_nodes: int = 0
+    open_entry_bytes: int = 0
+    peak_rss_bytes: int = 0
+    recorded_at: float = 0.0
+
+    @property
+    def key(self) -> ResultKey:
+        return self.puzzle_hash, self.solver, self.config_hash
+
+    @classmethod
+    def from_stats(
+        cls,
+        board: Board,
+        puzzle_name: str,
+        solver: str,
+        config: Any,
+        stats: Any,
+    ) -> StoredResult:
+        """Build a result from a SearchStats-like object."""
+        return cls(
+            puzzle_hash=puzzle_hash(board),
+            solver=solver,
+            config_hash=config_hash(config),
+            puzzle_name=puzzle_name,
+            dimension=board.dimension,
+            config_json=config_json(config),
+            solved=bool(stats.solved),
+            stop_reason=getattr(stats, "stop_reason", None),
+            states_expanded=stats.states_expanded,
+            time_seconds=stats.time_seconds,
+            peak_memory_bytes=stats.peak_memory_bytes,
+            peak_open_nodes=getattr(stats, "peak_open_nodes", 0),
+            open_entry_bytes=getattr(stats, "open_entry_bytes", 0),
+            peak_rss_bytes=getattr(stats, "peak_rss_bytes", 0),
+            recorded_at=time.time(),
+        )
+
+
+_COLUMNS = [f.name for f in dataclasses.fields(StoredResult)]
+
+
+class ResultStore:
+    """
+    SQLite-backed store of StoredResult rows.
+
+    Usable as a context manager; `path` may be ':memory:' for a throwaway store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS results_by_run ON results (solver, config_hash, dimension)")
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> ResultStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get(self, puzzle_hash: str, solver: str, config_hash: str) -> Optional[StoredResult]:
+        row = self.conn.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM results WHERE puzzle_hash = ? AND solver = ? AND config_hash = ?",
+            (puzzle_hash, solver, config_hash),
+        ).fetchone()
+        return _from_row(row) if row is not None else None
+
+    def put(self, result: StoredResult) -> None:
+        """Insert or replace `result` and commit right away."""
+        values = [getattr(result, name) for name in _COLUMNS]
+        values[_COLUMNS.index("solved")] = int(result.solved)
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO results ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            values,
+        )
+        self.conn.commit()
+
+    def query(
+        self,
+        solver: Optional[str] = None,
+        config_hash: Optional[str] = None,
+        dimension: Optional[str] = None,
+    ) -> List[StoredResult]:
+        """Stored results, optionally filtered, ordered by dimension and puzzle name."""
+        where, params = [], []
+        for column, value in (("solver", solver), ("config_hash", config_hash), ("dimension", dimension)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM results"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY length(dimension), dimension, puzzle_name"
+        return [_from_row(row) for row in self.conn.execute(sql, params)]
+
+    def runs(self) -> List[Tuple[str, str, str, int]]:
+        """Distinct (solver, config_hash, config_json, result count), most results first."""
+        return list(self.conn.execute(
+            "SELECT solver, config_hash, config_json, COUNT(*) FROM results "
+            "GROUP BY solver, config_hash ORDER BY COUNT(*) DESC"
+        ))
+
+
+def _from_row(row: Sequence[Any]) -> StoredResult:
+    result = StoredResult(*row)
+    result.solved = bool(result.solved)
+    return result
@@ -1,3 +1,4 @@
 from .basic_solver import solve_puzzle, solve_puzzle_file
+from .async_api import solve_many, solve_puzzle_async
 
-__all__ = ["solve_puzzle", "solve_puzzle_file"]
+__all__ = ["solve_puzzle", "solve_puzzle_file", "solve_puzzle_async", "solve_many"]
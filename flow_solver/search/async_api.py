@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Iterable, Optional, Tuple
+
+from flow_solver.model import Board, Node
+from flow_solver.search import heuristic_solver
+from flow_solver.search.budget import STOP_CANCELLED, STOP_TIME_LIMIT
+from flow_solver.search.heuristic_solver import SearchConfig, SearchStats
+
+"""
+asyncio front end for the A* solver:
+- Each solve runs in a process pool, so the event loop never blocks.
+- Every task gets a cancel event (from a multiprocessing manager) that the
+  worker's search polls through `should_stop`. Timing out or cancelling
+  the awaiting coroutine sets it, and the search stops within a few
+  hundred states instead of running on in the background.
+- The manager (a server process) and each of its events (a round trip to
+  it) are created on a worker thread, never on the event loop.
+"""
+
+_default_executor: Optional[ProcessPoolExecutor] = None
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def _get_default_executor() -> ProcessPoolExecutor:
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = ProcessPoolExecutor()
+    return _default_executor
+
+
+def _cancel_event():
+    """A manager Event; blocking, so call it off the event loop."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = multiprocessing.Manager()
+    return _manager.Event()
+
+
+def _solve_in_worker(board: Board, config: Optional[SearchConfig], cancel_event) -> Tuple[Optional[Node], SearchStats]:
+    if cancel_event.is_set():  # cancelled before a worker picked it up
+        return None, _stopped_stats(STOP_CANCELLED)
+    return heuristic_solver.solve_puzzle(board, config=config, should_stop=cancel_event.is_set)
+
+
+def _stopped_stats(reason: str) -> SearchStats:
+    return SearchStats(solved=False, states_expanded=0, time_seconds=0.0, peak_memory_bytes=0, stop_reason=reason)
+
+
+async def solve_puzzle_async(
+    board: Board,
+    config: Optional[SearchConfig] = None,
+    *,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[Optional[Node], SearchStats]:
+    """
+    Awaitable heuristic_solver.solve_puzzle, run on `executor` (a shared
+    ProcessPoolExecutor by default).
+
+    After `timeout` seconds from submission the search is stopped and the
+    result is (None, stats) with stats.stop_reason == 'time_limit'.
+    Cancelling the awaiting task stops the search in its worker as well.
+    """
+    if executor is None:
+        executor = _get_default_executor()
+    cancel_event = await asyncio.get_running_loop().run_in_executor(None, _cancel_event)
+    future = executor.submit(_solve_in_worker, board, config, cancel_event)
+    waiter = asyncio.wrap_future(future)
+    try:
+        return await asyncio.wait_for(asyncio.shield(waiter), timeout)
+    except asyncio.TimeoutError:
+        cancel_event.set()
+        if future.cancel():
+            return None, _stopped_stats(STOP_TIME_LIMIT)
+        solution, stats = await waiter
+        if stats.stop_reason == STOP_CANCELLED:
+            stats.stop_reason = STOP_TIME_LIMIT
+        return solution, stats
+    except asyncio.CancelledError:
+        cancel_event.set()
+        future.cancel()
+        raise
+
+
+async def solve_many(
+    boards: Iterable[Board],
+    config: Optional[SearchConfig] = None,
+    *,
+    executor: Optional[Executor] = None,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Tuple[int, Optional[Node], SearchStats]]:
+    """
+    Solve `boards` concurrently and yield (index, solution, stats) as each
+    one finishes (asyncio.as_completed order).
+
+    At most `concurrency` solves (default: CPU count) are submitted at once,
+    so each task's `timeout` covers its own solve rather than time spent
+    queued behind the others. Closing the generator early (e.g. breaking
+    out of an `async for` inside contextlib.aclosing) cancels the rest.
+    """
+    semaphore = asyncio.Semaphore(concurrency or os.cpu_count() or 1)
+
+    async def run(index: int, board: Board) -> Tuple[int, Optional[Node], SearchStats]:
+        async with semaphore:
+            solution, stats = await solve_puzzle_async(board, config, executor=executor, timeout=timeout)
+        return index, solution, stats
+
+    tasks = [asyncio.ensure_future(run(i, board)) for i, board in enumerate(boards)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
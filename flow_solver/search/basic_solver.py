@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Optional, Tuple
 
-from flow_solver.model import Board, load_puzzle_from_file, parse_raw_puzzle
+from flow_solver.model import (
+    Board,
+    PuzzleInstance,
+    build_puzzle_instance,
+    load_puzzle_from_file,
+    parse_raw_puzzle,
+)
+from flow_solver.search.budget import SearchBudget
 
 """
 Basic solver:
@@ -13,43 +19,18 @@ Basic solver:
 Coord = Tuple[int, int]
 
 
-@dataclass
-class PuzzleInstance:
-    board: Board
-    colors: List[str]
-    starts: Dict[str, Coord]          # color -> start coord
-    goals: Dict[str, Coord]           # color -> goal coord
-
-
-def build_puzzle_instance(board: Board) -> PuzzleInstance:
-    """
-    Prepare a simple sequential-flow instance:
-    - For each color, pick one terminal as start, the other as goal.
-    """
-    colors = board.colors[:]
-    starts: Dict[str, Coord] = {}
-    goals: Dict[str, Coord] = {}
-
-    for color in colors:
-        terminals = board.terminals[color]
-        if len(terminals) != 2:
-            raise ValueError(
-                f"Color {color} has {len(terminals)} terminals, expected exactly 2"
-            )
-        # Simple choice: first is start, second is goal
-        starts[color] = terminals[0]
-        goals[color] = terminals[1]
-
-    return PuzzleInstance(board=board, colors=colors, starts=starts, goals=goals)
-
-
-def solve_puzzle(board: Board) -> Optional[Board]:
+def solve_puzzle(board: Board, budget: Optional[SearchBudget] = None) -> Optional[Board]:
     """
     Solve the given puzzle using a simple depth-first search.
+
+    With a `budget`, every DFS step is one tick; once it runs out the search
+    unwinds and returns None, with budget.reason saying why.
     """
     instance = build_puzzle_instance(board)
+    if budget is None:
+        budget = SearchBudget()
 
-    if _solve_color(instance, color_index=0):
+    if _solve_color(instance, color_index=0, budget=budget):
         return instance.board
     else:
         return None
@@ -61,7 +42,7 @@ def solve_puzzle_file(path: str) -> Optional[Board]:
     return solve_puzzle(board)
 
 
-def _solve_color(instance: PuzzleInstance, color_index: int) -> bool:
+def _solve_color(instance: PuzzleInstance, color_index: int, budget: SearchBudget) -> bool:
     """
     Recursively solve colors in sequence: colors[0], then colors[1], ...
     """
@@ -79,7 +60,7 @@ def _solve_color(instance: PuzzleInstance, color_index: int) -> bool:
     visited = set()
     visited.add(start)
 
-    return _dfs_extend_color(instance, color_index, current=start, goal=goal, visited=visited)
+    return _dfs_extend_color(instance, color_index, current=start, goal=goal, visited=visited, budget=budget)
 
 
 def _dfs_extend_color(
@@ -88,6 +69,7 @@ def _dfs_extend_color(
     current: Coord,
     goal: Coord,
     visited: set[Coord],
+    budget: SearchBudget,
 ) -> bool:
     """
     Depth-first search for a single color path from `current` to `goal`.
@@ -97,8 +79,11 @@ def _dfs_extend_color(
     board = instance.board
     color = instance.colors[color_index]
 
+    if budget.tick():
+        return False
+
     if current == goal:
-        return _solve_color(instance, color_index + 1)
+        return _solve_color(instance, color_index + 1, budget)
 
     for nb in board.neighbors4(current):
         if nb in visited:
@@ -111,7 +96,7 @@ def _dfs_extend_color(
         # - the goal cell (which already has `color` on it)
         if nb == goal:
             visited.add(nb)
-            if _dfs_extend_color(instance, color_index, nb, goal, visited):
+            if _dfs_extend_color(instance, color_index, nb, goal, visited, budget):
                 return True
             visited.remove(nb)
             continue
@@ -123,7 +108,7 @@ def _dfs_extend_color(
         board.set(nb, color)
         visited.add(nb)
 
-        if _dfs_extend_color(instance, color_index, nb, goal, visited):
+        if _dfs_extend_color(instance, color_index, nb, goal, visited, budget):
             return True
 
         # Backtrack
@@ -137,8 +122,7 @@ def _board_is_full(board: Board) -> bool:
     """
     Check that the board has no empty '.' cells left.
     """
-    for r in range(board.size):
-        for c in range(board.size):
-            if board.grid[r][c] == '.':
-                return False
+    for row in board.grid:
+        if '.' in row:
+            return False
     return True
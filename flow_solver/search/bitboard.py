@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from flow_solver.model import Board, PuzzleInstance
+
+"""
+Bitboard engine:
+- Cell i (row-major, as in GridGeometry) is bit i of a Python int.
+- The prunes spread whole sets of cells one step with shifts and masks and
+  iterate to a fixpoint, instead of walking the grid cell by cell.
+"""
+
+Coord = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class BitboardLayout:
+    """
+    Edge masks for a rows x cols grid (built once per shape).
+
+    - size / width: number of rows / columns; a row step is a shift by width
+    - full: every cell
+    - not_first_col / not_last_col: every cell except the first / last column
+    """
+    size: int
+    width: int
+    full: int
+    not_first_col: int
+    not_last_col: int
+
+
+def bitboard_layout(size: int, width: Optional[int] = None) -> BitboardLayout:
+    return _bitboard_layout(size, size if width is None else width)
+
+
+@lru_cache(maxsize=None)
+def _bitboard_layout(size: int, width: int) -> BitboardLayout:
+    full = (1 << (size * width)) - 1
+    first_col = 0
+    for r in range(size):
+        first_col |= 1 << (r * width)
+    last_col = first_col << (width - 1)
+    return BitboardLayout(
+        size=size,
+        width=width,
+        full=full,
+        not_first_col=full & ~first_col,
+        not_last_col=full & ~last_col,
+    )
+
+
+@dataclass(slots=True)
+class BitboardState:
+    """
+    Per-state masks, updated incrementally by each move.
+
+    - empty: '.' cells
+    - colors: color -> cells holding that color (terminals included)
+    """
+    empty: int
+    colors: Dict[str, int]
+
+    def after_fill(self, color: str, index: int) -> BitboardState:
+        bit = 1 << index
+        colors = dict(self.colors)
+        colors[color] |= bit
+        return BitboardState(empty=self.empty & ~bit, colors=colors)
+
+
+def bitboard_from_board(board: Board) -> BitboardState:
+    empty = 0
+    colors: Dict[str, int] = {color: 0 for color in board.terminals}
+    i = 0
+    for row in board.grid:
+        for ch in row:
+            if ch == '.':
+                empty |= 1 << i
+            else:
+                colors[ch] = colors.get(ch, 0) | (1 << i)
+            i += 1
+    return BitboardState(empty=empty, colors=colors)
+
+
+def spread(layout: BitboardLayout, cells: int) -> int:
+    """All cells 4-adjacent to some cell in `cells`."""
+    n = layout.width
+    return (
+        (cells >> n)
+        | ((cells << n) & layout.full)
+        | ((cells >> 1) & layout.not_last_col)
+        | ((cells << 1) & layout.not_first_col)
+    )
+
+
+def flood(layout: BitboardLayout, seeds: int, passable: int, stop: int = 0) -> int:
+    """
+    Grow `seeds` through `passable` cells until nothing changes, or until the
+    reached set touches `stop`.
+    """
+    reached = seeds & passable
+    while True:
+        grown = (reached | spread(layout, reached)) & passable
+        if grown == reached or grown & stop:
+            return grown
+        reached = grown
+
+
+def _at_least_two(a: int, b: int, c: int, d: int) -> int:
+    """Bits set in at least two of the four masks."""
+    seen_once = a | b
+    seen_twice = a & b
+    seen_twice |= seen_once & c
+    seen_once |= c
+    seen_twice |= seen_once & d
+    return seen_twice
+
+
+def _mask_of(width: int, positions) -> int:
+    mask = 0
+    for r, c in positions:
+        mask |= 1 << (r * width + c)
+    return mask
+
+
+def _layout_of(instance: PuzzleInstance) -> BitboardLayout:
+    return bitboard_layout(instance.geometry.size, instance.geometry.width)
+
+
+def corner_prune(instance: PuzzleInstance, positions: Dict[str, Coord], bits: BitboardState) -> bool:
+    """
+    Bitboard version of heuristic_solver.corner_prune: an empty cell needs two
+    open neighbors ('.' or an unreached goal) or a neighboring live head.
+    """
+    layout = _layout_of(instance)
+    n = layout.width
+    empty = bits.empty
+
+    heads = _mask_of(n, positions.values())
+    goals = _mask_of(n, instance.goals.values())
+    open_cells = empty | (goals & ~heads)
+    live_heads = heads & ~goals
+
+    from_north = (open_cells << n) & layout.full
+    from_south = open_cells >> n
+    from_west = (open_cells << 1) & layout.not_first_col
+    from_east = (open_cells >> 1) & layout.not_last_col
+
+    ok = _at_least_two(from_north, from_south, from_west, from_east) | spread(layout, live_heads)
+    return bool(empty & ~ok)
+
+
+def unreachable_goal_prune(instance: PuzzleInstance, positions: Dict[str, Coord], bits: BitboardState) -> bool:
+    """Bitboard version of heuristic_solver.unreachable_goal_prune."""
+    layout = _layout_of(instance)
+    n = layout.width
+    empty = bits.empty
+
+    for color in instance.colors:
+        head = positions[color]
+        goal = instance.goals[color]
+        if head == goal:
+            continue
+        head_ring = spread(layout, 1 << (head[0] * n + head[1]))
+        goal_bit = 1 << (goal[0] * n + goal[1])
+        if head_ring & goal_bit:
+            continue
+        goal_ring = spread(layout, goal_bit) & empty
+        if not flood(layout, head_ring, empty, stop=goal_ring) & goal_ring:
+            return True
+    return False
+
+
+def isolated_region_prune(instance: PuzzleInstance, positions: Dict[str, Coord], bits: BitboardState) -> bool:
+    """Bitboard version of heuristic_solver.isolated_region_prune."""
+    layout = _layout_of(instance)
+    active = [positions[c] for c in instance.colors if positions[c] != instance.goals[c]]
+    if not active:
+        return False
+    empty = bits.empty
+    reached = flood(layout, spread(layout, _mask_of(layout.width, active)), empty)
+    return bool(empty & ~reached)
+
+
+def stranded_region_prune(instance: PuzzleInstance, positions: Dict[str, Coord], bits: BitboardState) -> bool:
+    """
+    Bitboard version of heuristic_solver.stranded_region_prune: each empty
+    region, peeled off one flood at a time, must border both ends of some
+    unfinished color.
+    """
+    layout = _layout_of(instance)
+    n = layout.width
+    rings = []
+    for color in instance.colors:
+        head = positions[color]
+        goal = instance.goals[color]
+        if head == goal:
+            continue
+        rings.append((
+            spread(layout, 1 << (head[0] * n + head[1])),
+            spread(layout, 1 << (goal[0] * n + goal[1])),
+        ))
+
+    remaining = bits.empty
+    while remaining:
+        region = flood(layout, remaining & -remaining, remaining)
+        for head_ring, goal_ring in rings:
+            if head_ring & region and goal_ring & region:
+                break
+        else:
+            return True
+        remaining &= ~region
+    return False
+
+
+def prune(instance: PuzzleInstance, positions: Dict[str, Coord], bits: BitboardState) -> bool:
+    return prune_reason(instance, positions, bits) is not None
+
+
+def prune_reason(instance: PuzzleInstance, positions: Dict[str, Coord], bits: BitboardState) -> Optional[str]:
+    if corner_prune(instance, positions, bits):
+        return "corner"
+    if unreachable_goal_prune(instance, positions, bits):
+        return "unreachable_goal"
+    if isolated_region_prune(instance, positions, bits):
+        return "isolated_region"
+    if stranded_region_prune(instance, positions, bits):
+        return "stranded_region"
+    return None
+
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Optional
+
+from flow_solver.search.memory import MemoryMonitor
+
+"""
+Search budgets and cooperative cancellation:
+- A search calls SearchBudget.tick() once per expanded state.
+- The state limit is checked on every tick; the clock and the external
+  cancel check only every CHECK_INTERVAL ticks, so they cost nothing
+  measurable even when the check crosses a process boundary.
+- An attached MemoryMonitor sees the open list on every tick and samples
+  RSS along with the clock.
+- Once exhausted, the budget stays exhausted and `reason` says why.
+"""
+
+CHECK_INTERVAL = 256
+
+# Values of SearchBudget.reason / SearchStats.stop_reason
+STOP_MAX_STATES = "max_states"
+STOP_TIME_LIMIT = "time_limit"
+STOP_CANCELLED = "cancelled"
+STOP_MEMORY_LIMIT = "memory_limit"
+# Set by the DLX solver when its candidate paths exceed the cap
+STOP_PATH_LIMIT = "path_limit"
+
+
+class SearchBudget:
+    """
+    Limits shared by one search and all of its sub-searches.
+
+    - max_states: stop after this many expansions (None = unlimited)
+    - time_limit: stop after this many seconds (None = unlimited)
+    - should_stop: polled callable; returning True cancels the search
+    - memory: open-list telemetry and cap (see memory.MemoryMonitor)
+    """
+
+    def __init__(
+        self,
+        max_states: Optional[int] = None,
+        time_limit: Optional[float] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        memory: Optional[MemoryMonitor] = None,
+    ):
+        self.max_states = max_states
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.should_stop = should_stop
+        self.memory = memory
+        self.states = 0
+        self.reason: Optional[str] = None
+
+    def tick(self, open_list: Optional[Any] = None) -> bool:
+        """
+        Count one expansion; returns True when the search must stop.
+
+        `open_list` is the caller's open list; the memory monitor may trim it.
+        """
+        if self.reason is not None:
+            return True
+        self.states += 1
+        if self.memory is not None and open_list is not None:
+            self.memory.observe(open_list)
+        if self.max_states is not None and self.states > self.max_states:
+            self.reason = STOP_MAX_STATES
+        elif self.states % CHECK_INTERVAL == 0:
+            if self.memory is not None:
+                self.memory.sample()
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                self.reason = STOP_TIME_LIMIT
+            elif self.should_stop is not None and self.should_stop():
+                self.reason = STOP_CANCELLED
+        return self.reason is not None
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import time
+from typing import Callable, List, Optional, Tuple
+
+from flow_solver.model import Board, DeltaNode, Node, build_puzzle_instance
+from flow_solver.search import bitboard
+from flow_solver.search.budget import SearchBudget
+from flow_solver.search.cursor import BoardCursor, ZobristKeys, rebuild_solution
+from flow_solver.search.heuristic_solver import (
+    SearchConfig,
+    SearchStats,
+    _clone_board,
+    _is_goal,
+    _select_moves,
+    prune,
+)
+
+"""
+Solution counting:
+- A depth-first search over the same moves as the A* search: the most
+  constrained color is extended, and every child runs through all the
+  prunes. Only a state that no prune rejects can lead to a solution.
+- States are deduplicated by Zobrist hash. Two move orders that fill the
+  same cells lead to the same completions, so each distinct solved board
+  is found exactly once.
+- One shared board is walked with the make/unmake cursor of the delta-node
+  search, so nothing is cloned until a solution is found.
+"""
+
+
+def count_solutions(
+    board: Board,
+    limit: int = 2,
+    config: Optional[SearchConfig] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[List[Node], SearchStats]:
+    """
+    Find up to `limit` distinct solutions of `board`.
+
+    Returns (solutions, stats). With stats.stop_reason None the answer is
+    exact: fewer than `limit` solutions means the puzzle has exactly that
+    many, and `limit` solutions means it has at least that many. limit=2
+    is the uniqueness check. From `config` only engine, no_self_touch,
+    max_states and time_limit apply; with no_self_touch, solutions that
+    need a U-turn are not counted.
+    """
+    if limit < 1:
+        raise ValueError("limit must be >= 1")
+    if config is None:
+        config = SearchConfig()
+    instance = build_puzzle_instance(board)
+    keys = ZobristKeys(instance)
+
+    t0 = time.perf_counter()
+    root = DeltaNode(
+        f=0,
+        g=0,
+        parent=None,
+        color=None,
+        cell=None,
+        prev_head=None,
+        zobrist=keys.initial(instance, instance.starts),
+        depth=0,
+    )
+    cursor = BoardCursor(instance, _clone_board(instance.board), instance.starts, root)
+    if config.engine == "bitboard":
+        cursor.bits = bitboard.bitboard_from_board(cursor.board)
+    budget = SearchBudget(config.max_states, config.time_limit, should_stop)
+
+    stack: List[DeltaNode] = [root]
+    seen = {root.zobrist}
+    solutions: List[Node] = []
+    state_count = 0
+
+    while stack:
+        if budget.tick():
+            break
+        node = stack.pop()
+        state_count += 1
+        cursor.move_to(node)
+
+        if _is_goal(instance, cursor):
+            solutions.append(rebuild_solution(instance, cursor))
+            if len(solutions) >= limit:
+                break
+            continue
+
+        active, legal = _select_moves(instance, cursor, config.no_self_touch)
+        # Pushed in reverse so the first legal move is explored first
+        for nb in reversed(legal):
+            prev_head = cursor.make(active, nb)
+            key = keys.after_move(instance, node.zobrist, active, prev_head, nb)
+            if key not in seen and not prune(instance, cursor, nb[0], nb[1]):
+                seen.add(key)
+                stack.append(
+                    DeltaNode(
+                        f=node.g + 1,
+                        g=node.g + 1,
+                        parent=node,
+                        color=active,
+                        cell=nb,
+                        prev_head=prev_head,
+                        zobrist=key,
+                        depth=node.depth + 1,
+                    )
+                )
+            cursor.unmake(active, nb, prev_head)
+
+    stats = SearchStats(
+        solved=bool(solutions),
+        states_expanded=state_count,
+        time_seconds=time.perf_counter() - t0,
+        peak_memory_bytes=0,
+        stop_reason=budget.reason,
+    )
+    return solutions, stats
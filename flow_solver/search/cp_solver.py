@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from flow_solver.model import (
+    Board,
+    PuzzleInstance,
+    build_puzzle_instance,
+    load_puzzle_from_file,
+    parse_raw_puzzle,
+)
+from flow_solver.search.budget import SearchBudget
+from flow_solver.search.heuristic_solver import flatten_grid
+
+"""
+Constraint-propagation solver:
+- Every cell holds a bitmask domain of the colors it may take, and every
+  pair of adjacent cells a link that is unknown, on (the path runs across
+  it) or off. Terminals start with their own color only.
+- Degree rule: a terminal has exactly one link on, any other cell exactly
+  two. Linking is counted rather than same-color adjacency, so paths may
+  run next to themselves (the corpus has many adjacent terminal pairs
+  joined by a detour).
+- Linked cells share a color, and cells with no color in common are not
+  linked. Links that are on may not close a cycle.
+- Reachability: each color's cells must connect its two terminals through
+  links that are not off; a color is removed from every cell its start
+  cannot reach that way.
+- Propagation runs these rules to a fixpoint over the whole board at once.
+  The search then branches only on the cell with the smallest domain (or,
+  once every color is fixed, on an undecided link), copying the state per
+  branch.
+"""
+
+UNKNOWN = 0
+ON = 1
+OFF = 2
+
+
+class _Network:
+    """Cells, links and degree targets of one puzzle, as flat int tables."""
+
+    def __init__(self, instance: PuzzleInstance):
+        geometry = instance.geometry
+        self.num_cells = geometry.num_cells
+        self.links: List[Tuple[int, int]] = []
+        # cell -> ((link, other cell), ...)
+        incident: List[List[Tuple[int, int]]] = [[] for _ in range(self.num_cells)]
+        for a in range(self.num_cells):
+            for b in geometry.adjacency[a]:
+                if a < b:
+                    incident[a].append((len(self.links), b))
+                    incident[b].append((len(self.links), a))
+                    self.links.append((a, b))
+        self.incident = [tuple(pairs) for pairs in incident]
+
+        self.colors = instance.colors
+        bit = {color: 1 << k for k, color in enumerate(instance.colors)}
+        self.need = [2] * self.num_cells
+        self.domains = [(1 << len(instance.colors)) - 1] * self.num_cells
+        for color in instance.colors:
+            for cell in (instance.start_index[color], instance.goal_index[color]):
+                self.need[cell] = 1
+                self.domains[cell] = bit[color]
+        for i, ch in enumerate(flatten_grid(instance.board)):
+            if ch == '.' or self.need[i] == 1:
+                continue
+            if ch not in bit:
+                raise ValueError(f"cell {geometry.coords[i]} holds {ch!r}, which is not a terminal color")
+            self.domains[i] = bit[ch]
+        self.pairs = [
+            (instance.start_index[color], instance.goal_index[color]) for color in instance.colors
+        ]
+
+
+def solve_puzzle(board: Board, budget: Optional[SearchBudget] = None) -> Optional[Board]:
+    """
+    Solve `board` by constraint propagation and branching; returns a solved
+    copy, or None.
+
+    With a `budget`, every search node is one tick; when it runs out the
+    result is None and budget.reason says why. The number of nodes
+    (budget.states) is the number of branches taken plus one.
+    """
+    instance = build_puzzle_instance(board)
+    if budget is None:
+        budget = SearchBudget()
+    net = _Network(instance)
+
+    domains = net.domains[:]
+    links = [UNKNOWN] * len(net.links)
+    if not _propagate(net, domains, links, set(range(net.num_cells))):
+        budget.tick()
+        return None
+
+    stack = [(domains, links)]
+    while stack:
+        if budget.tick():
+            return None
+        domains, links = stack.pop()
+        children = _branches(net, domains, links)
+        if children is None:
+            return _to_board(net, instance, board, domains)
+        # Pushed in reverse so the first branch is explored first
+        for child_domains, child_links, touched in reversed(children):
+            if _propagate(net, child_domains, child_links, touched):
+                stack.append((child_domains, child_links))
+    return None
+
+
+def solve_puzzle_file(path: str) -> Optional[Board]:
+    raw = load_puzzle_from_file(path)
+    board = parse_raw_puzzle(raw)
+    return solve_puzzle(board)
+
+
+def _branches(
+    net: _Network,
+    domains: List[int],
+    links: List[int],
+) -> Optional[List[Tuple[List[int], List[int], set]]]:
+    """Child states of one branching step, or None when everything is decided."""
+    best, best_size = -1, 0
+    for cell, domain in enumerate(domains):
+        if domain & (domain - 1):
+            size = bin(domain).count("1")
+            if best < 0 or size < best_size:
+                best, best_size = cell, size
+                if size == 2:
+                    break
+    if best >= 0:
+        children = []
+        domain = domains[best]
+        while domain:
+            low = domain & -domain
+            child = domains[:]
+            child[best] = low
+            children.append((child, links[:], {best}))
+            domain ^= low
+        return children
+
+    # Every color is fixed: decide a link the degree rule left open
+    for link, state in enumerate(links):
+        if state == UNKNOWN:
+            a, b = net.links[link]
+            children = []
+            for value in (ON, OFF):
+                child = links[:]
+                child[link] = value
+                children.append((domains[:], child, {a, b}))
+            return children
+    return None
+
+
+def _propagate(net: _Network, domains: List[int], links: List[int], queue: set) -> bool:
+    """Apply every rule until nothing changes; False on a contradiction."""
+    incident, need = net.incident, net.need
+    while True:
+        while queue:
+            cell = queue.pop()
+            domain = domains[cell]
+            on = unknown = 0
+            for link, other in incident[cell]:
+                state = links[link]
+                if state == ON:
+                    common = domain & domains[other]
+                    if not common:
+                        return False
+                    if common != domains[other]:
+                        domains[other] = common
+                        queue.add(other)
+                    if common != domain:
+                        domain = domains[cell] = common
+                        queue.update(o for _, o in incident[cell])
+                    on += 1
+                elif state == UNKNOWN:
+                    if domain & domains[other]:
+                        unknown += 1
+                    else:
+                        links[link] = OFF
+                        queue.add(other)
+
+            target = need[cell]
+            if on > target or on + unknown < target:
+                return False
+            if unknown and (on == target or on + unknown == target):
+                value = OFF if on == target else ON
+                for link, other in incident[cell]:
+                    if links[link] == UNKNOWN:
+                        links[link] = value
+                        queue.add(other)
+                if value == ON:
+                    queue.add(cell)
+
+        if not _global_rules(net, domains, links, queue):
+            return False
+        if not queue:
+            return True
+
+
+def _global_rules(net: _Network, domains: List[int], links: List[int], queue: set) -> bool:
+    """
+    No cycle of links that are on, and every color's terminals connected;
+    cells a color cannot be reached in lose it (and are queued).
+    """
+    parent = list(range(net.num_cells))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for link, state in enumerate(links):
+        if state == ON:
+            a, b = net.links[link]
+            ra, rb = find(a), find(b)
+            if ra == rb:
+                return False
+            parent[ra] = rb
+
+    incident = net.incident
+    for k, (start, goal) in enumerate(net.pairs):
+        bit = 1 << k
+        seen = {start}
+        frontier = [start]
+        while frontier:
+            cell = frontier.pop()
+            for link, other in incident[cell]:
+                if other not in seen and domains[other] & bit and links[link] != OFF:
+                    seen.add(other)
+                    # The path ends at its goal (other terminals never hold this color)
+                    if other != goal:
+                        frontier.append(other)
+        if goal not in seen:
+            return False
+        for cell, domain in enumerate(domains):
+            if domain & bit and cell not in seen:
+                domain &= ~bit
+                if not domain:
+                    return False
+                domains[cell] = domain
+                queue.add(cell)
+                queue.update(o for _, o in incident[cell])
+    return True
+
+
+def _to_board(net: _Network, instance: PuzzleInstance, board: Board, domains: List[int]) -> Board:
+    grid = [row[:] for row in board.grid]
+    for cell, domain in enumerate(domains):
+        r, c = instance.geometry.coords[cell]
+        if grid[r][c] == '.':
+            grid[r][c] = net.colors[domain.bit_length() - 1]
+    terminals = {color: coords[:] for color, coords in board.terminals.items()}
+    return Board(size=board.size, grid=grid, terminals=terminals, width=board.width)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional, Tuple
+
+from flow_solver.model import Board, DeltaNode, Node, PuzzleInstance
+
+"""
+Make/unmake cursor for delta-node search:
+- One working board is shared by the whole search.
+- Moving to another DeltaNode unmakes moves up to the common ancestor and
+  replays the moves down to the target.
+"""
+
+Coord = Tuple[int, int]
+
+ZOBRIST_SEED = 0x5EED
+
+
+class ZobristKeys:
+    """
+    Random 64-bit keys for incremental state hashing.
+
+    - fill[color][i]: cell i holds a pipe segment of `color`
+    - head[color][i]: the head of `color` sits on cell i
+    """
+
+    def __init__(self, instance: PuzzleInstance):
+        rng = random.Random(ZOBRIST_SEED)
+        num_cells = instance.geometry.num_cells
+        self.fill: Dict[str, List[int]] = {}
+        self.head: Dict[str, List[int]] = {}
+        for color in instance.colors:
+            self.fill[color] = [rng.getrandbits(64) for _ in range(num_cells)]
+            self.head[color] = [rng.getrandbits(64) for _ in range(num_cells)]
+
+    def initial(self, instance: PuzzleInstance, positions: Dict[str, Coord]) -> int:
+        geometry = instance.geometry
+        key = 0
+        for color, pos in positions.items():
+            key ^= self.head[color][geometry.index(pos)]
+        return key
+
+    def after_move(
+        self,
+        instance: PuzzleInstance,
+        key: int,
+        color: str,
+        prev_head: Coord,
+        cell: Coord,
+    ) -> int:
+        """Hash of the state reached by moving `color` from `prev_head` into `cell`."""
+        index = instance.geometry.index
+        head = self.head[color]
+        key ^= head[index(prev_head)] ^ head[index(cell)]
+        if cell != instance.goals[color]:
+            key ^= self.fill[color][index(cell)]
+        return key
+
+
+class BoardCursor:
+    """
+    Working board positioned at one DeltaNode at a time.
+
+    Exposes `board` and `positions` like a Node, so move generation, the
+    prunes and the heuristics run on it directly.
+    """
+
+    def __init__(self, instance: PuzzleInstance, board: Board, positions: Dict[str, Coord], root: DeltaNode):
+        self.instance = instance
+        self.board = board
+        self.positions = dict(positions)
+        self.node = root
+        # Read by the heuristics; fields are not cached across delta nodes.
+        self.dist_fields = None
+        self.last_move: Optional[Coord] = None
+        # BitboardState kept in step with the board when the bitboard engine is on
+        self.bits = None
+
+    def make(self, color: str, cell: Coord) -> Coord:
+        """Extend `color` into `cell`; returns the previous head for unmake."""
+        prev_head = self.positions[color]
+        if cell != self.instance.goals[color]:
+            self.board.set(cell, color)
+            self.last_move = cell
+            if self.bits is not None:
+                self._toggle_bit(color, cell)
+        else:
+            self.last_move = None
+        self.positions[color] = cell
+        return prev_head
+
+    def unmake(self, color: str, cell: Coord, prev_head: Coord) -> None:
+        if cell != self.instance.goals[color]:
+            self.board.set(cell, '.')
+            if self.bits is not None:
+                self._toggle_bit(color, cell)
+        self.positions[color] = prev_head
+        self.last_move = None
+
+    def _toggle_bit(self, color: str, cell: Coord) -> None:
+        bit = 1 << self.instance.geometry.index(cell)
+        self.bits.empty ^= bit
+        self.bits.colors[color] ^= bit
+
+    def move_to(self, target: DeltaNode) -> None:
+        """Reposition the working board from the current node onto `target`."""
+        current = self.node
+        replay: List[DeltaNode] = []
+
+        while current.depth > target.depth:
+            self.unmake(current.color, current.cell, current.prev_head)
+            current = current.parent
+        while target.depth > current.depth:
+            replay.append(target)
+            target = target.parent
+        while current is not target:
+            self.unmake(current.color, current.cell, current.prev_head)
+            current = current.parent
+            replay.append(target)
+            target = target.parent
+
+        for node in reversed(replay):
+            self.make(node.color, node.cell)
+        self.node = replay[0] if replay else current
+
+
+def rebuild_solution(instance: PuzzleInstance, cursor: BoardCursor) -> Node:
+    """
+    Materialize a full Node for the cursor's current position, rebuilding
+    the `dirs` path indices by replaying its moves from the root.
+    """
+    moves: List[DeltaNode] = []
+    node = cursor.node
+    while node.parent is not None:
+        moves.append(node)
+        node = node.parent
+
+    dirs = [[0 for _ in range(cursor.board.width)] for _ in range(cursor.board.size)]
+    for move in reversed(moves):
+        pr, pc = move.prev_head
+        nr, nc = move.cell
+        dirs[nr][nc] = dirs[pr][pc] + 1
+
+    board = cursor.board
+    return Node(
+        f=cursor.node.f,
+        g=cursor.node.g,
+        board=Board(
+            size=board.size,
+            grid=[row[:] for row in board.grid],
+            terminals={k: v[:] for k, v in board.terminals.items()},
+            width=board.width,
+        ),
+        positions=dict(cursor.positions),
+        dirs=dirs,
+    )
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from flow_solver.model import Board, Node, PuzzleInstance
+
+"""
+Independent-region decomposition:
+- A color can only ever fill cells of an empty region bordered by both its
+  head and its goal (see stranded_region_prune).
+- Regions linked by such colors form components. When there are two or
+  more components, no color can act in two of them, so each one is an
+  independent subproblem: its own empty cells, its own colors, everything
+  else a wall.
+"""
+
+Coord = Tuple[int, int]
+
+WALL = '#'
+
+# (cells, boundary contents, (color, head, goal) per color)
+RegionSignature = Tuple[FrozenSet[int], Tuple[Tuple[int, str], ...], Tuple[Tuple[str, Coord, Coord], ...]]
+
+
+@dataclass
+class Component:
+    """
+    One independent subproblem.
+
+    - cells: flat indices of its empty cells
+    - colors: unfinished colors that can reach into it
+    """
+    cells: FrozenSet[int]
+    colors: Tuple[str, ...]
+
+
+def independent_components(
+    instance: PuzzleInstance,
+    state: Node,
+    labels: List[int],
+    region_count: int,
+) -> Optional[Tuple[List[Component], List[str]]]:
+    """
+    Split the empty regions of `state` into independent components.
+
+    Returns (components, direct_colors) when there are at least two
+    components, where direct_colors are unfinished colors that border no
+    usable region and can only step straight into their goal. Returns None
+    when the state does not decompose.
+    """
+    geometry = instance.geometry
+    adjacency = geometry.adjacency
+
+    parent = list(range(region_count))
+
+    def find(r: int) -> int:
+        while parent[r] != r:
+            parent[r] = parent[parent[r]]
+            r = parent[r]
+        return r
+
+    usable: Dict[str, List[int]] = {}
+    direct_colors: List[str] = []
+    for color in instance.colors:
+        head = state.positions[color]
+        if head == instance.goals[color]:
+            continue
+        head_regions = {labels[j] for j in adjacency[geometry.index(head)] if labels[j] >= 0}
+        goal_regions = {labels[j] for j in adjacency[instance.goal_index[color]] if labels[j] >= 0}
+        regions = sorted(head_regions & goal_regions)
+        if not regions:
+            direct_colors.append(color)
+            continue
+        usable[color] = regions
+        for r in regions[1:]:
+            parent[find(r)] = find(regions[0])
+
+    roots = sorted({find(r) for r in range(region_count)})
+    if len(roots) < 2:
+        return None
+
+    cells: Dict[int, List[int]] = {root: [] for root in roots}
+    for i, label in enumerate(labels):
+        if label >= 0:
+            cells[find(label)].append(i)
+    colors: Dict[int, List[str]] = {root: [] for root in roots}
+    for color, regions in usable.items():
+        colors[find(regions[0])].append(color)
+
+    components = [
+        Component(cells=frozenset(cells[root]), colors=tuple(colors[root])) for root in roots
+    ]
+    return components, direct_colors
+
+
+def region_signature(
+    instance: PuzzleInstance,
+    state: Node,
+    cells: List[str],
+    component: Component,
+) -> RegionSignature:
+    """
+    Memo key for a component: its cells, the contents of every cell that
+    borders it, and each color's head and goal. This is everything a search
+    confined to the component can observe.
+    """
+    adjacency = instance.geometry.adjacency
+    boundary = {
+        j for i in component.cells for j in adjacency[i] if j not in component.cells
+    }
+    return (
+        component.cells,
+        tuple(sorted((j, cells[j]) for j in boundary)),
+        tuple((c, state.positions[c], instance.goals[c]) for c in component.colors),
+    )
+
+
+def subproblem_board(instance: PuzzleInstance, state: Node, component: Component) -> Board:
+    """
+    Board for one component: empty cells outside it become walls, and each
+    of its colors gets (current head, goal) as its terminal pair.
+    """
+    board = state.board
+    grid = [row[:] for row in board.grid]
+    for r in range(board.size):
+        for c in range(board.width):
+            if grid[r][c] == '.' and r * board.width + c not in component.cells:
+                grid[r][c] = WALL
+    terminals = {
+        color: [state.positions[color], instance.goals[color]] for color in component.colors
+    }
+    return Board(size=board.size, grid=grid, terminals=terminals, width=board.width)
+
+
+def extract_paths(solution: Node, component: Component, heads: Dict[str, Coord]) -> Dict[str, List[Coord]]:
+    """
+    Read each color's path (excluding its head, ending at its goal) out of a
+    solved subproblem by following increasing `dirs` indices from the head.
+    """
+    board = solution.board
+    dirs = solution.dirs
+    paths: Dict[str, List[Coord]] = {}
+    for color in component.colors:
+        path: List[Coord] = []
+        current = heads[color]
+        goal = solution.positions[color]
+        while current != goal:
+            step = dirs[current[0]][current[1]] + 1
+            for nr, nc in board.neighbors4(current):
+                if board.grid[nr][nc] == color and dirs[nr][nc] == step:
+                    current = (nr, nc)
+                    break
+            else:
+                raise ValueError(f"Broken path for color {color} in subproblem solution")
+            path.append(current)
+        paths[color] = path
+    return paths
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from flow_solver.model import Board, format_puzzle, parse_raw_puzzle
+from flow_solver.model.puzzle_loader import RawPuzzle
+from flow_solver.search import basic_solver, cp_solver, dlx_solver, heuristic_solver, routing
+from flow_solver.search.budget import SearchBudget
+
+"""
+Plain-data solver entry point:
+- A request is a dict holding the grid, the solver name and the solver's
+  config (SearchConfig fields, budgets included); the result is a dict of
+  status, solution rows and stats.
+- Everything in and out is JSON-serializable and picklable, so the same
+  call runs in-process, in a worker pool or behind a socket.
+"""
+
+SOLVERS = ("basic", "cp", "dlx", "heuristic", "auto")
+# Config keys of the solvers that only take budgets (basic, cp, dlx)
+BASIC_CONFIG_KEYS = ("max_states", "time_limit")
+
+# Result statuses: a solution, a proof there is none, or a stop reason
+STATUS_SOLVED = "solved"
+STATUS_UNSOLVABLE = "unsolvable"
+
+Grid = Union[str, Sequence[str]]
+
+
+def grid_lines(grid: Grid) -> List[str]:
+    """Puzzle rows without surrounding whitespace or blank lines."""
+    lines = grid.splitlines() if isinstance(grid, str) else list(grid)
+    return [line.strip() for line in lines if line.strip()]
+
+
+def board_from_grid(grid: Grid) -> Board:
+    """Build a Board from puzzle rows, given as a list or a newline-separated string."""
+    lines = grid_lines(grid)
+    if not lines:
+        raise ValueError("grid is empty")
+    return parse_raw_puzzle(RawPuzzle(name="<request>", grid_lines=lines))
+
+
+def grid_rows(board: Board) -> List[str]:
+    return format_puzzle(board)
+
+
+def make_config(config: Optional[Dict[str, Any]]) -> heuristic_solver.SearchConfig:
+    """SearchConfig from a dict, with unknown keys reported as ValueError."""
+    try:
+        return heuristic_solver.SearchConfig(**(config or {}))
+    except TypeError as exc:
+        raise ValueError(f"bad config: {exc}") from None
+
+
+def config_key(solver: str, config: Optional[Dict[str, Any]]) -> str:
+    """Canonical text of (solver, config), usable as a cache key."""
+    return json.dumps([solver, config or {}], sort_keys=True, separators=(",", ":"))
+
+
+def solve_request(
+    request: Dict[str, Any],
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Solve one request: {"grid": rows, "solver": name, "config": {...}}.
+
+    With solver 'auto' (see routing), the config only sets overall budgets,
+    an optional "model" names a trained DifficultyModel file, and the stats
+    include the "route" taken.
+
+    Returns {"status", "solution", "stats"}. The status is 'solved',
+    'unsolvable', or the stop reason of a search cut short by its budget
+    or by `should_stop` ('max_states', 'time_limit', 'cancelled',
+    'memory_limit', or 'path_limit' for DLX).
+    The basic, cp and dlx solvers only accept the budget keys of the config
+    ('max_states', 'time_limit'); each DFS step (a branch for CP, a path
+    extension or exact cover step for DLX) counts as a state.
+    """
+    solver = request.get("solver", "heuristic")
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver!r}, expected one of {SOLVERS}")
+    if request.get("grid") is None:
+        raise ValueError("request has no grid")
+    board = board_from_grid(request["grid"])
+    config = request.get("config")
+
+    if solver in ("basic", "cp", "dlx"):
+        unknown = set(config or {}) - set(BASIC_CONFIG_KEYS)
+        if unknown:
+            raise ValueError(f"the {solver} solver only takes {BASIC_CONFIG_KEYS}, got {sorted(unknown)}")
+        budget = SearchBudget(should_stop=should_stop, **(config or {}))
+        t0 = time.perf_counter()
+        module = {"basic": basic_solver, "cp": cp_solver, "dlx": dlx_solver}[solver]
+        solution = module.solve_puzzle(board, budget)
+        stats = {"states_expanded": budget.states, "time_seconds": time.perf_counter() - t0}
+        if budget.reason is not None:
+            return {"status": budget.reason, "solution": None, "stats": _with_pid(stats)}
+    else:
+        if solver == "auto":
+            model = routing.load_model(request["model"]) if request.get("model") else None
+            solution, search_stats = routing.solve_puzzle(
+                board, "auto", make_config(config), model=model, should_stop=should_stop
+            )
+        else:
+            node, search_stats = heuristic_solver.solve_puzzle(
+                board, config=make_config(config), should_stop=should_stop
+            )
+            solution = node.board if node is not None else None
+        stats = {
+            "states_expanded": search_stats.states_expanded,
+            "time_seconds": search_stats.time_seconds,
+            "peak_open_nodes": search_stats.peak_open_nodes,
+            "open_entry_bytes": search_stats.open_entry_bytes,
+            "peak_rss_bytes": search_stats.peak_rss_bytes,
+            "open_list_trims": search_stats.open_list_trims,
+        }
+        if search_stats.route is not None:
+            stats["route"] = search_stats.route
+        if search_stats.stop_reason is not None:
+            return {"status": search_stats.stop_reason, "solution": None, "stats": _with_pid(stats)}
+
+    return {
+        "status": STATUS_SOLVED if solution is not None else STATUS_UNSOLVABLE,
+        "solution": grid_rows(solution) if solution is not None else None,
+        "stats": _with_pid(stats),
+    }
+
+
+def _with_pid(stats: Dict[str, Any]) -> Dict[str, Any]:
+    stats["worker_pid"] = os.getpid()
+    return stats
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import List, Optional, Tuple
+
+from flow_solver.model import Board
+
+"""
+Distance fields:
+- A field stores, for every '.' cell, the number of steps to a goal when only
+  '.' cells may be crossed. Unreachable cells hold -1 and the goal holds 0.
+- Entries of cells that have since been filled are stale and never read.
+"""
+
+Coord = Tuple[int, int]
+
+UNREACHABLE = -1
+
+
+def compute_distance_field(board: Board, goal: Coord) -> List[List[int]]:
+    """BFS outward from `goal` through '.' cells."""
+    grid = board.grid
+    field = [[UNREACHABLE] * board.width for _ in range(board.size)]
+    gr, gc = goal
+    field[gr][gc] = 0
+
+    q: deque[Coord] = deque([goal])
+    while q:
+        cell = q.popleft()
+        d = field[cell[0]][cell[1]] + 1
+        for nr, nc in board.neighbors4(cell):
+            if grid[nr][nc] != '.' or field[nr][nc] != UNREACHABLE:
+                continue
+            field[nr][nc] = d
+            q.append((nr, nc))
+    return field
+
+
+def field_survives_fill(field: List[List[int]], board: Board, cell: Coord) -> bool:
+    """
+    Check whether `field` is still exact after `cell` was filled on `board`.
+
+    Filling a cell only changes distances behind it. If every empty neighbor
+    one step further from the goal has another empty predecessor at the same
+    level, no shortest path needed the cell and the field stays valid.
+    """
+    grid = board.grid
+    d = field[cell[0]][cell[1]]
+    if d == UNREACHABLE:
+        return True
+
+    for yr, yc in board.neighbors4(cell):
+        if field[yr][yc] != d + 1 or grid[yr][yc] != '.':
+            continue
+        for zr, zc in board.neighbors4((yr, yc)):
+            if (zr, zc) == cell or field[zr][zc] != d:
+                continue
+            if d == 0 or grid[zr][zc] == '.':
+                break
+        else:
+            return False
+    return True
+
+
+def head_distance(field: List[List[int]], board: Board, head: Coord, goal: Coord) -> Optional[int]:
+    """
+    Length of the shortest path from `head` to the goal of `field` through
+    empty cells (the goal may be the last cell). None if unreachable.
+    """
+    grid = board.grid
+    best: Optional[int] = None
+    for nb in board.neighbors4(head):
+        nr, nc = nb
+        if nb == goal:
+            return 1
+        if grid[nr][nc] != '.':
+            continue
+        d = field[nr][nc]
+        if d != UNREACHABLE and (best is None or d + 1 < best):
+            best = d + 1
+    return best
@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from flow_solver.model import (
+    Board,
+    PuzzleInstance,
+    build_puzzle_instance,
+    load_puzzle_from_file,
+    parse_raw_puzzle,
+)
+from flow_solver.search.bitboard import (
+    BitboardLayout,
+    _at_least_two,
+    bitboard_layout,
+    flood,
+    spread,
+)
+from flow_solver.search.budget import STOP_PATH_LIMIT, SearchBudget
+from flow_solver.search.heuristic_solver import flatten_grid
+
+"""
+Path enumeration + exact cover (DLX) solver:
+- Every simple path from each color's start to its goal through empty
+  cells is listed, depth first, as a bitmask of the empty cells it uses.
+  A branch is cut as soon as the goal is unreachable through the cells
+  still free. A finished path is dropped if it leaves a free cell with
+  fewer than two free neighbors, separates another color's terminals, or
+  walls off free cells no other terminal can reach.
+- The puzzle is then an exact-cover problem: one column per color and per
+  empty cell, one row per path, and every column covered exactly once.
+  It is solved with Knuth's Algorithm X on dancing links, always branching
+  on the column with the fewest rows.
+- Paths that run next to themselves are listed only if the puzzle has no
+  cover without them, which keeps the first pass small on most boards.
+- Path counts grow exponentially with the free area, so enumeration stops
+  after MAX_PATHS paths and the search reports stop_reason 'path_limit'.
+  The solver is meant for small boards.
+"""
+
+Coord = Tuple[int, int]
+
+# Candidate paths enumerated over all colors before giving up
+MAX_PATHS = 20000
+
+
+def solve_puzzle(
+    board: Board,
+    budget: Optional[SearchBudget] = None,
+    max_paths: int = MAX_PATHS,
+) -> Optional[Board]:
+    """
+    Solve `board` by path enumeration and exact cover; returns a solved
+    copy, or None.
+
+    With a `budget`, every path extension and every DLX search node is one
+    tick. When the budget or `max_paths` runs out the result is None and
+    budget.reason says why ('path_limit' for max_paths).
+    """
+    instance = build_puzzle_instance(board)
+    if budget is None:
+        budget = SearchBudget()
+
+    # Paths that touch themselves are only needed when nothing else works.
+    for self_touch in (False, True):
+        paths = enumerate_paths(instance, budget, max_paths, self_touch)
+        if paths is None:
+            return None
+        solution = _exact_cover(instance, board, paths, budget)
+        if solution is not None or budget.reason is not None:
+            return solution
+    return None
+
+
+def _exact_cover(
+    instance: PuzzleInstance,
+    board: Board,
+    paths: Dict[str, List[int]],
+    budget: SearchBudget,
+) -> Optional[Board]:
+    """One path per color covering every empty cell once, as a solved copy of `board`."""
+    cells = [i for i, ch in enumerate(flatten_grid(board)) if ch == '.']
+    column = {cell: len(instance.colors) + 1 + k for k, cell in enumerate(cells)}
+    links = _DancingLinks(len(instance.colors) + len(cells))
+    rows: List[Tuple[str, int]] = []
+    if len(paths) < len(instance.colors) or not all(paths.values()):
+        return None
+    for c, color in enumerate(instance.colors):
+        for mask in paths[color]:
+            links.add_row(len(rows), [c + 1] + [column[cell] for cell in _bits(mask)])
+            rows.append((color, mask))
+
+    chosen = links.search(budget)
+    if chosen is None:
+        return None
+
+    grid = [row[:] for row in board.grid]
+    for row_id in chosen:
+        color, mask = rows[row_id]
+        for cell in _bits(mask):
+            r, c = instance.geometry.coords[cell]
+            grid[r][c] = color
+    terminals = {color: coords[:] for color, coords in board.terminals.items()}
+    return Board(size=board.size, grid=grid, terminals=terminals, width=board.width)
+
+
+def solve_puzzle_file(path: str) -> Optional[Board]:
+    raw = load_puzzle_from_file(path)
+    board = parse_raw_puzzle(raw)
+    return solve_puzzle(board)
+
+
+def enumerate_paths(
+    instance: PuzzleInstance,
+    budget: SearchBudget,
+    max_paths: int = MAX_PATHS,
+    self_touch: bool = True,
+) -> Optional[Dict[str, List[int]]]:
+    """
+    color -> masks of the empty cells on each of its candidate paths.
+    None if the budget or max_paths ran out first. Without `self_touch`,
+    paths that run next to their own earlier cells (U-turns) are skipped.
+    Listing stops early at a color with no paths at all.
+    """
+    geometry = instance.geometry
+    layout = bitboard_layout(geometry.size, geometry.width)
+    near = [spread(layout, 1 << i) for i in range(geometry.num_cells)]
+    free = 0
+    for i, ch in enumerate(flatten_grid(instance.board)):
+        if ch == '.':
+            free |= 1 << i
+    terminals = {
+        color: (instance.start_index[color], instance.goal_index[color]) for color in instance.colors
+    }
+
+    paths: Dict[str, List[int]] = {}
+    total = 0
+    for color in instance.colors:
+        others = [pair for other, pair in terminals.items() if other != color]
+        found = _color_paths(
+            layout, near, geometry.adjacency, free, terminals[color], others, max_paths - total, budget, self_touch
+        )
+        if found is None:
+            if budget.reason is None:
+                budget.reason = STOP_PATH_LIMIT
+            return None
+        paths[color] = found
+        total += len(found)
+        if not found:
+            # No exact cover can exist; the other colors need not be listed
+            break
+    return paths
+
+
+def _color_paths(
+    layout: BitboardLayout,
+    near: List[int],
+    adjacency: Tuple[Tuple[int, ...], ...],
+    free: int,
+    pair: Tuple[int, int],
+    others: List[Tuple[int, int]],
+    limit: int,
+    budget: SearchBudget,
+    self_touch: bool,
+) -> Optional[List[int]]:
+    """Paths of one color (start, goal) as empty-cell masks; None past `limit` or the budget."""
+    start, goal = pair
+    other_bits = 0
+    for s, g in others:
+        other_bits |= (1 << s) | (1 << g)
+    goal_bit = 1 << goal
+
+    paths: List[int] = []
+    # (cells used so far, the path before the head incl. the start, neighbors of the head left to try)
+    stack = [(0, 0, iter(adjacency[start]))]
+    while stack:
+        used, body, neighbors = stack[-1]
+        nb = next(neighbors, None)
+        if nb is None:
+            stack.pop()
+            continue
+        if nb == goal:
+            if _leaves_room(layout, near, free & ~used, others, other_bits):
+                paths.append(used)
+                if len(paths) > limit:
+                    return None
+            continue
+        bit = 1 << nb
+        if not free & bit or used & bit or (not self_touch and near[nb] & body):
+            continue
+        if budget.tick():
+            return None
+        head = (1 << start) if not used else used & ~body & ~(1 << start)
+        body |= head
+        used |= bit
+        if _leaves_room(layout, near, free & ~used, others + [(nb, goal)], other_bits | bit | goal_bit):
+            stack.append((used, body, iter(adjacency[nb])))
+    return paths
+
+
+def _leaves_room(
+    layout: BitboardLayout,
+    near: List[int],
+    rest: int,
+    pairs: List[Tuple[int, int]],
+    endpoints: int,
+) -> bool:
+    """
+    True if the empty cells `rest` can still be filled by paths joining
+    `pairs` (the other colors' terminals, plus the current head and goal
+    while a path is being extended); `endpoints` are all their cells.
+
+    - every cell in rest has two neighbors a path through it could use
+    - each pair is adjacent or borders a common region of rest
+    - each region of rest borders both cells of some pair
+    """
+    n = layout.width
+    avail = rest | endpoints
+    twice = _at_least_two(
+        (avail << n) & layout.full,
+        avail >> n,
+        (avail << 1) & layout.not_first_col,
+        (avail >> 1) & layout.not_last_col,
+    )
+    if rest & ~twice:
+        return False
+
+    regions = []
+    left = rest
+    while left:
+        region = flood(layout, left & -left, left)
+        regions.append(region)
+        left &= ~region
+
+    fillable = 0
+    for s, g in pairs:
+        joined = near[s] & (1 << g)
+        for region in regions:
+            if near[s] & region and near[g] & region:
+                joined = True
+                fillable |= region
+        if not joined:
+            return False
+    return fillable == rest
+
+
+class _DancingLinks:
+    """
+    Knuth's dancing-links matrix for exact cover, stored in flat int lists.
+
+    Node 0 is the root; nodes 1..columns are the column headers; row nodes
+    follow. L/R link the nodes of a row (and the headers), U/D the nodes of
+    a column; C is each node's column, S each column's row count.
+    """
+
+    def __init__(self, columns: int):
+        n = columns + 1
+        self.L = [i - 1 for i in range(n)]
+        self.R = [i + 1 for i in range(n)]
+        self.L[0] = columns
+        self.R[columns] = 0
+        self.U = list(range(n))
+        self.D = list(range(n))
+        self.C = list(range(n))
+        self.S = [0] * n
+        self.row = [-1] * n
+
+    def add_row(self, row_id: int, columns: List[int]) -> None:
+        L, R, U, D = self.L, self.R, self.U, self.D
+        first = len(self.C)
+        for k, col in enumerate(columns):
+            node = first + k
+            self.C.append(col)
+            self.row.append(row_id)
+            U.append(U[col])
+            D.append(col)
+            D[U[col]] = node
+            U[col] = node
+            self.S[col] += 1
+            L.append(node - 1 if k else first + len(columns) - 1)
+            R.append(node + 1 if k < len(columns) - 1 else first)
+
+    def _cover(self, col: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[col]] = R[col]
+        L[R[col]] = L[col]
+        i = D[col]
+        while i != col:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, col: int) -> None:
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[col]
+        while i != col:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[col]] = col
+        L[R[col]] = col
+
+    def search(self, budget: SearchBudget) -> Optional[List[int]]:
+        """Row ids of one exact cover, or None (no cover, or the budget ran out)."""
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        chosen: List[int] = []  # row node picked at each level
+
+        # Each level covers the smallest column, then tries its rows in turn.
+        def choose_column() -> int:
+            best = R[0]
+            col = R[best]
+            while col != 0 and S[best] > 1:
+                if S[col] < S[best]:
+                    best = col
+                col = R[col]
+            return best
+
+        if R[0] == 0:
+            return []
+        col = choose_column()
+        self._cover(col)
+        node = D[col]
+        while True:
+            if node == C[node]:
+                # Column exhausted: backtrack a level
+                self._uncover(node)
+                if not chosen:
+                    return None
+                node = chosen.pop()
+                j = L[node]
+                while j != node:
+                    self._uncover(C[j])
+                    j = L[j]
+                node = D[node]
+                continue
+
+            if budget.tick():
+                return None
+            chosen.append(node)
+            j = R[node]
+            while j != node:
+                self._cover(C[j])
+                j = R[j]
+            if R[0] == 0:
+                return [self.row[n] for n in chosen]
+            col = choose_column()
+            if S[col] == 0:
+                # Dead end: undo this row and try the next one
+                chosen.pop()
+                j = L[node]
+                while j != node:
+                    self._uncover(C[j])
+                    j = L[j]
+                node = D[node]
+                continue
+            self._cover(col)
+            node = D[col]
+
+
+def _bits(mask: int) -> List[int]:
+    out = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
@@ -1,56 +1,164 @@
 from __future__ import annotations
 
-from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import heapq
 import time
 import tracemalloc
 
-from flow_solver.model import Board, load_puzzle_from_file, parse_raw_puzzle, Node
+from flow_solver.model import (
+    Board,
+    DeltaNode,
+    Node,
+    PuzzleInstance,
+    build_puzzle_instance,
+    load_puzzle_from_file,
+    parse_raw_puzzle,
+)
+from flow_solver.search import batch_eval, bitboard, trace as tracing
+from flow_solver.search.budget import STOP_MEMORY_LIMIT, SearchBudget
+from flow_solver.search.cursor import BoardCursor, ZobristKeys, rebuild_solution
+from flow_solver.search.decompose import (
+    RegionSignature,
+    extract_paths,
+    independent_components,
+    region_signature,
+    subproblem_board,
+)
+from flow_solver.search.distance_fields import (
+    compute_distance_field,
+    field_survives_fill,
+    head_distance,
+)
+from flow_solver.search.memory import MemoryMonitor, deep_sizeof
+from flow_solver.search.open_list import OPEN_LISTS, new_open_list
 
 Coord = Tuple[int, int]
 
 
-@dataclass
-class PuzzleInstance:
-    board: Board
-    colors: List[str]
-    starts: Dict[str, Coord]
-    goals: Dict[str, Coord]
-
 @dataclass
 class SearchStats:
     solved: bool
     states_expanded: int
     time_seconds: float
     peak_memory_bytes: int
+    # None, or why the search gave up early: 'max_states', 'time_limit',
+    # 'cancelled', 'memory_limit' (the open list was trimmed and no
+    # solution was found among what was kept), or 'path_limit' (DLX only)
+    stop_reason: Optional[str] = None
+    # Cheap memory telemetry, collected on every solve
+    peak_open_nodes: int = 0
+    open_entry_bytes: int = 0
+    peak_rss_bytes: int = 0
+    open_list_trims: int = 0
+    # Set by routing.solve_puzzle(solver='auto'): the solver attempts made,
+    # e.g. 'basic -> heuristic {"delta_nodes":true}'
+    route: Optional[str] = None
 
 
-def build_puzzle_instance(board: Board) -> PuzzleInstance:
-    colors = board.colors[:]
-    starts: Dict[str, Coord] = {}
-    goals: Dict[str, Coord] = {}
-
-    for color in colors:
-        terminals = board.terminals[color]
-        if len(terminals) != 2:
+@dataclass
+class SearchConfig:
+    """
+    Tunable options for the A* search.
+
+    - heuristic: 'manhattan' (blanks*10 + max Manhattan distance) or
+      'distance' (blanks*10 + max true path length over empty cells)
+    - lazy: keep (f, tiebreak, parent, move) entries on the open list and only
+      build and prune a child when it is popped. Children are ordered by an
+      estimate (parent h minus the filled blank) instead of their exact f.
+    - delta_nodes: store open nodes as DeltaNode (parent, move, Zobrist hash)
+      and walk one shared board between them with a make/unmake cursor.
+      Duplicate states are dropped by hash. Distance fields are not cached.
+    - engine: 'lists' (prunes walk the grid cell by cell) or 'bitboard'
+      (empty and per-color cells kept as int bitmasks; prunes are
+      shift/AND/OR fixpoint loops over the whole board)
+    - numpy_batch: when > 0 and NumPy is installed, pop this many nodes per
+      round and prune/score all of their children in one vectorized pass
+      (see batch_eval). Falls back to the per-child code without NumPy.
+    - no_self_touch: reject, before cloning, any step that would border the
+      moving color's own path other than at the head or its goal. Solutions
+      that need such U-turns are skipped, so this is off by default; puzzles
+      with a unique solution never need them.
+    - decompose: when a popped state's empty regions split into independent
+      groups (no unfinished color can reach two of them), solve each group
+      as its own subproblem, memoized by region signature, and combine.
+    - max_states / time_limit: give up (no solution, stats.stop_reason set)
+      after this many expanded states / seconds. None means unlimited.
+    - memory_limit / max_open_nodes: cap the open list at this many
+      estimated bytes / entries. Past the cap it is trimmed to its best
+      half (by f), which keeps memory bounded but makes the search
+      incomplete: a failure after a trim reports stop_reason 'memory_limit'.
+    - open_list: 'heap' (binary heap ordered by f) or 'bucket' (one bucket
+      per f; ties go to the deepest, then the oldest node; see open_list).
+      Not for the lazy search, whose entries are tuples.
+    """
+    heuristic: str = "manhattan"
+    lazy: bool = False
+    delta_nodes: bool = False
+    engine: str = "lists"
+    numpy_batch: int = 0
+    no_self_touch: bool = False
+    decompose: bool = False
+    max_states: Optional[int] = None
+    time_limit: Optional[float] = None
+    memory_limit: Optional[int] = None
+    max_open_nodes: Optional[int] = None
+    open_list: str = "heap"
+
+    def __post_init__(self) -> None:
+        if self.heuristic not in HEURISTICS:
             raise ValueError(
-                f"Color {color} has {len(terminals)} terminals, expected exactly 2"
+                f"Unknown heuristic {self.heuristic!r}, expected one of {sorted(HEURISTICS)}"
             )
-        starts[color] = terminals[0]
-        goals[color] = terminals[1]
-
-    return PuzzleInstance(board=board, colors=colors, starts=starts, goals=goals)
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown engine {self.engine!r}, expected one of {ENGINES}")
+        if self.open_list not in OPEN_LISTS:
+            raise ValueError(f"Unknown open_list {self.open_list!r}, expected one of {OPEN_LISTS}")
+        if self.open_list != "heap" and self.lazy:
+            raise ValueError("open_list only applies to the non-lazy searches")
+        if self.lazy and self.delta_nodes:
+            raise ValueError("lazy and delta_nodes cannot be combined")
+        if self.numpy_batch and (self.lazy or self.delta_nodes):
+            raise ValueError("numpy_batch only applies to the eager search")
+        if self.decompose and (self.lazy or self.delta_nodes or self.numpy_batch):
+            raise ValueError("decompose only applies to the eager search")
+        if self.max_states is not None and self.max_states < 0:
+            raise ValueError("max_states must be >= 0")
+        if self.time_limit is not None and self.time_limit < 0:
+            raise ValueError("time_limit must be >= 0")
+        if self.memory_limit is not None and self.memory_limit <= 0:
+            raise ValueError("memory_limit must be > 0")
+        if self.max_open_nodes is not None and self.max_open_nodes <= 0:
+            raise ValueError("max_open_nodes must be > 0")
+
+
+def solve_puzzle(
+    board: Board,
+    measure_memory: bool = False,
+    config: Optional[SearchConfig] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    trace: Optional[str] = None,
+) -> Tuple[Optional[Node], SearchStats]:
+    """
+    Solve `board` with A*.
 
+    `should_stop` is polled every few hundred expansions; when it returns
+    True the search is cancelled and stats.stop_reason is 'cancelled'.
 
-def solve_puzzle(board: Board, measure_memory: bool = False) -> Tuple[Optional[Node], SearchStats]:
+    `trace` is a file to record every expansion and generated child in
+    (see trace.py). Only the eager search without decompose and the
+    delta_nodes search can be traced.
+    """
+    if config is None:
+        config = SearchConfig()
+    if trace is not None and (config.lazy or config.numpy_batch or config.decompose):
+        raise ValueError("trace only applies to the eager search without decompose or to delta_nodes")
     instance = build_puzzle_instance(board)
 
     positions = {color: instance.starts[color] for color in instance.colors}
     initial_board = _clone_board(instance.board)
 
-    empty_dirs = [[0 for _ in range(initial_board.size)] for _ in range(initial_board.size)]
+    empty_dirs = [[0 for _ in range(initial_board.width)] for _ in range(initial_board.size)]
 
     start_node = Node(
         f=0,
@@ -59,6 +167,8 @@ def solve_puzzle(board: Board, measure_memory: bool = False) -> Tuple[Optional[N
         positions=positions,
         dirs=empty_dirs,
     )
+    if config.engine == "bitboard":
+        start_node.bits = bitboard.bitboard_from_board(initial_board)
 
     # Start timing
     t0 = time.perf_counter()
@@ -66,7 +176,21 @@ def solve_puzzle(board: Board, measure_memory: bool = False) -> Tuple[Optional[N
     if measure_memory:
         tracemalloc.start()
 
-    solution, states_expanded = _a_star_search(instance, start_node)
+    memory = MemoryMonitor(
+        _open_entry_bytes(config, start_node), config.memory_limit, config.max_open_nodes
+    )
+    budget = SearchBudget(config.max_states, config.time_limit, should_stop, memory)
+    recorder = tracing.TraceWriter(trace, board) if trace is not None else None
+    try:
+        solution, states_expanded = _a_star_search(
+            instance, start_node, config, budget=budget, trace=recorder
+        )
+        if recorder is not None:
+            recorder.finish(solution.zobrist if solution is not None else None, states_expanded)
+    finally:
+        if recorder is not None:
+            recorder.close()
+    memory.sample()
 
     # Stop timing
     t1 = time.perf_counter()
@@ -77,65 +201,439 @@ def solve_puzzle(board: Board, measure_memory: bool = False) -> Tuple[Optional[N
         current, peak = tracemalloc.get_traced_memory()
         tracemalloc.stop()
 
+    stop_reason = budget.reason
+    if solution is None and stop_reason is None and memory.trims:
+        stop_reason = STOP_MEMORY_LIMIT
+
     stats = SearchStats(
         solved=solution is not None,
         states_expanded=states_expanded,
         time_seconds=elapsed,
         peak_memory_bytes=peak,
+        stop_reason=stop_reason,
+        peak_open_nodes=memory.peak_open,
+        open_entry_bytes=memory.entry_bytes,
+        peak_rss_bytes=memory.peak_rss,
+        open_list_trims=memory.trims,
     )
 
     return solution, stats
 
 
-def solve_puzzle_file(path: str, measure_memory: bool = False) -> Optional[Node]:
+ENGINES = ("lists", "bitboard")
+
+
+def _open_entry_bytes(config: SearchConfig, start_node: Node) -> int:
+    """Estimated bytes per open-list entry for the search `config` selects."""
+    if config.delta_nodes:
+        sample = DeltaNode(f=0, g=0, parent=None, color=None, cell=None, prev_head=None, zobrist=1 << 63, depth=0)
+        # plus its hash in the `seen` set (one slot, roughly two words)
+        return deep_sizeof(sample) + 16
+    node_bytes = deep_sizeof(start_node)
+    if config.lazy:
+        # (f, tiebreak, parent, (color, cell)); the parent is counted in full
+        # even though siblings share it, so this errs on the safe side.
+        return node_bytes + deep_sizeof((0, 1 << 20, None, ('A', None)))
+    return node_bytes
+
+
+def solve_puzzle_file(
+    path: str,
+    measure_memory: bool = False,
+    config: Optional[SearchConfig] = None,
+) -> Tuple[Optional[Node], SearchStats]:
     raw = load_puzzle_from_file(path)
     board = parse_raw_puzzle(raw)
-    return solve_puzzle(board, measure_memory)
-
+    return solve_puzzle(board, measure_memory, config)
+
+
+def _a_star_search(
+    instance: PuzzleInstance,
+    start_node: Node,
+    config: SearchConfig,
+    memo: Optional[Dict[RegionSignature, Optional[Dict[str, List[Coord]]]]] = None,
+    budget: Optional[SearchBudget] = None,
+    trace: Optional[tracing.TraceWriter] = None,
+) -> Tuple[Optional[Node], int]:
+    heuristic = HEURISTICS[config.heuristic]
+    if memo is None:
+        memo = {}
+    if budget is None:
+        budget = SearchBudget()
 
-def _a_star_search(instance: PuzzleInstance, start_node: Node) -> Tuple[Optional[Node], int]:
     # initialize the start node
     g0 = 0
     start_node.g = g0
-    h0 = _heuristic(instance, start_node)
+    h0 = heuristic(instance, start_node)
     start_node.f = g0 + h0
 
-    # heap of the states, pop off based on the best heuristic value
-    open_heap: List[Node] = [start_node]
+    if config.lazy:
+        return _lazy_a_star_search(instance, start_node, config, budget)
+    if config.delta_nodes:
+        return _delta_a_star_search(instance, start_node, config, budget, trace)
+    if trace is not None:
+        return _traced_a_star_search(instance, start_node, config, budget, trace)
+    if config.numpy_batch and batch_eval.HAVE_NUMPY:
+        return _batched_a_star_search(instance, start_node, config, budget)
+
+    # open list of the states, pop off based on the best heuristic value
+    open_heap = new_open_list(config.open_list, start_node)
 
     state_count = 0
 
     while open_heap:  # Attempt to expand
-        node = heapq.heappop(open_heap)
+        if budget.tick(open_heap):
+            return None, state_count
+        node = open_heap.popmin()
         state_count += 1
         g = node.g
 
-        # Useful to track and see how it might get stuck!!
-        # if state_count % 1000 == 0:
-        #     print(f"\n--- State {state_count} ---")
-        #     node.pretty_print()
-
         if _is_goal(instance, node):
             return node, state_count  # return the full node, not just board/dirs
 
+        if config.decompose:
+            split = _solve_split(instance, node, config, memo, budget)
+            if split is not None:
+                solution, sub_states = split
+                state_count += sub_states
+                if solution is not None or budget.reason is not None:
+                    return solution, state_count
+                continue  # some independent part has no solution
+
         # iterate over the child states from moves of the active color
-        for child, move_cost in _expand(instance, node):
+        for child, move_cost in _expand(instance, node, config.no_self_touch):
             g_new = g + move_cost
-            h_new = _heuristic(instance, child)
+            h_new = heuristic(instance, child)
             child.g = g_new
             child.f = g_new + h_new
-            heapq.heappush(open_heap, child)
+            open_heap.push(child)
 
     return None, state_count
 
 
-"""
-Expand the state to get the successors.
-- Successors are the states that can be reached from the current active color.
-"""
-def _expand(instance: PuzzleInstance, state: Node) -> List[Tuple[Node, int]]:
+def _solve_split(
+    instance: PuzzleInstance,
+    state: Node,
+    config: SearchConfig,
+    memo: Dict[RegionSignature, Optional[Dict[str, List[Coord]]]],
+    budget: SearchBudget,
+) -> Optional[Tuple[Optional[Node], int]]:
+    """
+    Solve `state` part by part if its empty regions are independent.
+
+    Returns None if the state does not decompose. Otherwise returns
+    (solution, states expanded by the subproblems); the solution is None if
+    any part is unsolvable, the budget ran out, or a part failed after its
+    open list was trimmed. Only failures of complete searches are memoized.
+    """
+    cells = flatten_grid(state.board)
+    regions = label_empty_regions(instance, cells)
+    if regions.count < 2:
+        return None
+    split = independent_components(instance, state, regions.labels, regions.count)
+    if split is None:
+        return None
+    components, direct_colors = split
+
+    solution = _clone_state(instance, state)
+    states = 0
+    # Smallest parts first: an unsolvable part is usually found cheaply.
+    for component in sorted(components, key=lambda comp: len(comp.cells)):
+        key = region_signature(instance, state, cells, component)
+        if key not in memo:
+            sub_board = subproblem_board(instance, state, component)
+            sub_start = Node(
+                f=0,
+                g=0,
+                board=sub_board,
+                positions={color: state.positions[color] for color in component.colors},
+                dirs=[row[:] for row in state.dirs],
+            )
+            if state.bits is not None:
+                sub_start.bits = bitboard.bitboard_from_board(sub_board)
+            trims = budget.memory.trims if budget.memory is not None else 0
+            sub_solution, sub_states = _a_star_search(
+                build_puzzle_instance(sub_board), sub_start, config, memo, budget
+            )
+            states += sub_states
+            if budget.reason is not None:
+                return None, states  # out of budget: not a proof of unsolvability
+            if sub_solution is None and budget.memory is not None and budget.memory.trims > trims:
+                return None, states  # the open list was trimmed: not a proof either
+            memo[key] = (
+                extract_paths(sub_solution, component, sub_start.positions)
+                if sub_solution is not None
+                else None
+            )
+
+        paths = memo[key]
+        if paths is None:
+            return None, states
+        for color, path in paths.items():
+            for cell in path:
+                _extend_in_place(instance, solution, color, cell)
+
+    for color in direct_colors:
+        goal = instance.goals[color]
+        if goal not in state.board.neighbors4(state.positions[color]):
+            return None, states
+        _extend_in_place(instance, solution, color, goal)
+
+    solution.f = solution.g
+    return solution, states
+
+
+def _extend_in_place(instance: PuzzleInstance, state: Node, color: str, cell: Coord) -> None:
+    """Move `color` one step into `cell` on `state` itself (no clone)."""
+    hr, hc = state.positions[color]
+    state.dirs[cell[0]][cell[1]] = state.dirs[hr][hc] + 1
+    if cell != instance.goals[color]:
+        state.board.set(cell, color)
+        if state.bits is not None:
+            state.bits = state.bits.after_fill(color, instance.geometry.index(cell))
+    state.positions[color] = cell
+    state.g += 1
+
+
+def _batched_a_star_search(
+    instance: PuzzleInstance,
+    start_node: Node,
+    config: SearchConfig,
+    budget: SearchBudget,
+) -> Tuple[Optional[Node], int]:
+    """
+    A* that pops up to `config.numpy_batch` nodes per round and evaluates all
+    of their children with one call to batch_eval.evaluate_children.
+    """
+    heuristic = HEURISTICS[config.heuristic]
+    open_heap = new_open_list(config.open_list, start_node)
+    state_count = 0
+
+    while open_heap:
+        popped: List[Node] = []
+        while open_heap and len(popped) < config.numpy_batch:
+            popped.append(open_heap.popmin())
+
+        children: List[Node] = []
+        for node in popped:
+            if budget.tick(open_heap):
+                return None, state_count
+            state_count += 1
+            if _is_goal(instance, node):
+                return node, state_count
+            active, legal = _select_moves(instance, node, config.no_self_touch)
+            for nb in legal:
+                child = _apply_move(instance, node, active, nb)
+                child.g = node.g + 1
+                children.append(child)
+
+        pruned, blanks = batch_eval.evaluate_children(instance, children)
+        for child, is_pruned, child_blanks in zip(children, pruned, blanks):
+            if is_pruned:
+                continue
+            if heuristic is _heuristic:
+                h_new = child_blanks * 10 + _max_manhattan(instance, child)
+            else:
+                h_new = heuristic(instance, child)
+            child.f = child.g + h_new
+            open_heap.push(child)
+
+    return None, state_count
+
+
+def _traced_a_star_search(
+    instance: PuzzleInstance,
+    start_node: Node,
+    config: SearchConfig,
+    budget: SearchBudget,
+    trace: tracing.TraceWriter,
+) -> Tuple[Optional[Node], int]:
+    """
+    The eager search, recording every expansion and every child (with the
+    prune that rejected it) in `trace`. Nodes carry Zobrist hashes so
+    records can be linked to their parents.
+    """
+    heuristic = HEURISTICS[config.heuristic]
+    keys = ZobristKeys(instance)
+    start_node.zobrist = keys.initial(instance, start_node.positions)
+    open_heap = new_open_list(config.open_list, start_node)
+    state_count = 0
+
+    while open_heap:
+        if budget.tick(open_heap):
+            return None, state_count
+        node = open_heap.popmin()
+        state_count += 1
+        trace.expand(node.zobrist, node.g, node.f - node.g)
+
+        if _is_goal(instance, node):
+            return node, state_count
+
+        active, legal = _select_moves(instance, node, config.no_self_touch)
+        g_new = node.g + 1
+        for nb in legal:
+            child = _apply_move(instance, node, active, nb)
+            key = keys.after_move(instance, node.zobrist, active, node.positions[active], nb)
+            reason = prune_reason(instance, child, nb[0], nb[1])
+            if reason is not None:
+                trace.child(key, active, nb, g_new, 0, reason)
+                continue
+            h_new = heuristic(instance, child)
+            child.g = g_new
+            child.f = g_new + h_new
+            child.zobrist = key
+            trace.child(key, active, nb, g_new, h_new)
+            open_heap.push(child)
+
+    return None, state_count
+
+
+# Open-list entry for lazy search: (f estimate, tiebreak, parent, move).
+# A move of None marks an already materialized node (the start node).
+LazyEntry = Tuple[int, int, Node, Optional[Tuple[str, Coord]]]
+
+
+def _lazy_a_star_search(
+    instance: PuzzleInstance,
+    start_node: Node,
+    config: SearchConfig,
+    budget: SearchBudget,
+) -> Tuple[Optional[Node], int]:
+    """
+    A* that defers building children until they are popped.
+
+    Generating a child only costs a heap push; cloning, pruning and the real
+    heuristic run when the entry reaches the top of the open list. The entry
+    is ordered by the parent's h minus the blank the move fills.
+    """
+    heuristic = HEURISTICS[config.heuristic]
+    open_heap: List[LazyEntry] = [(start_node.f, 0, start_node, None)]
+    tiebreak = 0
+    state_count = 0
+
+    while open_heap:
+        _, _, parent, move = heapq.heappop(open_heap)
+
+        if move is None:
+            node = parent
+        else:
+            color, nb = move
+            node = _apply_move(instance, parent, color, nb)
+            if prune(instance, node, nb[0], nb[1]):
+                continue
+            node.g = parent.g + 1
+            node.f = node.g + heuristic(instance, node)
+
+        if budget.tick(open_heap):
+            return None, state_count
+        state_count += 1
+
+        if _is_goal(instance, node):
+            return node, state_count
+
+        active, legal = _select_moves(instance, node, config.no_self_touch)
+        h = node.f - node.g
+        goal = instance.goals[active] if active is not None else None
+        for nb in legal:
+            h_estimate = h if nb == goal else h - 10
+            tiebreak += 1
+            heapq.heappush(open_heap, (node.g + 1 + h_estimate, tiebreak, node, (active, nb)))
+
+    return None, state_count
+
+
+def _delta_a_star_search(
+    instance: PuzzleInstance,
+    start_node: Node,
+    config: SearchConfig,
+    budget: SearchBudget,
+    trace: Optional[tracing.TraceWriter] = None,
+) -> Tuple[Optional[Node], int]:
+    """
+    A* over DeltaNodes.
+
+    Children are scored by making the move on the shared cursor board,
+    pruning and evaluating in place, then unmaking it, so no grid is ever
+    cloned. The full Node (board, positions, dirs) is only rebuilt for the
+    solution. Children dropped as already seen are traced as 'duplicate'.
+    """
+    heuristic = HEURISTICS[config.heuristic]
+    keys = ZobristKeys(instance)
+    root = DeltaNode(
+        f=start_node.f,
+        g=start_node.g,
+        parent=None,
+        color=None,
+        cell=None,
+        prev_head=None,
+        zobrist=keys.initial(instance, start_node.positions),
+        depth=0,
+    )
+    cursor = BoardCursor(instance, _clone_board(start_node.board), start_node.positions, root)
+    if start_node.bits is not None:
+        cursor.bits = bitboard.bitboard_from_board(cursor.board)
+
+    open_heap = new_open_list(config.open_list, root)
+    seen = {root.zobrist}
+    state_count = 0
+
+    while open_heap:
+        if budget.tick(open_heap):
+            return None, state_count
+        node = open_heap.popmin()
+        state_count += 1
+        cursor.move_to(node)
+        if trace is not None:
+            trace.expand(node.zobrist, node.g, node.f - node.g)
+
+        if _is_goal(instance, cursor):
+            solution = rebuild_solution(instance, cursor)
+            solution.zobrist = node.zobrist
+            return solution, state_count
+
+        active, legal = _select_moves(instance, cursor, config.no_self_touch)
+        for nb in legal:
+            prev_head = cursor.make(active, nb)
+            key = keys.after_move(instance, node.zobrist, active, prev_head, nb)
+            reason = "duplicate" if key in seen else prune_reason(instance, cursor, nb[0], nb[1])
+            if reason is None:
+                seen.add(key)
+                cursor.dist_fields = None
+                g = node.g + 1
+                child = DeltaNode(
+                    f=g + heuristic(instance, cursor),
+                    g=g,
+                    parent=node,
+                    color=active,
+                    cell=nb,
+                    prev_head=prev_head,
+                    zobrist=key,
+                    depth=node.depth + 1,
+                )
+                open_heap.push(child)
+                if trace is not None:
+                    trace.child(key, active, nb, g, child.f - g)
+            elif trace is not None:
+                trace.child(key, active, nb, node.g + 1, 0, reason)
+            cursor.unmake(active, nb, prev_head)
+
+    return None, state_count
+
+
+def _select_moves(
+    instance: PuzzleInstance,
+    state: Node,
+    no_self_touch: bool = False,
+) -> Tuple[Optional[str], List[Coord]]:
+    """
+    Pick the color to extend and its legal moves.
+
+    With `no_self_touch`, a step into a cell that borders the same color
+    anywhere except the current head and the color's goal is not legal.
+
+    Returns (None, []) when every color is home or some color is stuck.
+    """
     board = state.board
-    successors: List[Tuple[Node, int]] = []
 
     # moves[color] = list of legal neighbor coords for that color
     moves: Dict[str, List[Coord]] = {}
@@ -157,37 +655,75 @@ def _expand(instance: PuzzleInstance, state: Node) -> List[Tuple[Node, int]]:
                     legal.append(nb)
             else:
                 if cell == '.':
+                    if no_self_touch and _touches_own_path(board, nb, color, current, goal):
+                        continue
                     legal.append(nb)
 
         if not legal:
-            return []  # dead state
+            return None, []  # dead state
 
         moves[color] = legal
 
-    # Return empty list: goal reached or no moves possible for any color
+    # Goal reached: no color left to move
     if not moves:
-        return successors
+        return None, []
 
-    # 2. Choose a single active color: the most constrained.
-    active = min(moves.keys(), key=lambda c: (len(moves[c]), c))
-    goal = instance.goals[active]
+    # 2. Choose a single active color: the most constrained. Ties go to the
+    #    earlier color in instance.colors (so '3' before '27').
+    active = min(moves.keys(), key=lambda c: len(moves[c]))
+    return active, moves[active]
 
-    head_r, head_c = state.positions[active]
 
-    for nb in moves[active]:
-        child = _clone_state(instance, state)
-        move_cost = 1
+def _touches_own_path(board: Board, cell: Coord, color: str, head: Coord, goal: Coord) -> bool:
+    """
+    True if stepping into `cell` would put `color` next to its own earlier
+    path (a U-turn or a 2x2 block of one color).
+    """
+    for nb in board.neighbors4(cell):
+        if nb != head and nb != goal and board.get(nb) == color:
+            return True
+    return False
 
-        nr, nc = nb
 
-        prev_index = child.dirs[head_r][head_c]
-        new_index = prev_index + 1
-        child.dirs[nr][nc] = new_index
+def _apply_move(instance: PuzzleInstance, state: Node, color: str, nb: Coord) -> Node:
+    """Clone `state` and extend `color` from its head into `nb`."""
+    child = _clone_state(instance, state)
+
+    head_r, head_c = state.positions[color]
+    nr, nc = nb
+
+    prev_index = child.dirs[head_r][head_c]
+    new_index = prev_index + 1
+    child.dirs[nr][nc] = new_index
+
+    if nb != instance.goals[color]:
+        child.board.set(nb, color)
+        child.last_move = nb
+        if child.bits is not None:
+            child.bits = child.bits.after_fill(color, instance.geometry.index(nb))
+
+    child.positions[color] = nb
+    return child
+
+
+"""
+Expand the state to get the successors.
+- Successors are the states that can be reached from the current active color.
+"""
+def _expand(
+    instance: PuzzleInstance,
+    state: Node,
+    no_self_touch: bool = False,
+) -> List[Tuple[Node, int]]:
+    successors: List[Tuple[Node, int]] = []
+
+    active, legal = _select_moves(instance, state, no_self_touch)
 
-        if nb != goal:
-            child.board.set(nb, active)
+    for nb in legal:
+        child = _apply_move(instance, state, active, nb)
+        move_cost = 1
 
-        child.positions[active] = nb
+        nr, nc = nb
 
 
         """
@@ -222,7 +758,10 @@ def _heuristic(instance: PuzzleInstance, state: Node) -> int:
     # distance from any head to its goal.
     board = state.board
     blanks = sum(row.count('.') for row in board.grid)
+    return (blanks * 10) + _max_manhattan(instance, state)
+
 
+def _max_manhattan(instance: PuzzleInstance, state: Node) -> int:
     max_manhattan = 0
     for color in instance.colors:
         pos = state.positions[color]
@@ -231,7 +770,47 @@ def _heuristic(instance: PuzzleInstance, state: Node) -> int:
             d = _manhattan(pos, goal)
             if d > max_manhattan:
                 max_manhattan = d
-    return (blanks * 10) + max_manhattan
+    return max_manhattan
+
+
+def _distance_heuristic(instance: PuzzleInstance, state: Node) -> int:
+    # Same shape as _heuristic, but with the true shortest path length through
+    # empty cells instead of Manhattan distance. Per-goal distance fields are
+    # inherited from the parent and only recomputed when the last move cut
+    # through them.
+    board = state.board
+    blanks = sum(row.count('.') for row in board.grid)
+
+    fields = state.dist_fields
+    if fields is None:
+        fields = state.dist_fields = {}
+    moved = state.last_move
+
+    max_distance = 0
+    for color in instance.colors:
+        pos = state.positions[color]
+        goal = instance.goals[color]
+        if pos == goal:
+            continue
+
+        field = fields.get(color)
+        if field is None or (moved is not None and not field_survives_fill(field, board, moved)):
+            field = compute_distance_field(board, goal)
+            fields[color] = field
+
+        d = head_distance(field, board, pos, goal)
+        if d is None:
+            # Unreachable goals are pruned; only the start node can get here.
+            d = board.size * board.width
+        if d > max_distance:
+            max_distance = d
+    return (blanks * 10) + max_distance
+
+
+HEURISTICS = {
+    "manhattan": _heuristic,
+    "distance": _distance_heuristic,
+}
 
 
 def _is_goal(instance: PuzzleInstance, state: Node) -> bool:
@@ -242,10 +821,9 @@ def _is_goal(instance: PuzzleInstance, state: Node) -> bool:
 
 
 def _board_is_full(board: Board) -> bool:
-    for r in range(board.size):
-        for c in range(board.size):
-            if board.grid[r][c] == '.':
-                return False
+    for row in board.grid:
+        if '.' in row:
+            return False
     return True
 
 
@@ -256,19 +834,23 @@ def _manhattan(a: Coord, b: Coord) -> int:
 def _clone_board(board: Board) -> Board:
     new_grid = [row[:] for row in board.grid]
     new_terminals = {k: v[:] for k, v in board.terminals.items()}
-    return Board(size=board.size, grid=new_grid, terminals=new_terminals)
+    return Board(size=board.size, grid=new_grid, terminals=new_terminals, width=board.width)
 
 
 def _clone_state(instance: PuzzleInstance, state: Node) -> Node:
     new_board = _clone_board(state.board)
     new_positions = dict(state.positions)
     new_dirs = [row[:] for row in state.dirs]
+    # Fields are shared with the parent; the heuristic replaces stale entries.
+    new_fields = dict(state.dist_fields) if state.dist_fields is not None else None
     return Node(
         f=state.f,
         g=state.g,
         board=new_board,
         positions=new_positions,
         dirs=new_dirs,
+        dist_fields=new_fields,
+        bits=state.bits,
     )
 
 
@@ -279,15 +861,40 @@ def _clone_state(instance: PuzzleInstance, state: Node) -> Node:
 
 
 def prune(instance: PuzzleInstance, state: Node, nr: int, nc: int) -> bool:
-    if corner_prune(instance, state, nr, nc):
-        return True
-    if unreachable_goal_prune(instance, state):
-        return True
-    if isolated_region_prune(instance, state):
-        return True
-    return False
+    return prune_reason(instance, state, nr, nc) is not None
+
+
+def prune_reason(instance: PuzzleInstance, state: Node, nr: int, nc: int) -> Optional[str]:
+    """Name of the first prune that rejects `state` (see trace.PRUNES), or None."""
+    if state.bits is not None:
+        return bitboard.prune_reason(instance, state.positions, state.bits)
+
+    # The prunes work on a flat copy of the grid indexed like instance.geometry.
+    cells = flatten_grid(state.board)
+    if corner_prune(instance, state, nr, nc, cells):
+        return "corner"
+    # One labeling of the empty regions serves both region-based prunes.
+    regions = label_empty_regions(instance, cells)
+    if unreachable_goal_prune(instance, state, regions):
+        return "unreachable_goal"
+    if isolated_region_prune(instance, state, regions):
+        return "isolated_region"
+    if stranded_region_prune(instance, state, regions):
+        return "stranded_region"
+    return None
+
+
+def flatten_grid(board: Board) -> List[str]:
+    """Row-major copy of the grid: cells[r * N + c] == grid[r][c]."""
+    return [ch for row in board.grid for ch in row]
 
-def corner_prune(instance: PuzzleInstance, state: Node, nr: int, nc: int) -> bool:
+def corner_prune(
+    instance: PuzzleInstance,
+    state: Node,
+    nr: int,
+    nc: int,
+    cells: Optional[List[str]] = None,
+) -> bool:
     """
     From the new head position (nr, nc), look at the four diagonal cells.
     For each diagonal cell that is in-bounds and '.', check its 4 neighbors
@@ -298,76 +905,92 @@ def corner_prune(instance: PuzzleInstance, state: Node, nr: int, nc: int) -> boo
 
     then this state is pruned, return True.
     """
-    board = state.board
-    grid = board.grid
-    size = board.size
+    if cells is None:
+        cells = flatten_grid(state.board)
+    geometry = instance.geometry
+    adjacency = geometry.adjacency
 
     # set of all current pipe heads
-    heads = set(state.positions.values())
+    heads = {geometry.index(pos) for pos in state.positions.values()}
 
-    # set of all goal/terminal positions
-    goals = set(instance.goals.values())
+    # goals nobody has reached yet count as open; heads not yet home count as heads
+    open_goals = instance.goal_cells - heads
+    live_heads = heads - instance.goal_cells
 
     # For every cell in the board
-    for r in range(size):
-        for c in range(size):
-
-            # Only inspect empty cells
-            if grid[r][c] != '.':
-                continue
-
-            # Check the 4 direct neighbors
-            neighbors = [(r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)]
-            empty_neighbors = 0
-            touches_head = False
-
-            for rr, cc in neighbors:
-                if 0 <= rr < size and 0 <= cc < size:
+    for i, ch in enumerate(cells):
 
-                    is_head = (rr, cc) in heads
-                    is_goal = (rr, cc) in goals
-
-                    if grid[rr][cc] == '.' or (is_goal and not is_head):
-                        empty_neighbors += 1
-
-                    # Any adjacency to a head still counts for this condition
-                    if is_head and not is_goal:
-                        touches_head = True
+        # Only inspect empty cells
+        if ch != '.':
+            continue
 
+        # Check the 4 direct neighbors
+        empty_neighbors = 0
+        for j in adjacency[i]:
+            if cells[j] == '.' or j in open_goals:
+                empty_neighbors += 1
+            # Any adjacency to a head still counts for this condition
+            elif j in live_heads:
+                break
+        else:
             # Prune condition: this empty cell is isolated
-            if not (empty_neighbors >= 2 or touches_head):
+            if empty_neighbors < 2:
                 return True
 
     # All empty cells passed the check → do not prune
     return False
 
 
-def unreachable_goal_prune(instance: PuzzleInstance, state: Node) -> bool:
+def unreachable_goal_prune(
+    instance: PuzzleInstance,
+    state: Node,
+    regions: Optional[EmptyRegions] = None,
+) -> bool:
     """
     If any active color has no path to its goal given current walls, prune.
     Only '.' cells are traversable; the color's goal cell is allowed as the
     final step.
+
+    A head reaches its goal iff it is adjacent to it, or some empty neighbor
+    of the head shares a region with some empty neighbor of the goal.
     """
-    board = state.board
+    if regions is None:
+        regions = label_empty_regions(instance, flatten_grid(state.board))
+    labels = regions.labels
+    geometry = instance.geometry
+    adjacency = geometry.adjacency
+
     for color in instance.colors:
         head = state.positions[color]
         goal = instance.goals[color]
         if head == goal:
             continue
-        if _shortest_path_length(board, head, goal) is None:
-            return True
+        goal_i = instance.goal_index[color]
+        head_regions = set()
+        for j in adjacency[geometry.index(head)]:
+            if j == goal_i:
+                break
+            if labels[j] >= 0:
+                head_regions.add(labels[j])
+        else:
+            for j in adjacency[goal_i]:
+                if labels[j] in head_regions:
+                    break
+            else:
+                return True
     return False
 
 
-def isolated_region_prune(instance: PuzzleInstance, state: Node) -> bool:
+def isolated_region_prune(
+    instance: PuzzleInstance,
+    state: Node,
+    regions: Optional[EmptyRegions] = None,
+) -> bool:
     """
     '.' cells must be reachable from at least one active head. If an empty
     region is completely fenced off by existing pipes/terminals, the board
     can never be filled.
     """
-    board = state.board
-    size = board.size
-
     active_heads = [
         state.positions[color]
         for color in instance.colors
@@ -378,56 +1001,84 @@ def isolated_region_prune(instance: PuzzleInstance, state: Node) -> bool:
     if not active_heads:
         return False
 
-    reachable = [[False for _ in range(size)] for _ in range(size)]
-    q: deque[Coord] = deque()
+    if regions is None:
+        regions = label_empty_regions(instance, flatten_grid(state.board))
+    labels = regions.labels
+    geometry = instance.geometry
+    adjacency = geometry.adjacency
 
-    # Multi-source BFS starting from each active head into '.' cells only.
+    # Every region must border at least one active head.
+    touched = set()
     for head in active_heads:
-        hr, hc = head
-        reachable[hr][hc] = True
-        for nb in board.neighbors4(head):
-            if board.get(nb) == '.' and not reachable[nb[0]][nb[1]]:
-                reachable[nb[0]][nb[1]] = True
-                q.append(nb)
-
-    while q:
-        r, c = q.popleft()
-        for nb in board.neighbors4((r, c)):
-            nr, nc = nb
-            if board.get(nb) != '.' or reachable[nr][nc]:
-                continue
-            reachable[nr][nc] = True
-            q.append(nb)
+        for j in adjacency[geometry.index(head)]:
+            if labels[j] >= 0:
+                touched.add(labels[j])
 
-    for r in range(size):
-        for c in range(size):
-            if board.grid[r][c] == '.' and not reachable[r][c]:
-                return True
+    return len(touched) < regions.count
 
-    return False
 
+def stranded_region_prune(
+    instance: PuzzleInstance,
+    state: Node,
+    regions: Optional[EmptyRegions] = None,
+) -> bool:
+    """
+    Every empty region must be bordered by both the head and the goal of at
+    least one unfinished color. A path that fills part of a region enters it
+    next to its head and leaves it next to its goal, so a region no color
+    can pass through can never be filled.
+    """
+    if regions is None:
+        regions = label_empty_regions(instance, flatten_grid(state.board))
+    if regions.count == 0:
+        return False
+    labels = regions.labels
+    geometry = instance.geometry
+    adjacency = geometry.adjacency
+
+    fillable = set()
+    for color in instance.colors:
+        head = state.positions[color]
+        if head == instance.goals[color]:
+            continue
+        head_regions = {labels[j] for j in adjacency[geometry.index(head)] if labels[j] >= 0}
+        if not head_regions:
+            continue
+        for j in adjacency[instance.goal_index[color]]:
+            if labels[j] in head_regions:
+                fillable.add(labels[j])
+
+    return len(fillable) < regions.count
 
-def _shortest_path_length(board: Board, start: Coord, goal: Coord) -> Optional[int]:
+
+@dataclass
+class EmptyRegions:
     """
-    Shortest path length from start to goal using only '.' cells (goal is
-    allowed as the final cell). Returns None if unreachable.
+    4-connected components of '.' cells.
+
+    - labels: flat cell index -> region id for '.' cells, -1 elsewhere
+    - count: number of regions (ids are 0..count-1)
     """
-    if start == goal:
-        return 0
+    labels: List[int]
+    count: int
 
-    q: deque[Tuple[Coord, int]] = deque([(start, 0)])
-    visited = {start}
 
-    while q:
-        (r, c), dist = q.popleft()
-        for nb in board.neighbors4((r, c)):
-            if nb in visited:
-                continue
-            cell = board.get(nb)
-            if cell == '.':
-                visited.add(nb)
-                q.append((nb, dist + 1))
-            elif nb == goal:
-                return dist + 1
-    return None
+def label_empty_regions(instance: PuzzleInstance, cells: List[str]) -> EmptyRegions:
+    """Label the connected regions of '.' cells in one pass over the board."""
+    adjacency = instance.geometry.adjacency
+    labels = [-1] * len(cells)
+    count = 0
 
+    for i, ch in enumerate(cells):
+        if ch != '.' or labels[i] >= 0:
+            continue
+        labels[i] = count
+        stack = [i]
+        while stack:
+            for j in adjacency[stack.pop()]:
+                if cells[j] == '.' and labels[j] < 0:
+                    labels[j] = count
+                    stack.append(j)
+        count += 1
+
+    return EmptyRegions(labels=labels, count=count)
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from flow_solver.model import Board, Node
+from flow_solver.search import heuristic_solver
+from flow_solver.search.budget import STOP_MAX_STATES, STOP_TIME_LIMIT
+from flow_solver.search.decompose import WALL
+from flow_solver.search.heuristic_solver import SearchConfig, SearchStats
+
+"""
+Incremental re-solve after small edits:
+- The previous solution's paths are kept for every color the edit does
+  not touch; those cells become walls and only the affected colors are
+  searched, on a board with far fewer empty cells.
+- A color is affected when its terminal moved, when the user drew part of
+  its path, or when its old path runs over a cell the edit claimed.
+- If the affected colors cannot be routed around the kept paths, the
+  colors bordering the free area are released too, round after round,
+  ending with a search from scratch. max_states and time_limit cover all
+  rounds together, not each round.
+- Cells already drawn for a color are honored by moving that color's
+  terminal to the end of the drawn segment (the segment itself is a wall).
+"""
+
+Coord = Tuple[int, int]
+
+
+@dataclass
+class PuzzleEdit:
+    """
+    A small change to a puzzle.
+
+    - moved_terminals: color -> (old coord, new coord)
+    - prefilled: color -> cells drawn for that color, in drawing order,
+      starting next to one of its terminals. Ending on the other terminal
+      completes the color.
+    """
+    moved_terminals: Dict[str, Tuple[Coord, Coord]] = field(default_factory=dict)
+    prefilled: Dict[str, List[Coord]] = field(default_factory=dict)
+
+
+def apply_edit(board: Board, edit: PuzzleEdit) -> Board:
+    """The edited puzzle: terminals only (moved where the edit says), no paths."""
+    terminals = {color: coords[:] for color, coords in board.terminals.items()}
+    for color, (old, new) in edit.moved_terminals.items():
+        if old not in terminals.get(color, []):
+            raise ValueError(f"{color} has no terminal at {old}")
+        if not board.in_bounds(new):
+            raise ValueError(f"{new} is off the board")
+        terminals[color][terminals[color].index(old)] = new
+
+    grid = [['.'] * board.width for _ in range(board.size)]
+    for color, coords in terminals.items():
+        for r, c in coords:
+            if grid[r][c] != '.':
+                raise ValueError(f"Terminals of {grid[r][c]} and {color} share cell {(r, c)}")
+            grid[r][c] = color
+    edited = Board(size=board.size, grid=grid, terminals=terminals, width=board.width)
+
+    for color, cells in edit.prefilled.items():
+        _segment_ends(edited, color, cells)  # validates
+    return edited
+
+
+def solution_paths(board: Board) -> Dict[str, List[Coord]]:
+    """
+    color -> its path from terminals[0] to terminals[1] in a (partly)
+    solved board. Colors whose cells do not form one such path are left out.
+    """
+    paths = {}
+    for color, terminals in board.terminals.items():
+        if len(terminals) == 2:
+            path = _trace(board, color, terminals[0], terminals[1])
+            if path is not None:
+                paths[color] = path
+    return paths
+
+
+def affected_colors(previous: Board, edited: Board, edit: PuzzleEdit) -> Set[str]:
+    """Colors whose previous path cannot be kept as is."""
+    old_paths = solution_paths(previous)
+    affected = set(edit.moved_terminals) | set(edit.prefilled)
+    affected |= set(edited.terminals) - set(old_paths)
+    claimed = {coord for coords in edited.terminals.values() for coord in coords}
+    claimed |= {cell for cells in edit.prefilled.values() for cell in cells}
+    for color, path in old_paths.items():
+        if color not in affected and claimed & (set(path) - set(previous.terminals[color])):
+            affected.add(color)
+    return affected
+
+
+def resolve(
+    previous: Union[Board, Node],
+    edit: Optional[PuzzleEdit] = None,
+    config: Optional[SearchConfig] = None,
+) -> Tuple[Optional[Board], SearchStats]:
+    """
+    Solve the edited puzzle, reusing `previous` where the edit allows.
+
+    `previous` is the last solution (a Board, or a Node from the heuristic
+    solver) or just the puzzle; an unsolved color is always searched.
+    Returns (solved Board or None, stats summed over every round).
+    """
+    previous_board = previous.board if isinstance(previous, Node) else previous
+    edit = edit or PuzzleEdit()
+    edited = apply_edit(previous_board, edit)
+    old_paths = solution_paths(previous_board)
+    affected = affected_colors(previous_board, edited, edit)
+
+    config = config or SearchConfig()
+    t0 = time.perf_counter()
+    states = 0
+    while True:
+        kept = {color: path for color, path in old_paths.items() if color not in affected}
+        round_config, stop_reason = _remaining_budget(config, states, time.perf_counter() - t0)
+        if round_config is None:
+            node = None
+            stats = SearchStats(
+                solved=False, states_expanded=0, time_seconds=0.0, peak_memory_bytes=0, stop_reason=stop_reason
+            )
+            break
+        sub = _subproblem(edited, kept, affected, edit.prefilled)
+        node, stats = heuristic_solver.solve_puzzle(sub, config=round_config)
+        states += stats.states_expanded
+        if node is not None or stats.stop_reason is not None or not kept:
+            break
+        affected |= _bordering_colors(edited, kept)
+
+    stats.states_expanded = states
+    stats.time_seconds = time.perf_counter() - t0
+    if node is None:
+        return None, stats
+    return _merge(edited, kept, edit.prefilled, node.board), stats
+
+
+def next_hint(
+    board: Board,
+    progress: Optional[Dict[str, List[Coord]]] = None,
+    previous: Optional[Union[Board, Node]] = None,
+    config: Optional[SearchConfig] = None,
+) -> Optional[Tuple[str, Coord]]:
+    """
+    Next cell to draw, as (color, cell), given what the user has drawn so far.
+
+    `progress` is in PuzzleEdit.prefilled form. When `previous` (a full
+    solution) agrees with the progress, the hint is read straight off it;
+    otherwise the puzzle is re-solved around the progress first. Colors
+    already started come first, then the one with the shortest path.
+    Returns None when every color is drawn or no solution exists.
+    """
+    progress = progress or {}
+    solution = previous.board if isinstance(previous, Node) else previous
+    if solution is not None and solution.terminals != board.terminals:
+        solution = None  # a solution of some other puzzle
+    paths = solution_paths(solution) if solution is not None else {}
+    if len(paths) < len(board.terminals) or not all(
+        _follows(paths[color], cells) for color, cells in progress.items()
+    ):
+        solution, _ = resolve(solution or board, PuzzleEdit(prefilled=progress), config)
+        if solution is None:
+            return None
+        paths = solution_paths(solution)
+
+    candidates = []
+    for color in board.colors:
+        path = paths[color]
+        drawn = progress.get(color, [])
+        if drawn and drawn[0] not in path[1:2]:
+            path = path[::-1]
+        remaining = path[1 + len(drawn):-1]
+        if remaining:
+            candidates.append((not drawn, len(remaining), color, remaining[0]))
+    if not candidates:
+        return None
+    _, _, color, cell = min(candidates)
+    return color, cell
+
+
+def _remaining_budget(
+    config: SearchConfig,
+    states: int,
+    elapsed: float,
+) -> Tuple[Optional[SearchConfig], Optional[str]]:
+    """
+    (`config` with the budget left after `states` expansions and `elapsed`
+    seconds, None) or, once a budget is used up, (None, stop reason).
+    """
+    max_states = time_limit = None
+    if config.max_states is not None:
+        max_states = config.max_states - states
+        if max_states <= 0:
+            return None, STOP_MAX_STATES
+    if config.time_limit is not None:
+        time_limit = config.time_limit - elapsed
+        if time_limit <= 0:
+            return None, STOP_TIME_LIMIT
+    return dataclasses.replace(config, max_states=max_states, time_limit=time_limit), None
+
+
+def _follows(path: List[Coord], cells: List[Coord]) -> bool:
+    """True if `cells` are how `path` continues from one of its ends."""
+    n = len(cells)
+    return path[1:1 + n] == cells or path[::-1][1:1 + n] == cells
+
+
+def _segment_ends(board: Board, color: str, cells: List[Coord]) -> Tuple[Coord, Optional[Coord]]:
+    """
+    (terminal the drawn segment starts from, new head or None if the
+    segment reaches the other terminal). Raises ValueError for a segment
+    that is not a path out of a terminal over empty cells.
+    """
+    terminals = board.terminals.get(color)
+    if not terminals or len(terminals) != 2:
+        raise ValueError(f"{color} needs two terminals")
+    if not cells:
+        raise ValueError(f"Empty segment for {color}")
+    start = next((t for t in terminals if cells[0] in board.neighbors4(t)), None)
+    if start is None:
+        raise ValueError(f"Segment for {color} does not start next to one of its terminals")
+    other = terminals[1] if start == terminals[0] else terminals[0]
+    for prev, cell in zip([start] + cells, cells):
+        if cell not in board.neighbors4(prev):
+            raise ValueError(f"Segment for {color} is not connected at {cell}")
+    if len(set(cells)) != len(cells):
+        raise ValueError(f"Segment for {color} crosses itself")
+    finished = cells[-1] == other
+    for cell in cells[:-1] if finished else cells:
+        if board.get(cell) != '.':
+            raise ValueError(f"Segment for {color} runs over {board.get(cell)} at {cell}")
+    return start, None if finished else cells[-1]
+
+
+def _subproblem(
+    edited: Board,
+    kept: Dict[str, List[Coord]],
+    affected: Set[str],
+    prefilled: Dict[str, List[Coord]],
+) -> Board:
+    """Board where kept paths and drawn segments are walls; only `affected` colors remain."""
+    grid = [row[:] for row in edited.grid]
+    for path in kept.values():
+        for r, c in path:
+            grid[r][c] = WALL
+
+    terminals: Dict[str, List[Coord]] = {}
+    for color in sorted(affected):
+        pair = edited.terminals[color][:]
+        cells = prefilled.get(color)
+        if cells:
+            start, head = _segment_ends(edited, color, cells)
+            for r, c in [start] + cells:
+                grid[r][c] = WALL
+            if head is None:  # drawn to the end: nothing left to search
+                continue
+            grid[head[0]][head[1]] = color
+            pair[pair.index(start)] = head
+        terminals[color] = pair
+    return Board(size=edited.size, grid=grid, terminals=terminals, width=edited.width)
+
+
+def _bordering_colors(edited: Board, kept: Dict[str, List[Coord]]) -> Set[str]:
+    """Kept colors with a path cell next to a cell the search may use."""
+    walls = {cell for path in kept.values() for cell in path}
+    return {
+        color
+        for color, path in kept.items()
+        if any(nb not in walls for cell in path for nb in edited.neighbors4(cell))
+    } or set(kept)
+
+
+def _merge(
+    edited: Board,
+    kept: Dict[str, List[Coord]],
+    prefilled: Dict[str, List[Coord]],
+    solved: Board,
+) -> Board:
+    grid = [row[:] for row in edited.grid]
+    for color, path in kept.items():
+        for r, c in path:
+            grid[r][c] = color
+    for color, cells in prefilled.items():
+        for r, c in cells:
+            grid[r][c] = color
+    for r, row in enumerate(solved.grid):
+        for c, cell in enumerate(row):
+            if cell != WALL and cell != '.':
+                grid[r][c] = cell
+    terminals = {color: coords[:] for color, coords in edited.terminals.items()}
+    return Board(size=edited.size, grid=grid, terminals=terminals, width=edited.width)
+
+
+def _trace(board: Board, color: str, start: Coord, goal: Coord) -> Optional[List[Coord]]:
+    """Path from start to goal over exactly the cells labeled `color` (backtracking)."""
+    cells = {
+        (r, c) for r, row in enumerate(board.grid) for c, cell in enumerate(row) if cell == color
+    }
+    if start not in cells or goal not in cells:
+        return None
+    path = [start]
+    on_path = {start}
+    stack: List[Iterator[Coord]] = [iter(board.neighbors4(start))]
+    while stack:
+        nxt = next((nb for nb in stack[-1] if nb in cells and nb not in on_path), None)
+        if nxt is None:
+            stack.pop()
+            on_path.discard(path.pop())
+            continue
+        if nxt == goal:
+            if len(path) + 1 == len(cells):
+                return path + [goal]
+            continue
+        path.append(nxt)
+        on_path.add(nxt)
+        stack.append(iter(board.neighbors4(nxt)))
+    return None
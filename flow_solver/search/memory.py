@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import heapq
+import os
+import sys
+from typing import Any, Optional
+
+"""
+Low-overhead memory accounting for the searches:
+- The size of one open-list entry is estimated once per solve by walking
+  the start node, instead of tracing every allocation with tracemalloc.
+- The open-list length is tracked on every expansion; process RSS is
+  sampled every few hundred expansions.
+- An optional cap (from a byte budget and/or a node count) trims the open
+  list to its best entries when exceeded. A search that has trimmed is no
+  longer complete, so failing afterwards proves nothing.
+"""
+
+# After a trim, keep this fraction of the cap so trims stay rare.
+TRIM_KEEP = 0.5
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Bytes held by `obj` and everything it references, counting shared
+    objects once. Small ints and one-character strings are interpreter
+    singletons shared by every node, so they are not counted.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    if isinstance(obj, int) and -5 <= obj <= 256:
+        return 0
+    if isinstance(obj, str) and len(obj) <= 1:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, name), seen) for name in obj.__slots__ if hasattr(obj, name))
+    return size
+
+
+def sample_rss() -> int:
+    """Current resident set size in bytes (peak RSS where /proc is missing, 0 if unknown)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryMonitor:
+    """
+    Telemetry and cap for the open list of one solve (sub-searches included).
+
+    - entry_bytes: estimated bytes per open-list entry
+    - memory_limit / max_open_nodes: the open list is trimmed when its
+      estimated bytes or its length would exceed them
+    """
+
+    def __init__(
+        self,
+        entry_bytes: int,
+        memory_limit: Optional[int] = None,
+        max_open_nodes: Optional[int] = None,
+    ):
+        self.entry_bytes = max(1, entry_bytes)
+        caps = []
+        if memory_limit is not None:
+            caps.append(memory_limit // self.entry_bytes)
+        if max_open_nodes is not None:
+            caps.append(max_open_nodes)
+        self.open_cap: Optional[int] = max(1, min(caps)) if caps else None
+        self.peak_open = 0
+        self.peak_rss = 0
+        self.trims = 0
+
+    def observe(self, open_list: Any) -> None:
+        """
+        Record the open-list length; trim it in place if over the cap.
+
+        `open_list` is a heap (a list) or anything with a trim(keep) method,
+        such as open_list.BucketQueue.
+        """
+        n = len(open_list)
+        if n > self.peak_open:
+            self.peak_open = n
+        if self.open_cap is not None and n > self.open_cap:
+            keep = max(1, int(self.open_cap * TRIM_KEEP))
+            if isinstance(open_list, list):
+                # nsmallest returns a sorted list, which is already a valid heap
+                open_list[:] = heapq.nsmallest(keep, open_list)
+            else:
+                open_list.trim(keep)
+            self.trims += 1
+
+    def sample(self) -> None:
+        rss = sample_rss()
+        if rss > self.peak_rss:
+            self.peak_rss = rss
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+from flow_solver.model import Board, extract_features
+from flow_solver.results.difficulty import DifficultyModel
+from flow_solver.results.store import config_json
+from flow_solver.search import basic_solver, cp_solver, dlx_solver, heuristic_solver
+from flow_solver.search.budget import STOP_PATH_LIMIT, STOP_TIME_LIMIT, SearchBudget
+from flow_solver.search.heuristic_solver import SearchConfig, SearchStats
+
+"""
+Automatic solver routing:
+- solve_puzzle(board, solver='auto') looks at the board's features and
+  picks a solver and config: the one a trained DifficultyModel predicts
+  to be fastest, or, without a model, a size rule (the basic DFS for tiny
+  boards, the delta-node A* otherwise).
+- A route that may not finish (the basic DFS, the DLX or CP solvers, or a run
+  that failed some training puzzles) gets a time budget of a few times its
+  predicted cost and falls back to an unbudgeted A* when it runs out (or
+  DLX hits its path cap), so a wrong prediction costs at most that budget.
+"""
+
+SOLVERS = ("auto", "basic", "cp", "dlx", "heuristic")
+
+# Heaviest general-purpose configuration: fallback and the default for non-tiny boards
+HEAVY_CONFIG = SearchConfig(delta_nodes=True)
+
+# Without a model: boards up to this many cells try the basic DFS first
+BASIC_MAX_CELLS = 25
+RULE_BASIC_BUDGET = 0.1
+
+# With a model: budget = max(MIN_ROUTE_BUDGET, ROUTE_BUDGET_FACTOR * predicted seconds)
+ROUTE_BUDGET_FACTOR = 4.0
+MIN_ROUTE_BUDGET = 0.05
+
+
+@dataclass
+class Route:
+    """
+    Where solve_puzzle(solver='auto') sends a board.
+
+    - time_limit: budget of the first attempt (None = unlimited)
+    - predicted_seconds: the model's estimate (None without a model)
+    - fallback: A* config run when the first attempt runs out of time
+    """
+    solver: str
+    config: SearchConfig
+    time_limit: Optional[float] = None
+    predicted_seconds: Optional[float] = None
+    fallback: Optional[SearchConfig] = None
+
+
+def choose_route(board: Board, model: Optional[DifficultyModel] = None) -> Route:
+    features = extract_features(board)
+    if model is None:
+        if features.cells <= BASIC_MAX_CELLS:
+            return Route("basic", SearchConfig(), RULE_BASIC_BUDGET, fallback=HEAVY_CONFIG)
+        return Route("heuristic", HEAVY_CONFIG)
+
+    predictions = model.predict(features)
+    best = predictions[0]
+    config = _config_from_json(best.config_json)
+    if best.solver == "heuristic" and best.solved_rate >= 1.0:
+        return Route("heuristic", config, predicted_seconds=best.seconds)
+
+    reliable = [p for p in predictions if p.solver == "heuristic" and p.solved_rate >= 1.0]
+    fallback = _config_from_json(reliable[0].config_json) if reliable else HEAVY_CONFIG
+    budget = max(MIN_ROUTE_BUDGET, ROUTE_BUDGET_FACTOR * best.seconds)
+    return Route(best.solver, config, budget, best.seconds, fallback)
+
+
+def solve_puzzle(
+    board: Board,
+    solver: str = "auto",
+    config: Optional[SearchConfig] = None,
+    model: Optional[DifficultyModel] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Tuple[Optional[Board], SearchStats]:
+    """
+    Solve `board` with the named solver, or route it with solver='auto'.
+
+    Returns (solved board or None, stats). With 'basic', 'cp' or 'dlx', only
+    the budget fields of `config` apply. With 'auto', `config` only sets the overall
+    budgets (max_states, time_limit, memory caps) and stats.route records
+    the attempts made.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver!r}, expected one of {SOLVERS}")
+    if config is None:
+        config = SearchConfig()
+    if solver != "auto":
+        return _run(board, solver, config, should_stop)
+
+    route = choose_route(board, model)
+    attempt = _with_limits(route.config, config, route.time_limit)
+    solution, stats = _run(board, route.solver, attempt, should_stop)
+    attempts = [_describe(route.solver, route.config)]
+
+    if solution is None and route.fallback is not None and stats.stop_reason in (STOP_TIME_LIMIT, STOP_PATH_LIMIT):
+        remaining = None if config.time_limit is None else config.time_limit - stats.time_seconds
+        if remaining is None or remaining > 0:
+            states_left = None if config.max_states is None else max(0, config.max_states - stats.states_expanded)
+            fallback = _with_limits(route.fallback, config, remaining, states_left)
+            solution, second = _run(board, "heuristic", fallback, should_stop)
+            attempts.append(_describe("heuristic", route.fallback))
+            stats = _combine(stats, second)
+
+    stats.route = " -> ".join(attempts)
+    return solution, stats
+
+
+@lru_cache(maxsize=None)
+def load_model(path: str) -> DifficultyModel:
+    """DifficultyModel.load, cached per path (for servers and workers)."""
+    return DifficultyModel.load(path)
+
+
+def _run(
+    board: Board,
+    solver: str,
+    config: SearchConfig,
+    should_stop: Optional[Callable[[], bool]],
+) -> Tuple[Optional[Board], SearchStats]:
+    if solver == "heuristic":
+        node, stats = heuristic_solver.solve_puzzle(board, config=config, should_stop=should_stop)
+        return (node.board if node is not None else None), stats
+
+    budget = SearchBudget(config.max_states, config.time_limit, should_stop)
+    t0 = time.perf_counter()
+    if solver in ("cp", "dlx"):
+        module = cp_solver if solver == "cp" else dlx_solver
+        solution = module.solve_puzzle(board, budget)
+    else:
+        # The basic solver fills in the board it is given.
+        solution = basic_solver.solve_puzzle(heuristic_solver._clone_board(board), budget)
+    stats = SearchStats(
+        solved=solution is not None,
+        states_expanded=budget.states,
+        time_seconds=time.perf_counter() - t0,
+        peak_memory_bytes=0,
+        stop_reason=budget.reason,
+    )
+    return solution, stats
+
+
+def _with_limits(
+    config: SearchConfig,
+    limits: SearchConfig,
+    time_limit: Optional[float],
+    max_states: Optional[int] = None,
+) -> SearchConfig:
+    """`config` under the tighter of its route budget and the caller's budgets."""
+    return dataclasses.replace(
+        config,
+        time_limit=_tighter(time_limit, limits.time_limit),
+        max_states=_tighter(max_states, limits.max_states),
+        memory_limit=limits.memory_limit,
+        max_open_nodes=limits.max_open_nodes,
+    )
+
+
+def _tighter(a, b):
+    if a is None:
+        return b
+    return a if b is None else min(a, b)
+
+
+def _combine(first: SearchStats, second: SearchStats) -> SearchStats:
+    return SearchStats(
+        solved=second.solved,
+        states_expanded=first.states_expanded + second.states_expanded,
+        time_seconds=first.time_seconds + second.time_seconds,
+        peak_memory_bytes=max(first.peak_memory_bytes, second.peak_memory_bytes),
+        stop_reason=second.stop_reason,
+        peak_open_nodes=max(first.peak_open_nodes, second.peak_open_nodes),
+        open_entry_bytes=second.open_entry_bytes,
+        peak_rss_bytes=max(first.peak_rss_bytes, second.peak_rss_bytes),
+        open_list_trims=first.open_list_trims + second.open_list_trims,
+    )
+
+
+def _config_from_json(text: str) -> SearchConfig:
+    """SearchConfig from a stored config, without its budgets."""
+    known = {f.name for f in dataclasses.fields(SearchConfig)} - {"max_states", "time_limit"}
+    return SearchConfig(**{k: v for k, v in json.loads(text).items() if k in known})
+
+
+def _describe(solver: str, config: SearchConfig) -> str:
+    text = config_json(config)
+    return solver if text == "{}" else f"{solver} {text}"
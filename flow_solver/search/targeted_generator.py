@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from flow_solver.model import Board, Node, build_puzzle_instance
+from flow_solver.model.game_board_generator import GameBoard
+from flow_solver.search import heuristic_solver
+from flow_solver.search.heuristic_solver import SearchConfig
+
+"""
+Difficulty-targeted generation:
+- Difficulty is measured with solver feedback, either the states the
+  heuristic solver expands ('states') or the number of forced moves from
+  the initial position ('forced', fewer means harder).
+- Each puzzle is found by a hill climb: generate a candidate, measure it,
+  then keep mutating the closest candidate so far (GameBoard.shuffleWires
+  on its solution) and resample from scratch after a run of misses, until
+  the value falls inside the band.
+- Puzzles are searched for independently, one task per puzzle, on a
+  process pool.
+"""
+
+METRICS = ("states", "forced")
+
+# Mutation size (wire-growing iterations) and misses before resampling
+MUTATION_ITERATIONS = 20
+RESAMPLE_AFTER = 25
+
+# 'states' measurements stop at this multiple of the band's upper bound
+STATES_CAP_FACTOR = 4
+
+
+@dataclass
+class TargetedPuzzle:
+    """
+    A generated puzzle whose difficulty is inside the requested band.
+
+    - solution: the generator's own solution (there may be others)
+    - value: the measured difficulty
+    - attempts: candidates measured to find it
+    """
+    board: Board
+    solution: GameBoard
+    metric: str
+    value: int
+    attempts: int
+    seed: int
+
+
+def measure_difficulty(board: Board, metric: str, cap: Optional[int] = None) -> int:
+    """
+    Difficulty of `board` under `metric`.
+
+    'states' stops the search after `cap` states (returning cap + 1).
+    """
+    if metric == "states":
+        _, stats = heuristic_solver.solve_puzzle(board, config=SearchConfig(max_states=cap))
+        return stats.states_expanded + (1 if stats.stop_reason is not None else 0)
+    if metric == "forced":
+        return forced_moves(board)
+    raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+
+
+def forced_moves(board: Board) -> int:
+    """
+    Moves made before the first real choice: starting from the terminals,
+    keep extending the most constrained color while it has exactly one
+    legal move.
+    """
+    instance = build_puzzle_instance(board)
+    node = Node(
+        f=0,
+        g=0,
+        board=heuristic_solver._clone_board(board),
+        positions=dict(instance.starts),
+        dirs=[[0] * board.width for _ in range(board.size)],
+    )
+    count = 0
+    while True:
+        active, legal = heuristic_solver._select_moves(instance, node)
+        if len(legal) != 1:
+            return count
+        node = heuristic_solver._apply_move(instance, node, active, legal[0])
+        count += 1
+
+
+def generate_targeted(
+    dim: int,
+    num_wires: int,
+    band: Tuple[int, int],
+    metric: str = "states",
+    count: int = 1,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    max_attempts: int = 2000,
+) -> List[Optional[TargetedPuzzle]]:
+    """
+    `count` puzzles whose difficulty lies in `band` (inclusive).
+
+    Puzzle i is searched for with seed `seed + i`, so results do not depend
+    on the number of workers. A puzzle not found within `max_attempts`
+    candidates is None. With workers=1 everything runs in this process.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {METRICS}")
+    lo, hi = band
+    if lo < 0 or hi < lo:
+        raise ValueError(f"bad band {band}: need 0 <= low <= high")
+
+    tasks = [(dim, num_wires, band, metric, seed + i, max_attempts) for i in range(count)]
+    if workers == 1:
+        return [_search(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_search, *zip(*tasks)))
+
+
+def _search(
+    dim: int,
+    num_wires: int,
+    band: Tuple[int, int],
+    metric: str,
+    seed: int,
+    max_attempts: int,
+) -> Optional[TargetedPuzzle]:
+    """Hill climb for one puzzle (runs in a worker)."""
+    # The generator draws from the global random module.
+    random.seed(seed)
+    cap = band[1] * STATES_CAP_FACTOR if metric == "states" else None
+
+    best: Optional[GameBoard] = None
+    best_distance = math.inf
+    misses = 0
+    for attempt in range(1, max_attempts + 1):
+        if best is None or misses >= RESAMPLE_AFTER:
+            candidate, _ = GameBoard.newGameBoard(dim, num_wires)
+            best, best_distance, misses = None, math.inf, 0
+        else:
+            candidate = best.copy()
+            candidate.shuffleWires(MUTATION_ITERATIONS)
+
+        board = candidate.cleanCopy().toBoard()
+        value = measure_difficulty(board, metric, cap)
+        distance = _band_distance(value, band, metric)
+        if distance == 0:
+            return TargetedPuzzle(board, candidate, metric, value, attempt, seed)
+        if distance < best_distance:
+            best, best_distance, misses = candidate, distance, 0
+        else:
+            misses += 1
+    return None
+
+
+def _band_distance(value: int, band: Tuple[int, int], metric: str) -> float:
+    """0 inside the band; otherwise how far out (in log space for states)."""
+    lo, hi = band
+    if lo <= value <= hi:
+        return 0.0
+    if metric == "states":
+        return abs(math.log((value + 1) / ((lo if value < lo else hi) + 1)))
+    return float(lo - value if value < lo else value - hi)
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from flow_solver.model import (
+    Board,
+    Node,
+    PuzzleInstance,
+    build_puzzle_instance,
+    format_puzzle,
+    parse_raw_puzzle,
+)
+from flow_solver.model.puzzle_loader import RawPuzzle
+
+"""
+Binary search traces:
+- heuristic_solver.solve_puzzle(board, trace=path) writes one fixed-size
+  record per expanded state and one per generated child, through a large
+  write buffer. Tracing is off unless asked for.
+- Records hold the 64-bit Zobrist hash of the state (see cursor.ZobristKeys),
+  its parent's hash, the move (color index, flat cell index), g and h
+  (f = g + h) and, for children, which prune rejected them.
+- The file starts with the puzzle itself, so a trace can be replayed and
+  analyzed without the puzzle file: summarize() counts expansions and
+  prunes per depth, hot_subtrees() finds where the search spent its
+  states, and replay() rebuilds the moves leading to any recorded state.
+"""
+
+MAGIC = b"FTRC"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")  # magic, version, length of the puzzle text
+
+# kind, prune, color, cell, state, parent, g, h
+RECORD = struct.Struct("<BBHIQQII")
+
+EXPAND = 1  # a state popped for expansion (parent and move are in the CHILD record that made it)
+CHILD = 2   # a child generated during the last EXPAND; prune says whether it was kept
+END = 3     # the search finished: state = solution hash (0 if none), g = states expanded
+
+# Prune codes; 0 means the child was kept. Names match heuristic_solver.prune_reason.
+KEPT = 0
+PRUNES = ("corner", "unreachable_goal", "isolated_region", "stranded_region", "duplicate")
+PRUNE_CODES = {name: code for code, name in enumerate(PRUNES, start=1)}
+
+NO_COLOR = 0xFFFF
+
+BUFFER_BYTES = 1 << 20
+READ_RECORDS = 1 << 16
+
+Coord = Tuple[int, int]
+
+
+class TraceWriter:
+    """
+    Appends expansion records for one search to `path`.
+
+    Colors and cells are stored as indices into instance.colors and the
+    row-major cell order, so each record is RECORD.size bytes.
+    """
+
+    def __init__(self, path: str, board: Board):
+        self.instance = build_puzzle_instance(board)
+        self.color_index = {color: i for i, color in enumerate(self.instance.colors)}
+        self.index = self.instance.geometry.index
+        self.file = open(path, "wb", buffering=BUFFER_BYTES)
+        text = "\n".join(format_puzzle(board)).encode("utf-8")
+        self.file.write(HEADER.pack(MAGIC, VERSION, len(text)))
+        self.file.write(text)
+        self.parent = 0
+
+    def expand(self, state: int, g: int, h: int) -> None:
+        self.parent = state
+        self.file.write(RECORD.pack(EXPAND, KEPT, NO_COLOR, 0, state, 0, g, h))
+
+    def child(self, state: int, color: str, cell: Coord, g: int, h: int, pruned_by: Optional[str] = None) -> None:
+        """A child of the last expanded state; h is ignored for pruned children."""
+        prune = KEPT if pruned_by is None else PRUNE_CODES[pruned_by]
+        self.file.write(
+            RECORD.pack(
+                CHILD,
+                prune,
+                self.color_index[color],
+                self.index(cell),
+                state,
+                self.parent,
+                g,
+                h if prune == KEPT else 0,
+            )
+        )
+
+    def finish(self, solution: Optional[int], states_expanded: int) -> None:
+        self.file.write(
+            RECORD.pack(END, solution is not None, NO_COLOR, 0, solution or 0, 0, states_expanded, 0)
+        )
+
+    def close(self) -> None:
+        self.file.close()
+
+
+@dataclass
+class Trace:
+    """A trace file: the puzzle it was recorded on and where its records start."""
+    path: str
+    board: Board
+    instance: PuzzleInstance
+    offset: int
+
+
+def read_trace(path: str) -> Trace:
+    with open(path, "rb") as f:
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise ValueError(f"{path} is not a search trace")
+        magic, version, length = HEADER.unpack(head)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a search trace")
+        if version != VERSION:
+            raise ValueError(f"{path} has trace version {version}, expected {VERSION}")
+        text = f.read(length).decode("utf-8")
+    board = parse_raw_puzzle(RawPuzzle(name=path, grid_lines=text.splitlines()))
+    return Trace(path, board, build_puzzle_instance(board), HEADER.size + length)
+
+
+def iter_records(trace: Trace) -> Iterator[Tuple[int, int, int, int, int, int, int, int]]:
+    """Raw records as (kind, prune, color, cell, state, parent, g, h) tuples."""
+    chunk = RECORD.size * READ_RECORDS
+    with open(trace.path, "rb") as f:
+        f.seek(trace.offset)
+        while True:
+            data = f.read(chunk)
+            if not data:
+                return
+            usable = len(data) - len(data) % RECORD.size  # a run cut off mid-record
+            yield from RECORD.iter_unpack(data[:usable])
+            if usable < len(data):
+                return
+
+
+@dataclass
+class TraceSummary:
+    """
+    Counts over a whole trace.
+
+    - pruned: prune name -> children it rejected
+    - by_depth: g of the generated children -> {'generated', 'kept', prune names...}
+    - solution: hash of the solution state, None if the search failed or
+      the run was cut off before it finished
+    """
+    expansions: int = 0
+    generated: int = 0
+    kept: int = 0
+    pruned: Dict[str, int] = field(default_factory=dict)
+    by_depth: Dict[int, Dict[str, int]] = field(default_factory=dict)
+    max_depth: int = 0
+    finished: bool = False
+    solution: Optional[int] = None
+
+
+def summarize(trace: Trace) -> TraceSummary:
+    summary = TraceSummary(pruned={name: 0 for name in PRUNES})
+    for kind, prune, _, _, state, _, g, _ in iter_records(trace):
+        if kind == EXPAND:
+            summary.expansions += 1
+            summary.max_depth = max(summary.max_depth, g)
+        elif kind == CHILD:
+            summary.generated += 1
+            row = summary.by_depth.setdefault(g, {"generated": 0, "kept": 0})
+            row["generated"] += 1
+            if prune == KEPT:
+                summary.kept += 1
+                row["kept"] += 1
+            else:
+                name = PRUNES[prune - 1]
+                summary.pruned[name] += 1
+                row[name] = row.get(name, 0) + 1
+        elif kind == END:
+            summary.finished = True
+            summary.solution = state if prune else None
+    return summary
+
+
+@dataclass
+class SearchTree:
+    """
+    The expansions of a trace as a tree.
+
+    Expansion i has hash states[i], depth depths[i] (its g), heuristic
+    hs[i], and was reached from expansion parents[i] (-1 for the root) by
+    moves[i] = (color, cell). sizes[i] counts the expansions in its subtree.
+    A state generated more than once (the eager search keeps duplicates)
+    is attributed to the last parent that generated it.
+    """
+    states: List[int]
+    depths: List[int]
+    hs: List[int]
+    parents: List[int]
+    moves: List[Optional[Tuple[str, Coord]]]
+    sizes: List[int]
+    # hash of a child that was never expanded -> (parent expansion, move, prune code)
+    leaves: Dict[int, Tuple[int, Tuple[str, Coord], int]]
+
+
+def build_tree(trace: Trace) -> SearchTree:
+    colors = trace.instance.colors
+    coords = trace.instance.geometry.coords
+    states: List[int] = []
+    depths: List[int] = []
+    hs: List[int] = []
+    parents: List[int] = []
+    moves: List[Optional[Tuple[str, Coord]]] = []
+    created: Dict[int, Tuple[int, int, int, int]] = {}  # hash -> (parent expansion, color, cell, prune)
+
+    current = -1
+    for kind, prune, color, cell, state, _, g, h in iter_records(trace):
+        if kind == EXPAND:
+            parent, color_i, cell_i, _ = created.get(state, (-1, NO_COLOR, 0, KEPT))
+            states.append(state)
+            depths.append(g)
+            hs.append(h)
+            parents.append(parent)
+            moves.append(None if color_i == NO_COLOR else (colors[color_i], coords[cell_i]))
+            current = len(states) - 1
+        elif kind == CHILD:
+            created[state] = (current, color, cell, prune)
+
+    sizes = [1] * len(states)
+    for i in range(len(states) - 1, 0, -1):
+        if parents[i] >= 0:
+            sizes[parents[i]] += sizes[i]
+    expanded = set(states)
+    leaves = {
+        state: (parent, (colors[color_i], coords[cell_i]), prune)
+        for state, (parent, color_i, cell_i, prune) in created.items()
+        if state not in expanded
+    }
+    return SearchTree(states, depths, hs, parents, moves, sizes, leaves)
+
+
+def hot_path(tree: SearchTree) -> List[int]:
+    """From the root, keep stepping into the child expansion with the largest subtree."""
+    if not tree.states:
+        return []
+    children: Dict[int, List[int]] = {}
+    for i, parent in enumerate(tree.parents):
+        if parent >= 0:
+            children.setdefault(parent, []).append(i)
+    path = [0]
+    while path[-1] in children:
+        path.append(max(children[path[-1]], key=lambda i: tree.sizes[i]))
+    return path
+
+
+def hot_subtrees(tree: SearchTree, depth: int, top: int = 10) -> List[int]:
+    """Expansions at `depth` with the largest subtrees, largest first."""
+    at_depth = [i for i, d in enumerate(tree.depths) if d == depth]
+    return sorted(at_depth, key=lambda i: tree.sizes[i], reverse=True)[:top]
+
+
+def replay(tree: SearchTree, state: int) -> Tuple[List[int], Optional[Tuple[Tuple[str, Coord], int]]]:
+    """
+    Expansions from the root to `state` (its last expansion), or to the
+    parent of a child that was never expanded. The second value is that
+    child's (move, prune code), or None when `state` itself was expanded.
+    Raises ValueError for a hash that is not in the trace.
+    """
+    last = None
+    for i in range(len(tree.states) - 1, -1, -1):
+        if tree.states[i] == state:
+            last = i
+            break
+    leaf = None
+    if last is None:
+        if state not in tree.leaves:
+            raise ValueError(f"State {state:016x} is not in the trace")
+        last, move, prune = tree.leaves[state]
+        leaf = (move, prune)
+    path = []
+    while last >= 0:
+        path.append(last)
+        last = tree.parents[last]
+    return path[::-1], leaf
+
+
+def replay_node(trace: Trace, moves: List[Tuple[str, Coord]]) -> Node:
+    """The start position with `moves` applied, as a Node for pretty_print."""
+    board = trace.board
+    grid = [row[:] for row in board.grid]
+    terminals = {color: coords[:] for color, coords in board.terminals.items()}
+    positions = dict(trace.instance.starts)
+    dirs = [[0] * board.width for _ in range(board.size)]
+    for color, (r, c) in moves:
+        hr, hc = positions[color]
+        dirs[r][c] = dirs[hr][hc] + 1
+        if (r, c) != trace.instance.goals[color]:
+            grid[r][c] = color
+        positions[color] = (r, c)
+    replayed = Board(size=board.size, grid=grid, terminals=terminals, width=board.width)
+    return Node(f=0, g=len(moves), board=replayed, positions=positions, dirs=dirs)
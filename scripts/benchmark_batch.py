@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from flow_solver.model import Node, PuzzleInstance, build_puzzle_instance
+from flow_solver.model.game_board_generator import GameBoard
+from flow_solver.search import batch_eval
+from flow_solver.search.heuristic_solver import (
+    _apply_move,
+    _clone_board,
+    _select_moves,
+    prune,
+)
+
+# Examples:
+#   python -m scripts.benchmark_batch
+#   python -m scripts.benchmark_batch --sizes 8 12 16 20 --batch 3 64
+
+
+def sample_children(dim: int, walks: int, seed: int) -> Tuple[PuzzleInstance, List[Node]]:
+    """Generate a puzzle and collect the children met on random playouts."""
+    rng = random.Random(seed)
+    random.seed(seed)
+    _, clean = GameBoard.newGameBoard(dim, max(2, dim // 2))
+    board = clean.toBoard()
+    instance = build_puzzle_instance(board)
+
+    root = Node(
+        f=0,
+        g=0,
+        board=_clone_board(board),
+        positions=dict(instance.starts),
+        dirs=[[0] * dim for _ in range(dim)],
+    )
+    children: List[Node] = []
+    for _ in range(walks):
+        node = root
+        for _ in range(rng.randint(0, dim * dim // 2)):
+            active, legal = _select_moves(instance, node)
+            if not legal:
+                break
+            batch = [_apply_move(instance, node, active, nb) for nb in legal]
+            children.extend(batch)
+            node = rng.choice(batch)
+    return instance, children
+
+
+def time_python(instance: PuzzleInstance, children: List[Node]) -> float:
+    t0 = time.perf_counter()
+    for child in children:
+        nr, nc = next(iter(child.positions.values()))
+        prune(instance, child, nr, nc)
+        sum(row.count('.') for row in child.board.grid)
+    return time.perf_counter() - t0
+
+
+def time_numpy(instance: PuzzleInstance, children: List[Node], batch: int) -> float:
+    t0 = time.perf_counter()
+    for start in range(0, len(children), batch):
+        batch_eval.evaluate_children(instance, children[start:start + batch])
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Find the board size where NumPy batch evaluation beats the per-child prunes."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 6, 8, 10, 12, 16, 20, 25, 30])
+    parser.add_argument(
+        "--batch",
+        type=int,
+        nargs="+",
+        default=[3, 32, 256],
+        help="Children per NumPy call (3 ~ one expansion). Default: 3 32 256.",
+    )
+    parser.add_argument("--walks", type=int, default=20, help="Random playouts per size.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not batch_eval.HAVE_NUMPY:
+        raise SystemExit("NumPy is not installed; nothing to compare.")
+
+    header = f"{'size':>5}{'children':>10}{'python us':>12}" + "".join(
+        f"{f'numpy@{b} us':>15}" for b in args.batch
+    )
+    print(header)
+
+    crossover = {b: None for b in args.batch}
+    for dim in args.sizes:
+        instance, children = sample_children(dim, args.walks, args.seed)
+        if not children:
+            continue
+        per_child_py = time_python(instance, children) / len(children) * 1e6
+        line = f"{dim:>5}{len(children):>10}{per_child_py:>12.1f}"
+        for b in args.batch:
+            per_child_np = time_numpy(instance, children, b) / len(children) * 1e6
+            line += f"{per_child_np:>15.1f}"
+            if crossover[b] is None and per_child_np < per_child_py:
+                crossover[b] = dim
+        print(line)
+
+    print()
+    for b, dim in crossover.items():
+        where = f"{dim}x{dim}" if dim is not None else "not reached"
+        print(f"NumPy with {b} children per call wins from: {where}")
+
+
+if __name__ == "__main__":
+    main()
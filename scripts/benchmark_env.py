@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from flow_solver.model.batched_env import HAVE_NUMPY, BatchedGameEnv
+from flow_solver.model.game_board_generator import GameBoard
+
+# Examples:
+#   python -m scripts.benchmark_env
+#   python -m scripts.benchmark_env --dim 10 --wires 8 --batch 64 1024 8192
+
+# Seconds each measurement runs for
+MEASURE_SECONDS = 2.0
+
+
+def python_steps_per_second(board: GameBoard, seconds: float, seed: int) -> float:
+    """Random rollouts with GameBoard.getActions/takeAction, restarting finished boards."""
+    rng = random.Random(seed)
+    steps = 0
+    state = board.copy()
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        moves = [(w, cell) for w, options in enumerate(state.getActions()) for cell in options]
+        if not moves:
+            state = board.copy()
+            continue
+        state.takeAction(*rng.choice(moves))
+        steps += 1
+    return steps / (time.perf_counter() - t0)
+
+
+def batched_steps_per_second(board: GameBoard, batch: int, seconds: float, seed: int) -> float:
+    """Random rollouts of `batch` copies stepped together, resetting terminal boards."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    env = BatchedGameEnv.repeat(board, batch)
+    steps = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        actions = env.random_actions(rng)
+        steps += int((actions >= 0).sum())
+        _, _, terminal = env.step(actions)
+        if terminal.any():
+            env.reset(terminal)
+    return steps / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Random-rollout throughput of GameBoard against the batched NumPy environment."
+    )
+    parser.add_argument("--dim", type=int, default=8)
+    parser.add_argument("--wires", type=int, default=6)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64, 1024, 8192])
+    parser.add_argument("--seconds", type=float, default=MEASURE_SECONDS, help="Run time per measurement.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if not HAVE_NUMPY:
+        raise SystemExit("NumPy is not installed; nothing to compare.")
+    random.seed(args.seed)
+    _, board = GameBoard.newGameBoard(args.dim, args.wires)
+
+    base = python_steps_per_second(board, args.seconds, args.seed)
+    print(f"{args.dim}x{args.dim}, {args.wires} wires: steps per minute (one step = one board moved)")
+    print(f"  {'GameBoard':<16}{base * 60:>14,.0f}")
+    for batch in args.batch:
+        rate = batched_steps_per_second(board, batch, args.seconds, args.seed)
+        print(f"  {f'batched x{batch}':<16}{rate * 60:>14,.0f}{rate / base:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
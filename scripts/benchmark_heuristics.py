@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from flow_solver.search.heuristic_solver import (
+    HEURISTICS,
+    SearchConfig,
+    solve_puzzle_file,
+)
+
+# Examples:
+#   python -m scripts.benchmark_heuristics 7
+#   python -m scripts.benchmark_heuristics 6 7 8 --heuristics manhattan distance
+
+
+def benchmark_dimension(dim: str, heuristics: List[str]) -> Dict[str, Tuple[int, int, float]]:
+    """
+    Run every heuristic over all puzzles of one dimension.
+
+    Returns:
+        heuristic -> (solved_count, total_states, total_time)
+    """
+    if "x" not in dim:
+        dim = f"{dim}x{dim}"
+
+    puzzle_files = sorted((Path("puzzles") / dim).glob(f"{dim}_*.txt"))
+    results: Dict[str, Tuple[int, int, float]] = {}
+
+    for name in heuristics:
+        config = SearchConfig(heuristic=name)
+        solved_count = 0
+        total_states = 0
+        total_time = 0.0
+        for puzzle_file in puzzle_files:
+            node, stats = solve_puzzle_file(str(puzzle_file), config=config)
+            solved_count += node is not None
+            total_states += stats.states_expanded
+            total_time += stats.time_seconds
+        results[name] = (solved_count, total_states, total_time)
+
+    print(f"\n{dim} ({len(puzzle_files)} puzzles)")
+    print(f"{'heuristic':<12}{'solved':>8}{'avg states':>14}{'avg time (s)':>15}")
+    count = max(len(puzzle_files), 1)
+    for name, (solved_count, total_states, total_time) in results.items():
+        print(
+            f"{name:<12}{solved_count:>8}{total_states / count:>14.1f}{total_time / count:>15.4f}"
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare A* heuristics by states expanded and wall time."
+    )
+    parser.add_argument(
+        "dimensions",
+        nargs="+",
+        help="Dimensions like 7, 7x7, 8, 8x8, etc.",
+    )
+    parser.add_argument(
+        "--heuristics",
+        nargs="+",
+        choices=sorted(HEURISTICS),
+        default=["manhattan", "distance"],
+        help="Heuristics to compare. Default: manhattan distance.",
+    )
+    args = parser.parse_args()
+
+    totals: Dict[str, List[float]] = {name: [0, 0.0] for name in args.heuristics}
+    for dim in args.dimensions:
+        for name, (_, states, elapsed) in benchmark_dimension(dim, args.heuristics).items():
+            totals[name][0] += states
+            totals[name][1] += elapsed
+
+    if len(args.dimensions) > 1:
+        print(f"\n{'=' * 60}")
+        print("OVERALL")
+        print("=" * 60)
+        for name, (states, elapsed) in totals.items():
+            print(f"{name:<12}states: {int(states):>10}  time: {elapsed:.4f}s")
+
+
+if __name__ == "__main__":
+    main()
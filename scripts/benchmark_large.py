@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import os
+import random
+import time
+from typing import Dict, List
+
+from flow_solver.model import Board, save_puzzle_to_file
+from flow_solver.model.game_board_generator import GameBoard
+from flow_solver.search.heuristic_solver import SearchConfig, solve_puzzle
+
+# Large-board tier: generated 15x15..30x30 puzzles, each run under a time
+# limit so the tier finishes in bounded time even when nothing is solved.
+# Boards with more than 26 wires use numbered colors (extended format).
+#
+# Examples:
+#   python -m scripts.benchmark_large
+#   python -m scripts.benchmark_large --sizes 15 20 --count 3 --time-limit 60
+#   python -m scripts.benchmark_large --configs lists bitboard decompose --save puzzles/large
+
+# Configs the tier can run, by name
+CONFIGS: Dict[str, SearchConfig] = {
+    "lists": SearchConfig(),
+    "bitboard": SearchConfig(engine="bitboard"),
+    "delta": SearchConfig(delta_nodes=True),
+    "decompose": SearchConfig(decompose=True),
+    "numpy": SearchConfig(numpy_batch=16),
+}
+
+
+def generate_tier(size: int, wires: int, count: int, seed: int) -> List[Board]:
+    """`count` puzzles of one size, the same for the same seed."""
+    random.seed(seed * 1000 + size)
+    boards = []
+    for _ in range(count):
+        _, puzzle = GameBoard.newGameBoard(size, wires)
+        boards.append(puzzle.toBoard())
+    return boards
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the heuristic solver on generated large boards (15x15 to 30x30)."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15, 20, 25, 30])
+    parser.add_argument(
+        "--wires",
+        type=int,
+        help="Wires per board (default: the board size, so 27+ wires from 27x27 up).",
+    )
+    parser.add_argument("--count", type=int, default=1, help="Puzzles per size.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=30.0,
+        help="Seconds per puzzle and config (default: 30).",
+    )
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        choices=sorted(CONFIGS),
+        default=["lists", "bitboard"],
+        help="Solver configs to compare (default: lists bitboard).",
+    )
+    parser.add_argument("--save", help="Also write the generated puzzles into this directory.")
+    args = parser.parse_args()
+
+    print(
+        f"{'puzzle':>16}{'colors':>8}{'config':>11}{'solved':>8}{'time':>10}"
+        f"{'states':>10}{'states/s':>10}{'peak open':>11}  stop"
+    )
+    for size in args.sizes:
+        wires = min(args.wires or size, size)
+        for i, board in enumerate(generate_tier(size, wires, args.count, args.seed), start=1):
+            name = f"{board.dimension}_{i:02d}"
+            if args.save:
+                os.makedirs(args.save, exist_ok=True)
+                save_puzzle_to_file(board, os.path.join(args.save, f"{name}.txt"))
+
+            for config_name in args.configs:
+                config = dataclasses.replace(CONFIGS[config_name], time_limit=args.time_limit)
+                t0 = time.perf_counter()
+                solution, stats = solve_puzzle(board, config=config)
+                elapsed = time.perf_counter() - t0
+                rate = stats.states_expanded / elapsed if elapsed > 0 else 0.0
+                print(
+                    f"{name:>16}{len(board.colors):>8}{config_name:>11}"
+                    f"{'yes' if solution is not None else 'no':>8}{elapsed:>9.2f}s"
+                    f"{stats.states_expanded:>10}{rate:>10.0f}{stats.peak_open_nodes:>11}"
+                    f"  {stats.stop_reason or ''}"
+                )
+
+
+if __name__ == "__main__":
+    main()
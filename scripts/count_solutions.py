@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from flow_solver.model import load_puzzle_from_file, parse_raw_puzzle
+from flow_solver.search.counting import count_solutions
+from flow_solver.search.heuristic_solver import SearchConfig
+
+# Examples:
+#   python -m scripts.count_solutions 7 8
+#   python -m scripts.count_solutions puzzles/7x7/7x7_01.txt --limit 100
+#   python -m scripts.count_solutions 10 --time-limit 30 --quiet
+
+
+def puzzle_paths(entries: list[str]) -> list[Path]:
+    """Puzzle files named directly, or every puzzle of a dimension like 7 or 5x8."""
+    paths: list[Path] = []
+    for entry in entries:
+        if entry.endswith(".txt"):
+            paths.append(Path(entry))
+            continue
+        dim = entry if "x" in entry else f"{entry}x{entry}"
+        paths.extend(sorted((Path("puzzles") / dim).glob(f"{dim}_*.txt")))
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Count the solutions of puzzles, e.g. to check that each has exactly one."
+    )
+    parser.add_argument("puzzles", nargs="+", help="Puzzle files or dimensions (7 or 5x8).")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=2,
+        help="Stop after this many solutions (default: 2, enough to tell unique from not).",
+    )
+    parser.add_argument("--time-limit", type=float, help="Give up on a puzzle after this many seconds.")
+    parser.add_argument("--max-states", type=int, help="Give up on a puzzle after this many states.")
+    parser.add_argument("--quiet", action="store_true", help="Print only the summary.")
+    args = parser.parse_args()
+
+    try:
+        config = SearchConfig(max_states=args.max_states, time_limit=args.time_limit)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    paths = puzzle_paths(args.puzzles)
+    if not paths:
+        raise SystemExit("No puzzles found")
+
+    counts = {"none": 0, "unique": 0, "multiple": 0, "unknown": 0}
+    total_time = 0.0
+    for path in paths:
+        board = parse_raw_puzzle(load_puzzle_from_file(str(path)))
+        try:
+            solutions, stats = count_solutions(board, limit=args.limit, config=config)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        total_time += stats.time_seconds
+
+        found = len(solutions)
+        if stats.stop_reason is not None:
+            verdict = "unknown"
+            text = f">= {found} (stopped: {stats.stop_reason})"
+        elif found == 0:
+            verdict, text = "none", "0"
+        elif found == 1 and args.limit > 1:
+            verdict, text = "unique", "1"
+        else:
+            verdict = "multiple" if found > 1 else "unknown"
+            text = f">= {found}" if found == args.limit else str(found)
+        counts[verdict] += 1
+        if not args.quiet:
+            print(f"{path.name}: solutions {text}, {stats.states_expanded} states, {stats.time_seconds:.3f}s")
+
+    print(
+        f"\n{len(paths)} puzzles: {counts['unique']} unique, {counts['multiple']} with several solutions, "
+        f"{counts['none']} unsolvable, {counts['unknown']} undecided ({total_time:.1f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 
+from flow_solver.model import format_puzzle
 from flow_solver.model.game_board_generator import GameBoard
 
 
@@ -26,10 +27,8 @@ def main() -> None:
 
     solved_board, _ = GameBoard.newGameBoard(args.dim, args.num_wires)
     board = solved_board.toBoard()
-    for y in range(len(board.grid)):
-        for x in range(len(board.grid)):
-            print(board.grid[x][y], end="")
-        print()
+    for line in format_puzzle(board):
+        print(line)
 
 
 if __name__ == "__main__":
@@ -7,6 +7,7 @@ import sys
 # python .\generate_multiple_boards.py
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from flow_solver.model import save_puzzle_to_file
 from flow_solver.model.game_board_generator import GameBoard
 
 def generate_puzzle_files():
@@ -32,11 +33,7 @@ def generate_puzzle_files():
             
             # Write to file
             filename = f"{folder}/{size}x{size}_{i:02d}.txt"
-            with open(filename, 'w') as f:
-                for row in range(len(board.grid)):
-                    for col in range(len(board.grid[row])):
-                        f.write(board.grid[row][col])
-                    f.write('\n')
+            save_puzzle_to_file(board, filename)
             
             print(f"Generated {filename}")
 
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+from flow_solver.model import save_puzzle_to_file
+from flow_solver.search.targeted_generator import METRICS, generate_targeted
+
+# Examples:
+#   python -m scripts.generate_targeted 8 7 --min 2000 --max 5000 --count 10 --out puzzles/hard_8x8
+#   python -m scripts.generate_targeted 7 6 --metric forced --min 0 --max 0 --count 5 --workers 4
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate puzzles whose measured difficulty falls in a band."
+    )
+    parser.add_argument("dim", type=int, help="Board dimension (must be > 3).")
+    parser.add_argument("num_wires", type=int, help="Number of wires (must be > 1 and <= dim).")
+    parser.add_argument("--min", type=int, required=True, help="Lowest accepted difficulty.")
+    parser.add_argument("--max", type=int, required=True, help="Highest accepted difficulty.")
+    parser.add_argument(
+        "--metric",
+        choices=METRICS,
+        default="states",
+        help="'states': states expanded by the heuristic solver; "
+        "'forced': forced moves from the start (fewer is harder). Default: states.",
+    )
+    parser.add_argument("--count", type=int, default=1, help="Puzzles to generate.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--seed", type=int, default=0, help="Puzzle i uses seed SEED + i.")
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=2000,
+        help="Candidates measured per puzzle before giving up (default: 2000).",
+    )
+    parser.add_argument("--out", help="Write puzzles into this directory as {dim}x{dim}_{index}.txt.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    try:
+        puzzles = generate_targeted(
+            args.dim,
+            args.num_wires,
+            (args.min, args.max),
+            metric=args.metric,
+            count=args.count,
+            workers=args.workers,
+            seed=args.seed,
+            max_attempts=args.max_attempts,
+        )
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    for i, puzzle in enumerate(puzzles, start=1):
+        if puzzle is None:
+            print(f"#{i}: nothing in [{args.min}, {args.max}] after {args.max_attempts} candidates")
+            continue
+        print(f"#{i}: {args.metric} = {puzzle.value} after {puzzle.attempts} candidates (seed {puzzle.seed})")
+        if args.out:
+            save_puzzle_to_file(puzzle.board, os.path.join(args.out, f"{puzzle.board.dimension}_{i:02d}.txt"))
+        else:
+            puzzle.board.pretty_print()
+
+    found = sum(p is not None for p in puzzles)
+    print(f"Found {found} / {len(puzzles)} puzzles in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,104 @@
+import argparse
+import os
+from collections import defaultdict
+
 import matplotlib.pyplot as plt
 
-# Board sizes
-sizes = [4, 5, 6, 7, 8, 9]
+from flow_solver.results.report import METRICS, PERCENTILES, load_export, percentile
 
-# Data from your summary
-avg_states = [15.7, 32.2, 69.6, 190.4, 3039.9, 32160.2]
-avg_time = [0.0008, 0.0026, 0.0078, 0.0291, 0.7000, 8.046]  # seconds
+# Examples:
+#   python -m scripts.run_all_puzzles 4 5 6 7 8 9 --quiet --export results.json
+#   python -m scripts.plot_flow_results results.json
+#   python -m scripts.plot_flow_results results.csv --save plots/
 
-def main():
-    # ---- Plot 1: Average states expanded vs board size ----
+LABELS = {
+    "time_seconds": "Time (seconds)",
+    "states_expanded": "States expanded",
+    "open_list_bytes": "Peak open list (bytes, estimated)",
+}
+
+
+def group_by_size(results):
+    """dimension ("rows x cols", e.g. "5x8") -> list of results, by (rows, cols) ascending"""
+    groups = defaultdict(list)
+    for r in results:
+        groups[r.dimension].append(r)
+    return dict(sorted(groups.items(), key=lambda item: tuple(int(n) for n in item[0].split("x"))))
+
+
+def plot_percentiles(groups, metric):
+    """p50/p90/p99/max of one metric vs board size (log scale)."""
+    read = METRICS[metric]
+    sizes = list(groups)
+    positions = range(len(sizes))
+    plt.figure()
+    for q in PERCENTILES:
+        plt.plot(positions, [percentile([read(r) for r in groups[s]], q) for s in sizes], marker='o', label=f"p{q}")
+    plt.plot(positions, [max(read(r) for r in groups[s]) for s in sizes], marker='x', linestyle='--', label="max")
+    plt.xticks(positions, sizes)
+    plt.yscale("log")
+    plt.xlabel("Board size (rows x cols)")
+    plt.ylabel(LABELS[metric])
+    plt.title(f"{LABELS[metric]} percentiles vs Board Size")
+    plt.legend()
+    plt.grid(True)
+
+
+def plot_boxes(groups, metric):
+    """Full per-size distribution of one metric as box plots (log scale)."""
+    read = METRICS[metric]
     plt.figure()
-    plt.plot(sizes, avg_states, marker='o')
-    plt.xlabel("Board size (N x N)")
-    plt.ylabel("Average states expanded")
-    plt.title("Average States Expanded vs Board Size")
+    plt.boxplot([[max(read(r), 1e-6) for r in rs] for rs in groups.values()], whis=(0, 99))
+    plt.xticks(range(1, len(groups) + 1), list(groups))
+    plt.yscale("log")
+    plt.xlabel("Board size (rows x cols)")
+    plt.ylabel(LABELS[metric])
+    plt.title(f"{LABELS[metric]} distribution (whiskers: min to p99)")
     plt.grid(True)
 
-    # ---- Plot 2: Average time vs board size ----
+
+def plot_time_histograms(groups):
+    """Solve time histogram per size on log-spaced bins."""
+    times = [r.time_seconds for rs in groups.values() for r in rs if r.time_seconds > 0]
+    if not times:
+        return
+    lo, hi = min(times), max(times)
+    bins = [lo * (hi / lo) ** (i / 30) for i in range(31)] if hi > lo else 10
     plt.figure()
-    plt.plot(sizes, avg_time, marker='o')
-    plt.xlabel("Board size (N x N)")
-    plt.ylabel("Average time (seconds)")
-    plt.title("Average Solve Time vs Board Size")
+    for size, rs in groups.items():
+        plt.hist([r.time_seconds for r in rs], bins=bins, histtype='step', label=size)
+    plt.xscale("log")
+    plt.xlabel("Time (seconds)")
+    plt.ylabel("Puzzles")
+    plt.title("Solve Time Histogram")
+    plt.legend()
     plt.grid(True)
 
-    plt.show()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plot solver result distributions from a run_all_puzzles --export file."
+    )
+    parser.add_argument("export", help="JSON or CSV file written by run_all_puzzles --export.")
+    parser.add_argument("--save", help="Save figures as PNGs into this directory instead of showing them.")
+    args = parser.parse_args()
+
+    groups = group_by_size(load_export(args.export))
+    if not groups:
+        raise SystemExit(f"No results in {args.export}")
+
+    for metric in METRICS:
+        plot_percentiles(groups, metric)
+    plot_boxes(groups, "time_seconds")
+    plot_boxes(groups, "states_expanded")
+    plot_time_histograms(groups)
+
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+        for i, number in enumerate(plt.get_fignums(), start=1):
+            plt.figure(number).savefig(os.path.join(args.save, f"figure_{i}.png"))
+    else:
+        plt.show()
 
 if __name__ == "__main__":
     main()
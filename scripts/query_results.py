@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+from collections import defaultdict
+from typing import Dict, List
+
+from flow_solver.results import ResultStore, StoredResult
+from flow_solver.results.report import export
+
+# Examples:
+#   python -m scripts.query_results results.sqlite
+#   python -m scripts.query_results results.sqlite --dimension 9x9
+#   python -m scripts.query_results results.sqlite --compare heuristic:44136fa355b3 heuristic:9c2fd1e0a7b4
+#   python -m scripts.query_results results.sqlite --export run.json --run heuristic:44136fa355b3
+
+
+def by_dimension(results: List[StoredResult]) -> Dict[str, List[StoredResult]]:
+    groups: Dict[str, List[StoredResult]] = defaultdict(list)
+    for result in results:
+        groups[result.dimension].append(result)
+    return groups
+
+
+def print_runs(store: ResultStore, dimension: str | None) -> None:
+    """One summary table per (solver, config) stored."""
+    for solver, config_hash, config_json, count in store.runs():
+        print(f"\n{solver}:{config_hash} {config_json} ({count} results)")
+        print(f"{'dim':>7}{'puzzles':>9}{'solved':>8}{'avg time':>11}{'total time':>12}{'avg states':>12}")
+        results = store.query(solver=solver, config_hash=config_hash, dimension=dimension)
+        for dim, group in by_dimension(results).items():
+            solved = [r for r in group if r.solved]
+            avg_time = sum(r.time_seconds for r in solved) / len(solved) if solved else 0.0
+            avg_states = sum(r.states_expanded for r in solved) / len(solved) if solved else 0.0
+            total_time = sum(r.time_seconds for r in group)
+            print(
+                f"{dim:>7}{len(group):>9}{len(solved):>8}"
+                f"{avg_time:>10.4f}s{total_time:>11.3f}s{avg_states:>12.1f}"
+            )
+
+
+def _run_results(store: ResultStore, run: str, dimension: str | None) -> Dict[str, StoredResult]:
+    """Results of one run given as 'solver:config_hash', by puzzle hash."""
+    solver, sep, config_hash = run.partition(":")
+    if not sep:
+        raise SystemExit(f"Expected SOLVER:CONFIG_HASH, got {run!r}")
+    return {r.puzzle_hash: r for r in store.query(solver=solver, config_hash=config_hash, dimension=dimension)}
+
+
+def print_comparison(store: ResultStore, base: str, other: str, dimension: str | None) -> None:
+    """Compare two runs on the puzzles both have results for."""
+    base_results = _run_results(store, base, dimension)
+    other_results = _run_results(store, other, dimension)
+    common = [h for h in base_results if h in other_results]
+    if not common:
+        raise SystemExit(f"No puzzles with results for both {base} and {other}")
+
+    print(f"{base} vs {other} on {len(common)} common puzzles")
+    print(f"{'dim':>7}{'puzzles':>9}{'solved':>10}{'time':>22}{'speedup':>9}{'states':>20}")
+    groups = by_dimension([base_results[h] for h in common])
+    for dim, group in groups.items():
+        pairs = [(r, other_results[r.puzzle_hash]) for r in group]
+        solved_a = sum(a.solved for a, _ in pairs)
+        solved_b = sum(b.solved for _, b in pairs)
+        time_a = sum(a.time_seconds for a, _ in pairs)
+        time_b = sum(b.time_seconds for _, b in pairs)
+        states_a = sum(a.states_expanded for a, _ in pairs)
+        states_b = sum(b.states_expanded for _, b in pairs)
+        speedup = time_a / time_b if time_b > 0 else float("inf")
+        print(
+            f"{dim:>7}{len(pairs):>9}{f'{solved_a}/{solved_b}':>10}"
+            f"{f'{time_a:.3f}s/{time_b:.3f}s':>22}{speedup:>8.2f}x"
+            f"{f'{states_a}/{states_b}':>20}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Summarize or compare stored solver results without re-solving."
+    )
+    parser.add_argument("store", help="Result store written by run_all_puzzles --store.")
+    parser.add_argument("--dimension", help="Only this dimension, e.g. 9x9.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASE", "OTHER"),
+        help="Runs as SOLVER:CONFIG_HASH (as listed) to compare puzzle by puzzle "
+        "(speedup = BASE time / OTHER time).",
+    )
+    parser.add_argument(
+        "--export",
+        help="Write one run's results and distributions to this .json or .csv file (needs --run).",
+    )
+    parser.add_argument("--run", help="Run to export, as SOLVER:CONFIG_HASH.")
+    args = parser.parse_args()
+    if args.export and not args.run:
+        parser.error("--export needs --run")
+
+    dimension = args.dimension
+    if dimension is not None and "x" not in dimension:
+        dimension = f"{dimension}x{dimension}"
+
+    with ResultStore(args.store) as store:
+        if args.export:
+            results = list(_run_results(store, args.run, dimension).values())
+            export(args.export, results)
+            print(f"Exported {len(results)} results to {args.export}")
+        elif args.compare:
+            print_comparison(store, args.compare[0], args.compare[1], dimension)
+        else:
+            print_runs(store, dimension)
+
+
+if __name__ == "__main__":
+    main()
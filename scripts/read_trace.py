@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import math
+
+from flow_solver.search.trace import (
+    KEPT,
+    PRUNES,
+    SearchTree,
+    Trace,
+    TraceSummary,
+    build_tree,
+    hot_path,
+    hot_subtrees,
+    read_trace,
+    replay,
+    replay_node,
+    summarize,
+)
+
+# Examples:
+#   python -m scripts.run_search puzzles/10x10/10x10_01.txt --trace run.trace
+#   python -m scripts.read_trace run.trace
+#   python -m scripts.read_trace run.trace --depth 12 --top 10
+#   python -m scripts.read_trace run.trace --replay solution
+#   python -m scripts.read_trace run.trace --replay 3f2a9c0d11e4b870
+
+# Rows in the prunes-by-depth table
+DEPTH_ROWS = 12
+
+# Hot path: print a depth when its share drops by more than this; stop below HOT_PATH_END
+HOT_PATH_STEP = 0.02
+HOT_PATH_END = 0.01
+
+
+def print_summary(trace: Trace, summary: TraceSummary) -> None:
+    if not summary.finished:
+        outcome = "cut off (no end record)"
+    elif summary.solution is not None:
+        outcome = f"solved, solution {summary.solution:016x}"
+    else:
+        outcome = "no solution"
+    print(f"Puzzle {trace.board.dimension}, {len(trace.instance.colors)} colors: {outcome}")
+    print(
+        f"{summary.expansions} expansions, {summary.generated} children generated, "
+        f"{summary.kept} kept, max depth {summary.max_depth}"
+    )
+
+
+def print_prunes(summary: TraceSummary) -> None:
+    print("\nPrune effectiveness (share of generated children):")
+    for name in PRUNES:
+        count = summary.pruned[name]
+        share = count / summary.generated if summary.generated else 0.0
+        print(f"  {name:<18}{count:>10}{share:>8.1%}")
+
+    if not summary.by_depth:
+        return
+    depths = sorted(summary.by_depth)
+    step = max(1, math.ceil((depths[-1] + 1) / DEPTH_ROWS))
+    print(f"\nBy depth of the child (buckets of {step}):")
+    print(f"  {'depth':>9}{'generated':>11}{'kept':>8}" + "".join(f"{name.split('_')[0]:>12}" for name in PRUNES))
+    for lo in range(0, depths[-1] + 1, step):
+        rows = [summary.by_depth[d] for d in range(lo, lo + step) if d in summary.by_depth]
+        if not rows:
+            continue
+        generated = sum(row["generated"] for row in rows)
+        kept = sum(row["kept"] for row in rows)
+        shares = "".join(f"{sum(row.get(name, 0) for row in rows) / generated:>12.1%}" for name in PRUNES)
+        label = f"{lo}-{lo + step - 1}" if step > 1 else str(lo)
+        print(f"  {label:>9}{generated:>11}{kept:>8}{shares}")
+
+
+def print_hot_spots(tree: SearchTree, depth: int | None, top: int) -> None:
+    total = len(tree.states)
+    path = hot_path(tree)
+    print("\nHot path (largest subtree at each depth; only depths where the search branched):")
+    shown = 1.0
+    for i in path:
+        share = tree.sizes[i] / total
+        if i == path[0] or share < shown - HOT_PATH_STEP or i == path[-1]:
+            print(f"  depth {tree.depths[i]:>3}  {tree.sizes[i]:>9} states {share:>7.1%}  {_move(tree, i)}")
+            shown = share
+        if share < HOT_PATH_END:
+            break
+
+    if depth is None:
+        # The first depth where no single subtree holds most of the search
+        depth = next((tree.depths[i] for i in path if tree.sizes[i] * 2 < total), tree.depths[path[-1]])
+    print(f"\nHottest subtrees at depth {depth}:")
+    for i in hot_subtrees(tree, depth, top):
+        print(
+            f"  {tree.states[i]:016x}  {tree.sizes[i]:>9} states {tree.sizes[i] / total:>7.1%}"
+            f"  h={tree.hs[i]:<5} {_move(tree, i)}"
+        )
+
+
+def print_replay(trace: Trace, tree: SearchTree, target: str, solution: int | None) -> None:
+    if target == "solution":
+        if solution is None:
+            raise SystemExit("The trace has no solution to replay")
+        state = solution
+    else:
+        try:
+            state = int(target, 16)
+        except ValueError:
+            raise SystemExit(f"--replay takes a state hash in hex or 'solution', not {target!r}")
+    try:
+        path, leaf = replay(tree, state)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    print(f"\nReplay of {state:016x}:")
+    moves = []
+    for i in path:
+        g, h = tree.depths[i], tree.hs[i]
+        print(f"  g={g:<4} h={h:<6} f={g + h:<6} {_move(tree, i)}")
+        if tree.moves[i] is not None:
+            moves.append(tree.moves[i])
+    if leaf is not None:
+        move, prune = leaf
+        moves.append(move)
+        verdict = "kept, never expanded" if prune == KEPT else f"pruned by {PRUNES[prune - 1]}"
+        print(f"  then {move[0]} -> {move[1]}: {verdict}")
+    replay_node(trace, moves).pretty_print()
+
+
+def _move(tree: SearchTree, i: int) -> str:
+    move = tree.moves[i]
+    return "start" if move is None else f"{move[0]} -> {move[1]}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Summarize a search trace written by solve_puzzle(trace=...)."
+    )
+    parser.add_argument("trace", help="Trace file.")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        help="List the hottest subtrees at this depth "
+        "(default: the first depth where no subtree holds half the search).",
+    )
+    parser.add_argument("--top", type=int, default=5, help="Subtrees to list (default: 5).")
+    parser.add_argument(
+        "--replay",
+        metavar="HASH",
+        help="Replay the moves leading to a state (hex hash from this report, or 'solution').",
+    )
+    args = parser.parse_args()
+
+    try:
+        trace = read_trace(args.trace)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+
+    summary = summarize(trace)
+    print_summary(trace, summary)
+    print_prunes(summary)
+    if summary.expansions == 0:
+        return
+    tree = build_tree(trace)
+    print_hot_spots(tree, args.depth, args.top)
+    if args.replay:
+        print_replay(trace, tree, args.replay, summary.solution)
+
+
+if __name__ == "__main__":
+    main()
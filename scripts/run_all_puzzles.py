@@ -2,43 +2,71 @@
 from __future__ import annotations
 
 import argparse
+import dataclasses
 from pathlib import Path
-from typing import Tuple
+import json
+from typing import Any, Dict, List, Optional, Tuple
 
+from flow_solver.model import load_puzzle_from_file, parse_raw_puzzle
+from flow_solver.results import ResultStore, StoredResult, config_hash, puzzle_hash
+from flow_solver.results.report import build_reports, export, format_report
+from flow_solver.search.dispatch import BASIC_CONFIG_KEYS
 from flow_solver.search.heuristic_solver import (
     solve_puzzle_file as heuristic_solve_puzzle_file,
+    SearchConfig,
     SearchStats,
 )
-from flow_solver.search.basic_solver import (
-    solve_puzzle_file as basic_solve_puzzle_file,
-)
+from flow_solver.search.basic_solver import solve_puzzle as basic_solve_puzzle
+from flow_solver.search.cp_solver import solve_puzzle as cp_solve_puzzle
+from flow_solver.search.dlx_solver import solve_puzzle as dlx_solve_puzzle
+from flow_solver.search.budget import SearchBudget
 
 # Examples:
 #   python -m scripts.run_all_puzzles 7
 #   python -m scripts.run_all_puzzles 7 8 9
 #   python -m scripts.run_all_puzzles 7 --solver basic
+#   python -m scripts.run_all_puzzles 4 5 6 --solver dlx --store results.sqlite
+#   python -m scripts.run_all_puzzles 6 7 8 --solver cp --time-limit 10 --store results.sqlite
+#   python -m scripts.run_all_puzzles 9 --memory-limit 512
+#   python -m scripts.run_all_puzzles 9 10 --store results.sqlite
+#   python -m scripts.run_all_puzzles 7 8 --export results.json
+#   python -m scripts.run_all_puzzles 4 5 6 7 --solver basic --time-limit 5 --store results.sqlite
+#   python -m scripts.run_all_puzzles 7 8 --config '{"delta_nodes": true}' --store results.sqlite
 
 
-def run_puzzle(puzzle_path: Path, solver: str) -> Tuple[bool, SearchStats | None]:
+def run_puzzle(
+    puzzle_path: Path,
+    solver: str,
+    config: Optional[SearchConfig] = None,
+) -> Tuple[bool, SearchStats | None]:
     """Run the chosen solver on a single puzzle file and return (solved, stats)."""
     try:
         if solver == "heuristic":
-            node, stats = heuristic_solve_puzzle_file(str(puzzle_path), measure_memory=False)
+            node, stats = heuristic_solve_puzzle_file(str(puzzle_path), measure_memory=False, config=config)
             solved = node is not None
             return solved, stats
 
         import time
 
+        # Every DFS step (a branch for CP, a path extension / exact cover
+        # step for DLX) is one tick of the budget, so it doubles as a state count.
+        budget = SearchBudget(
+            max_states=config.max_states if config else None,
+            time_limit=config.time_limit if config else None,
+        )
+        board = parse_raw_puzzle(load_puzzle_from_file(str(puzzle_path)))
         start = time.time()
-        solution = basic_solve_puzzle_file(str(puzzle_path))
+        solve = {"basic": basic_solve_puzzle, "cp": cp_solve_puzzle, "dlx": dlx_solve_puzzle}[solver]
+        solution = solve(board, budget)
         elapsed = time.time() - start
 
         solved = solution is not None
         stats = SearchStats(
             solved=solved,
-            states_expanded=0,          # basic solver doesn't track this
+            states_expanded=budget.states,
             time_seconds=elapsed,
-            peak_memory_bytes=0,       # basic solver doesn't track this
+            peak_memory_bytes=0,       # only the heuristic solver tracks this
+            stop_reason=budget.reason,
         )
         return solved, stats
 
@@ -51,10 +79,20 @@ def process_dimension(
     dim: str,
     solver: str,
     quiet: bool,
+    config: Optional[SearchConfig] = None,
+    store: Optional[ResultStore] = None,
+    rerun: bool = False,
+    records: Optional[List[StoredResult]] = None,
+    slowest: int = 5,
 ) -> Tuple[int, int, int, int, float]:
     """
     Process all puzzles for a given dimension.
 
+    With a `store`, puzzles that already have a result for this solver and
+    config are read back instead of solved (unless `rerun`), and every new
+    result is saved as soon as it is known. Every per-puzzle result is
+    also appended to `records` (for reports and exports).
+
     Returns:
         total_puzzles, solved_count, failed_count, total_states, total_time
     """
@@ -71,34 +109,59 @@ def process_dimension(
     total_states = 0
     total_time = 0.0
     solved_count = 0
+    peak_open = 0
+    peak_rss = 0
+    reused = 0
+    # The other solvers only take budgets; their results are stored under those alone.
+    run_config = config if solver == "heuristic" else _basic_config(config)
+    dim_records: List[StoredResult] = []
 
     for puzzle_file in puzzle_files:
         puzzle_name = puzzle_file.name
         if not quiet:
             print(f"\nSolving {puzzle_name}...")
 
-        solved, stats = run_puzzle(puzzle_file, solver)
+        board = parse_raw_puzzle(load_puzzle_from_file(str(puzzle_file)))
+        stored = None
+        if store is not None:
+            stored = store.get(puzzle_hash(board), solver, config_hash(run_config))
+
+        if stored is not None and not rerun:
+            reused += 1
+            solved, stats = stored.solved, _stats_from_stored(stored)
+            if not quiet:
+                print("   (stored result)")
+        else:
+            solved, stats = run_puzzle(puzzle_file, solver, config)
+            stored = None
 
         if stats is None:
             if not quiet:
                 print("  Error occurred")
             continue
 
+        if stored is None:
+            stored = StoredResult.from_stats(board, puzzle_name, solver, run_config, stats)
+            if store is not None:
+                store.put(stored)
+        # A stored result may come from an identical puzzle under another name.
+        dim_records.append(dataclasses.replace(stored, puzzle_name=puzzle_name))
+
+        peak_open = max(peak_open, stats.peak_open_nodes)
+        peak_rss = max(peak_rss, stats.peak_rss_bytes)
+        if not quiet and solver == "heuristic":
+            print(f"   {_memory_line(stats)}")
+
         if solved:
             solved_count += 1
             total_states += stats.states_expanded
             total_time += stats.time_seconds
             if not quiet:
-                if solver == "heuristic":
-                    print(f"   Solved in {stats.time_seconds:.4f}s ({stats.states_expanded} states)")
-                else:
-                    print(f"   Solved in {stats.time_seconds:.4f}s")
+                print(f"   Solved in {stats.time_seconds:.4f}s ({stats.states_expanded} states)")
         else:
             if not quiet:
-                if solver == "heuristic":
-                    print(f"  X No solution found ({stats.states_expanded} states)")
-                else:
-                    print("  X No solution found")
+                reason = f", stopped: {stats.stop_reason}" if stats.stop_reason else ""
+                print(f"  X No solution found ({stats.states_expanded} states{reason})")
 
     total_puzzles = len(puzzle_files)
     failed_count = total_puzzles - solved_count
@@ -108,16 +171,55 @@ def process_dimension(
     print(f"SUMMARY for {dim} ({solver} solver)")
     print("-" * 60)
     print(f"Solved: {solved_count} / {total_puzzles} puzzles")
+    if reused:
+        print(f"Reused stored results: {reused}")
 
     if solved_count > 0:
-        if solver == "heuristic":
-            print(f"Average states expanded: {total_states / solved_count:.1f}")
+        print(f"Average states expanded: {total_states / solved_count:.1f}")
         print(f"Average time: {total_time / solved_count:.4f}s")
         print(f"Total time: {total_time:.4f}s")
+    if solver == "heuristic":
+        print(f"Largest open list: {peak_open} nodes, peak RSS: {peak_rss / 2**20:.1f} MiB")
+    for report in build_reports(dim_records, slowest):
+        for line in format_report(report):
+            print(line)
+    if records is not None:
+        records.extend(dim_records)
 
     return total_puzzles, solved_count, failed_count, total_states, total_time
 
 
+def _basic_config(config: Optional[SearchConfig]) -> Dict[str, Any]:
+    if config is None:
+        return {}
+    return {k: getattr(config, k) for k in BASIC_CONFIG_KEYS if getattr(config, k) is not None}
+
+
+def _stats_from_stored(stored: StoredResult) -> SearchStats:
+    return SearchStats(
+        solved=stored.solved,
+        states_expanded=stored.states_expanded,
+        time_seconds=stored.time_seconds,
+        peak_memory_bytes=stored.peak_memory_bytes,
+        stop_reason=stored.stop_reason,
+        peak_open_nodes=stored.peak_open_nodes,
+        open_entry_bytes=stored.open_entry_bytes,
+        peak_rss_bytes=stored.peak_rss_bytes,
+    )
+
+
+def _memory_line(stats: SearchStats) -> str:
+    open_kib = stats.peak_open_nodes * stats.open_entry_bytes / 1024
+    line = (
+        f"open list peak {stats.peak_open_nodes} nodes "
+        f"(~{open_kib:.1f} KiB at {stats.open_entry_bytes} B/node), "
+        f"RSS {stats.peak_rss_bytes / 2**20:.1f} MiB"
+    )
+    if stats.open_list_trims:
+        line += f", trimmed {stats.open_list_trims}x"
+    return line
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Run the Flow Free solver over all puzzles in one or more dimensions."
@@ -134,29 +236,98 @@ def main() -> None:
     )
     parser.add_argument(
         "--solver",
-        choices=["heuristic", "basic"],
+        choices=["heuristic", "basic", "cp", "dlx"],
         default="heuristic",
-        help="Solver to use: 'heuristic' (A*) or 'basic' (DFS). Default: heuristic.",
+        help="Solver to use: 'heuristic' (A*), 'basic' (DFS), 'cp' (constraint propagation) "
+        "or 'dlx' (exact cover). Default: heuristic.",
+    )
+    parser.add_argument(
+        "--config",
+        help="Heuristic solver: SearchConfig fields as JSON, e.g. '{\"engine\": \"bitboard\"}'.",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        help="Give up on a puzzle after this many seconds (all solvers).",
+    )
+    parser.add_argument(
+        "--max-states",
+        type=int,
+        help="Give up on a puzzle after this many expanded states / DFS steps (all solvers).",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=float,
+        help="Heuristic solver: cap the open list at this many MiB (estimated); trims past it.",
+    )
+    parser.add_argument(
+        "--max-open-nodes",
+        type=int,
+        help="Heuristic solver: cap the open list at this many nodes; trims past it.",
+    )
+    parser.add_argument(
+        "--store",
+        help="SQLite result store: skip puzzles already stored for this solver/config, save new results.",
+    )
+    parser.add_argument(
+        "--rerun",
+        action="store_true",
+        help="With --store: solve every puzzle again and overwrite stored results.",
+    )
+    parser.add_argument(
+        "--export",
+        help="Write per-puzzle results and per-dimension distributions to this .json or .csv file.",
+    )
+    parser.add_argument(
+        "--slowest",
+        type=int,
+        default=5,
+        help="Number of slowest puzzles listed per dimension (default: 5).",
     )
     args = parser.parse_args()
 
+    options = json.loads(args.config) if args.config else {}
+    if args.solver != "heuristic" and options:
+        parser.error("--config only applies to the heuristic solver")
+    try:
+        config = SearchConfig(**{
+            **options,
+            "max_states": args.max_states,
+            "time_limit": args.time_limit,
+            "memory_limit": int(args.memory_limit * 2**20) if args.memory_limit is not None else None,
+            "max_open_nodes": args.max_open_nodes,
+        })
+    except (TypeError, ValueError) as exc:
+        parser.error(f"bad config: {exc}")
+
     all_total = 0
     all_solved = 0
     all_failed = 0
     all_total_states = 0
     all_total_time = 0.0
 
-    for dim in args.dimensions:
-        total, solved, failed, total_states, total_time = process_dimension(
-            dim=dim,
-            solver=args.solver,
-            quiet=args.quiet,
-        )
-        all_total += total
-        all_solved += solved
-        all_failed += failed
-        all_total_states += total_states
-        all_total_time += total_time
+    store = ResultStore(args.store) if args.store else None
+    records: List[StoredResult] = []
+    try:
+        for dim in args.dimensions:
+            total, solved, failed, total_states, total_time = process_dimension(
+                dim=dim,
+                solver=args.solver,
+                quiet=args.quiet,
+                config=config,
+                store=store,
+                rerun=args.rerun,
+                records=records,
+                slowest=args.slowest,
+            )
+            all_total += total
+            all_solved += solved
+            all_failed += failed
+            all_total_states += total_states
+            all_total_time += total_time
+    finally:
+        if store is not None:
+            store.close()
 
     # Overall summary if multiple dimensions
     if len(args.dimensions) > 1:
@@ -169,11 +340,14 @@ def main() -> None:
         print(f"Failed: {all_failed}")
 
         if all_solved > 0:
-            if args.solver == "heuristic":
-                print(f"\nAverage states expanded: {all_total_states / all_solved:.1f}")
+            print(f"\nAverage states expanded: {all_total_states / all_solved:.1f}")
             print(f"Average time: {all_total_time / all_solved:.4f}s")
             print(f"Total time: {all_total_time:.4f}s")
 
+    if args.export:
+        export(args.export, records, args.slowest)
+        print(f"\nExported {len(records)} results to {args.export}")
+
 
 if __name__ == "__main__":
     main()
@@ -2,24 +2,32 @@
 from __future__ import annotations
 
 import argparse
+import json
 import time
 from pathlib import Path
 
-from flow_solver.model import Board
+from flow_solver.model import Board, load_puzzle_from_file, parse_raw_puzzle
 from flow_solver.model.game_board_generator import GameBoard
 from flow_solver.search.basic_solver import (
     solve_puzzle as basic_solve_puzzle,
     solve_puzzle_file as basic_solve_puzzle_file,
 )
+from flow_solver.search.budget import SearchBudget
+from flow_solver.search.cp_solver import solve_puzzle as cp_solve_puzzle
+from flow_solver.search.dlx_solver import solve_puzzle as dlx_solve_puzzle
 from flow_solver.search.heuristic_solver import (
+    SearchConfig,
     solve_puzzle,
-    solve_puzzle_file,
 )
 
 # python -m scripts.run_search puzzles/7x7/7x7_01.txt
 # python -m scripts.run_search puzzles/7x7/7x7_01.txt --solver basic
 # python -m scripts.run_search --generate --dim 7 --num-wires 6 --solver basic
+# python -m scripts.run_search puzzles/5x5/5x5_01.txt --solver dlx
+# python -m scripts.run_search puzzles/7x7/7x7_01.txt --solver cp
 # python -m scripts.run_search --generate --dim 7 --num-wires 6
+# python -m scripts.run_search puzzles/10x10/10x10_01.txt --trace run.trace
+# python -m scripts.run_search puzzles/10x10/10x10_01.txt --config '{"delta_nodes": true}' --trace run.trace
 
 
 def run_basic(board: Board | None = None, path: str | None = None) -> None:
@@ -42,16 +50,41 @@ def run_basic(board: Board | None = None, path: str | None = None) -> None:
     print(f"Time taken: {elapsed:.4f} s")
 
 
-def run_heuristic(board: Board | None = None, path: str | None = None) -> None:
-    """Run the heuristic (A*) solver on a board or file and print results."""
+def run_budgeted(board: Board, solver: str) -> None:
+    """Run the exact cover (dlx) or constraint-propagation (cp) solver on a board and print results."""
+    budget = SearchBudget()
+    start = time.time()
+    solve = cp_solve_puzzle if solver == "cp" else dlx_solve_puzzle
+    solution = solve(board, budget)
+    elapsed = time.time() - start
+
+    if solution is None:
+        reason = f" (stopped: {budget.reason})" if budget.reason else ""
+        print(f"No solution found{reason}.")
+    else:
+        print("Solution found:")
+        solution.pretty_print()
+    print(f"Time taken: {elapsed:.4f} s")
+
+
+def run_heuristic(
+    board: Board | None = None,
+    path: str | None = None,
+    config: SearchConfig | None = None,
+    trace: str | None = None,
+) -> None:
+    """
+    Run the heuristic (A*) solver on a board or file and print results.
+
+    With `trace`, every expansion is recorded there (see scripts.read_trace).
+    """
     if (board is None) == (path is None):
         raise ValueError("Exactly one of 'board' or 'path' must be provided.")
 
+    if board is None:
+        board = parse_raw_puzzle(load_puzzle_from_file(path))
     start = time.time()
-    if board is not None:
-        node, stats = solve_puzzle(board, measure_memory=False)
-    else:
-        node, stats = solve_puzzle_file(path, measure_memory=False)
+    node, stats = solve_puzzle(board, measure_memory=False, config=config, trace=trace)
     elapsed = time.time() - start
 
     if node is None:
@@ -64,6 +97,8 @@ def run_heuristic(board: Board | None = None, path: str | None = None) -> None:
     print(f"Time taken: {elapsed:.4f} s")
     if stats.peak_memory_bytes:
         print(f"Peak memory: {stats.peak_memory_bytes / 1024:.1f} KiB")
+    if trace is not None:
+        print(f"Trace written to {trace}")
 
 
 def main() -> None:
@@ -92,12 +127,32 @@ def main() -> None:
     )
     parser.add_argument(
         "--solver",
-        choices=["basic", "heuristic"],
+        choices=["basic", "cp", "dlx", "heuristic"],
         default="heuristic",
-        help="Solver to use: 'basic' (DFS) or 'heuristic' (A*) (default: heuristic)",
+        help="Solver to use: 'basic' (DFS), 'cp' (constraint propagation), "
+        "'dlx' (exact cover, small boards) or 'heuristic' (A*) (default: heuristic)",
+    )
+    parser.add_argument(
+        "--config",
+        help='A* options as SearchConfig JSON, e.g. \'{"delta_nodes": true}\' (heuristic solver only).',
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="Record every expansion in a binary trace file for scripts.read_trace "
+        "(heuristic solver only; not with lazy, numpy_batch or decompose).",
     )
     args = parser.parse_args()
 
+    config = None
+    if args.config:
+        try:
+            config = SearchConfig(**json.loads(args.config))
+        except (TypeError, ValueError) as exc:
+            raise SystemExit(f"Bad --config: {exc}")
+    if args.solver != "heuristic" and (config is not None or args.trace):
+        raise SystemExit("--config and --trace only apply to the heuristic solver")
+
     # Generate a random puzzle
     if args.generate:
         if args.dim is None or args.num_wires is None:
@@ -111,8 +166,13 @@ def main() -> None:
 
         if args.solver == "basic":
             run_basic(board=board)
+        elif args.solver in ("cp", "dlx"):
+            run_budgeted(board, args.solver)
         else:
-            run_heuristic(board=board)
+            try:
+                run_heuristic(board=board, config=config, trace=args.trace)
+            except ValueError as exc:
+                raise SystemExit(str(exc))
         return
 
     # Solve from file
@@ -125,8 +185,13 @@ def main() -> None:
 
     if args.solver == "basic":
         run_basic(path=str(path))
+    elif args.solver in ("cp", "dlx"):
+        run_budgeted(parse_raw_puzzle(load_puzzle_from_file(str(path))), args.solver)
     else:
-        run_heuristic(path=str(path))
+        try:
+            run_heuristic(path=str(path), config=config, trace=args.trace)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
 
 
 if __name__ == "__main__":
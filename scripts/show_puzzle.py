@@ -24,7 +24,7 @@ def main() -> None:
     board = parse_raw_puzzle(raw)
 
     print(f"Puzzle name: {raw.name}")
-    print(f"Board size: {board.size}x{board.size}")
+    print(f"Board size: {board.dimension}")
     print("Grid:")
     board.pretty_print()
 
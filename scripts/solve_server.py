@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flow_solver.model import grid_geometry
+from flow_solver.search import bitboard
+from flow_solver.search.dispatch import (
+    STATUS_SOLVED,
+    STATUS_UNSOLVABLE,
+    config_key,
+    grid_lines,
+    solve_request,
+)
+
+# Examples:
+#   python -m scripts.solve_server --workers 4
+#   python -m scripts.solve_server --socket /tmp/flow.sock
+#
+# One JSON object per line in, one per line out:
+#   {"id": 1, "grid": ["A..B", ...], "solver": "heuristic", "config": {"time_limit": 5}}
+#   {"cancel": 1}
+
+# Board sizes whose geometry and bitboard masks each worker builds at startup
+WARM_SIZES = range(4, 16)
+
+CacheKey = Tuple[Tuple[str, ...], str]
+
+
+def _warm_worker() -> None:
+    for size in WARM_SIZES:
+        grid_geometry(size)
+        bitboard.bitboard_layout(size)
+
+
+def _run_request(request: Dict[str, Any], cancel_event) -> Dict[str, Any]:
+    """Worker side: solve, polling the request's cancel event."""
+    if cancel_event.is_set():  # cancelled while still queued
+        return {"status": "cancelled", "solution": None, "stats": {"worker_pid": os.getpid()}}
+    return solve_request(request, should_stop=cancel_event.is_set)
+
+
+def _grid_key(grid: Any) -> Tuple[str, ...]:
+    """The rows the solver will parse, so formatting differences share a cache entry."""
+    try:
+        return tuple(grid_lines(grid))
+    except (TypeError, AttributeError):  # not a grid; the worker reports the error
+        return ()
+
+
+class SolveServer:
+    """
+    Shared state for all connections: the worker pool, a manager for
+    cross-process cancel events, and an LRU cache of final results keyed by
+    (grid, solver + config).
+    """
+
+    def __init__(self, workers: int, cache_size: int):
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+        self.manager = multiprocessing.Manager()
+        self.cache: OrderedDict[CacheKey, Dict[str, Any]] = OrderedDict()
+        self.cache_size = cache_size
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+        self.manager.shutdown()
+
+    def _cache_get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        result = self.cache.get(key)
+        if result is not None:
+            self.cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: CacheKey, result: Dict[str, Any]) -> None:
+        # Budget-limited outcomes depend on machine load, so only final answers are kept.
+        if self.cache_size <= 0 or result["status"] not in (STATUS_SOLVED, STATUS_UNSOLVABLE):
+            return
+        self.cache[key] = dict(result, stats=dict(result["stats"]))
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def solve(self, request: Dict[str, Any], cancel_event) -> Dict[str, Any]:
+        solver_key = config_key(request.get("solver", "heuristic"), request.get("config"))
+        key = (_grid_key(request.get("grid")), solver_key)
+
+        t0 = time.perf_counter()
+        cached = self._cache_get(key)
+        if cached is not None:
+            result = dict(cached, stats=dict(cached["stats"], cached=True))
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.pool, _run_request, request, cancel_event)
+            self._cache_put(key, result)
+            result["stats"]["cached"] = False
+        result["stats"]["total_seconds"] = time.perf_counter() - t0
+        return result
+
+
+class Session:
+    """One client connection (or stdin/stdout): its in-flight requests by id."""
+
+    def __init__(self, server: SolveServer, write: Callable[[Dict[str, Any]], None]):
+        self.server = server
+        self.write = write
+        # id -> cancel event (None while the event is still being created)
+        self.running: Dict[Any, Any] = {}
+        self.cancelled: set = set()  # ids cancelled before their event existed
+        self.tasks: set = set()
+
+    def handle_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as exc:
+            self.write({"id": None, "status": "error", "error": f"bad request: {exc}"})
+            return
+
+        if "cancel" in message:
+            self.write({"cancel": message["cancel"], "ok": self.cancel(message["cancel"])})
+            return
+
+        request_id = message.get("id")
+        if not isinstance(request_id, (str, int, float, type(None))):
+            self.write({"id": None, "status": "error", "error": "id must be a string or number"})
+            return
+        if request_id in self.running:
+            self.write({"id": request_id, "status": "error", "error": "id already in flight"})
+            return
+        self.running[request_id] = None
+        task = asyncio.get_running_loop().create_task(self._solve(request_id, message))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def cancel(self, request_id: Any) -> bool:
+        """Stop an in-flight request; False if no request has that id."""
+        if request_id not in self.running:
+            return False
+        event = self.running[request_id]
+        if event is None:
+            self.cancelled.add(request_id)
+        else:
+            event.set()
+        return True
+
+    async def _solve(self, request_id: Any, request: Dict[str, Any]) -> None:
+        try:
+            # A round trip to the manager process: keep it off the event loop.
+            loop = asyncio.get_running_loop()
+            event = await loop.run_in_executor(None, self.server.manager.Event)
+            self.running[request_id] = event
+            if request_id in self.cancelled:
+                event.set()
+            result = await self.server.solve(request, event)
+        except Exception as exc:  # report, keep serving
+            result = {"status": "error", "error": f"{type(exc).__name__}: {exc}"}
+        finally:
+            self.running.pop(request_id, None)
+            self.cancelled.discard(request_id)
+        self.write({"id": request_id, **result})
+
+    async def drain(self) -> None:
+        """Wait for every in-flight request of this session."""
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
+
+
+async def serve_stdio(server: SolveServer) -> None:
+    def write(message: Dict[str, Any]) -> None:
+        sys.stdout.write(json.dumps(message) + "\n")
+        sys.stdout.flush()
+
+    session = Session(server, write)
+    loop = asyncio.get_running_loop()
+    while True:
+        # Blocking readline in a thread: works for pipes, files and terminals alike.
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            break
+        session.handle_line(line)
+    await session.drain()
+
+
+async def serve_unix(server: SolveServer, path: str) -> None:
+    async def on_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        def write(message: Dict[str, Any]) -> None:
+            if not writer.is_closing():
+                writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+        session = Session(server, write)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                session.handle_line(line.decode("utf-8"))
+            await session.drain()
+            await writer.drain()
+        finally:
+            # Client gone: stop whatever it still had running.
+            for request_id in list(session.running):
+                session.cancel(request_id)
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    unix_server = await asyncio.start_unix_server(on_client, path=path)
+    print(f"Listening on {path}", file=sys.stderr)
+    async with unix_server:
+        await unix_server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Serve solve requests as JSON lines on stdin/stdout or a Unix socket."
+    )
+    parser.add_argument("--socket", help="Listen on this Unix socket path instead of stdin/stdout.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="Solved/unsolvable results kept for repeated requests (0 disables).",
+    )
+    args = parser.parse_args()
+    if args.workers < 1:
+        raise SystemExit("--workers must be >= 1")
+
+    server = SolveServer(args.workers, args.cache_size)
+    try:
+        if args.socket:
+            asyncio.run(serve_unix(server, args.socket))
+        else:
+            asyncio.run(serve_stdio(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from flow_solver.model import load_puzzle_from_file, parse_raw_puzzle
+from flow_solver.results import ResultStore
+from flow_solver.results.difficulty import MIN_SAMPLES, DifficultyModel
+
+# Examples:
+#   python -m scripts.run_all_puzzles 4 5 6 7 --solver basic --time-limit 2 --store results.sqlite
+#   python -m scripts.run_all_puzzles 4 5 6 7 8 --store results.sqlite
+#   python -m scripts.run_all_puzzles 4 5 6 7 8 --config '{"delta_nodes": true}' --store results.sqlite
+#   python -m scripts.train_difficulty results.sqlite 4 5 6 7 8 --out difficulty.json
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fit per-solver cost models on stored results, for solve_puzzle(solver='auto')."
+    )
+    parser.add_argument("store", help="Result store written by run_all_puzzles --store.")
+    parser.add_argument("dimensions", nargs="+", help="Puzzle folders to read boards from, like 7 or 5x8.")
+    parser.add_argument("--out", default="difficulty.json", help="Model file to write (default: difficulty.json).")
+    parser.add_argument(
+        "--min-samples",
+        type=int,
+        default=MIN_SAMPLES,
+        help=f"Skip runs with fewer stored results (default: {MIN_SAMPLES}).",
+    )
+    args = parser.parse_args()
+
+    boards = []
+    for dim in args.dimensions:
+        if "x" not in dim:
+            dim = f"{dim}x{dim}"
+        for path in sorted((Path("puzzles") / dim).glob(f"{dim}_*.txt")):
+            boards.append(parse_raw_puzzle(load_puzzle_from_file(str(path))))
+
+    with ResultStore(args.store) as store:
+        try:
+            model = DifficultyModel.train_from_store(store, boards, args.min_samples)
+        except ValueError as exc:
+            raise SystemExit(f"Cannot train: {exc}")
+
+    print(f"{'run':>40}{'samples':>9}{'solved':>8}{'time error':>12}")
+    for run, m in sorted(model.runs.items()):
+        print(f"{run:>40}{m.samples:>9}{m.solved_rate:>8.0%}{f'x{10 ** m.time_error:.2f}':>12}")
+    model.save(args.out)
+    print(f"\nSaved {len(model.runs)} run models to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from flow_solver.search import heuristic_solver
+from flow_solver.search.dispatch import board_from_grid
+from flow_solver.search.heuristic_solver import SearchConfig
+from flow_solver.search.incremental import PuzzleEdit, resolve
+
+PUZZLE = ["...BC", "BC...", "A....", ".....", "A...."]
+
+# Moving C's terminal next to the kept paths cannot be routed in the first
+# round, so resolve widens to a second one (88 + 251 states uncapped).
+EDIT = PuzzleEdit(moved_terminals={"C": ((1, 1), (2, 1))})
+
+
+def _previous_solution():
+    node, _ = heuristic_solver.solve_puzzle(board_from_grid(PUZZLE))
+    assert node is not None
+    return node
+
+
+def test_max_states_covers_every_round():
+    previous = _previous_solution()
+    _, uncapped = resolve(previous, EDIT)
+    assert uncapped.states_expanded > 200
+
+    for max_states in (50, 88, 89, 200):
+        solution, stats = resolve(previous, EDIT, SearchConfig(max_states=max_states))
+        assert solution is None
+        assert stats.stop_reason == "max_states"
+        assert stats.states_expanded <= max_states
+
+
+def test_time_limit_used_up():
+    solution, stats = resolve(_previous_solution(), EDIT, SearchConfig(time_limit=0))
+    assert solution is None
+    assert stats.stop_reason == "time_limit"
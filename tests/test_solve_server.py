@@ -0,0 +1,25 @@
+import asyncio
+
+from scripts.solve_server import SolveServer
+
+GRID = ["...BC", "BC...", "A....", ".....", "A...."]
+
+
+def test_reformatted_grid_hits_the_cache():
+    server = SolveServer(workers=1, cache_size=8)
+    try:
+
+        async def solve_both():
+            first = await server.solve({"id": 1, "grid": GRID}, server.manager.Event())
+            reformatted = "\r\n".join(row + "  " for row in GRID) + "\r\n\r\n"
+            second = await server.solve({"id": 2, "grid": reformatted}, server.manager.Event())
+            return first, second
+
+        first, second = asyncio.run(solve_both())
+    finally:
+        server.close()
+
+    assert first["status"] == "solved" and not first["stats"]["cached"]
+    assert second["stats"]["cached"]
+    assert second["solution"] == first["solution"]
+    assert len(server.cache) == 1